@@ -0,0 +1,125 @@
+import argparse
+import time
+
+import numpy as np
+
+import gesture_features as gf
+from landmark_arrays import GESTURE_CODES, GESTURE_NAMES
+
+# Thresholds of the live predicates
+PINCH_THRESHOLD = 0.04      # MouseController.is_left_click / is_right_click
+STRAIGHT_THRESHOLD = 175.0  # HandDetector.is_index_finger_straight
+SPREAD_THRESHOLD = 0.1      # ScreenshotTrigger.is_all_fingers_pinch
+
+NONE, LEFT_CLICK, RIGHT_CLICK, SCROLL_UP, SCROLL_DOWN, SCREENSHOT, POINTING = (
+    GESTURE_CODES[name] for name in ("", "Left Click", "Right Click", "Scroll Up", "Scroll Down", "Screenshot", "Pointing"))
+
+
+def features(points):
+    """
+    Per-hand gesture features of a (..., 21, 3) landmark array, each of shape (...):
+    pinch distances, index straightness, fingertip spread and the thumb flags.
+    """
+    folded = gf.fingers_folded(points)  # Shared by both thumb gestures, computed once
+    return {
+        "left": gf.pinch_distance(points, gf.INDEX_TIP),
+        "right": gf.pinch_distance(points, gf.MIDDLE_TIP),
+        "straight": gf.index_straightness(points),
+        "spread": gf.fingertip_spread(points),
+        "thumbs_up": gf.thumbs_up(points, folded),
+        "thumbs_down": gf.thumbs_down(points, folded),
+    }
+
+
+def gated_scores(feature_map, hand):
+    """
+    Per-frame scores of ``features()`` with the same precedence as the live
+    loop: no hand or a thumbs up/down disables clicks, pointing and the
+    screenshot gesture (their score becomes inf).
+    """
+    enabled = hand & ~(feature_map["thumbs_up"] | feature_map["thumbs_down"])
+    return {
+        "left": np.where(enabled, feature_map["left"], np.inf),
+        "right": np.where(enabled, feature_map["right"], np.inf),
+        # Straightness fires when the angle is *above* the threshold, so negate it
+        "straight": np.where(enabled, -feature_map["straight"], np.inf),
+        "spread": np.where(enabled, feature_map["spread"], np.inf),
+    }
+
+
+def classify_features(feature_map, hand=None, pinch=PINCH_THRESHOLD, straight=STRAIGHT_THRESHOLD,
+                      spread=SPREAD_THRESHOLD):
+    """GESTURE_CODES per frame from ``features()``, see classify()"""
+    shape = feature_map["left"].shape
+    codes = np.full(shape, NONE, dtype=np.uint8)
+    # Assigned from the lowest precedence up, so later gestures win
+    codes[feature_map["straight"] > straight] = POINTING
+    codes[feature_map["spread"] < spread] = SCREENSHOT
+    codes[feature_map["right"] < pinch] = RIGHT_CLICK
+    codes[feature_map["left"] < pinch] = LEFT_CLICK
+    codes[feature_map["thumbs_down"]] = SCROLL_DOWN
+    codes[feature_map["thumbs_up"]] = SCROLL_UP
+    if hand is not None:
+        codes[~np.asarray(hand, dtype=bool)] = NONE
+    return codes
+
+
+def classify(points, hand=None, pinch=PINCH_THRESHOLD, straight=STRAIGHT_THRESHOLD, spread=SPREAD_THRESHOLD):
+    """
+    Classify every hand in a (..., 21, 3) landmark array in one vectorised pass.
+
+    Returns (codes, features): GESTURE_CODES of shape (...) and the feature
+    arrays they were derived from. ``hand`` marks frames with a detected hand
+    (all of them when None). Precedence follows the live loop: thumbs up,
+    thumbs down, left click, right click, screenshot, then pointing.
+
+    Only the per-frame geometry is evaluated. Click cooldowns, gesture
+    holding and the predictive click detector depend on earlier frames and
+    are not applied. Nothing is clicked, drawn or logged.
+    """
+    points = np.asarray(points, dtype=np.float32)
+    feature_map = features(points)
+    return classify_features(feature_map, hand, pinch, straight, spread), feature_map
+
+
+def gesture_names(codes):
+    """Gesture names ("" for none) for an array of GESTURE_CODES"""
+    return np.array(GESTURE_NAMES, dtype=object)[codes]
+
+
+def classify_recording(path, chunk_size=1 << 18, **thresholds):
+    """GESTURE_CODES for every frame of a landmark recording, a chunk at a time"""
+    from landmark_recorder import FLAG_HAND, dequantize_landmarks, open_recording
+    _, records = open_recording(path)
+    codes = np.empty(len(records), dtype=np.uint8)
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        codes[start:start + len(chunk)], _ = classify(dequantize_landmarks(chunk["landmarks"]),
+                                                      (chunk["flags"] & FLAG_HAND) != 0, **thresholds)
+    return codes, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify every frame of landmark recordings in one vectorised pass")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--pinch", type=float, default=PINCH_THRESHOLD, help=f"click pinch distance (default {PINCH_THRESHOLD})")
+    parser.add_argument("--straight", type=float, default=STRAIGHT_THRESHOLD,
+                        help=f"index straightness angle (default {STRAIGHT_THRESHOLD})")
+    parser.add_argument("--spread", type=float, default=SPREAD_THRESHOLD, help=f"screenshot fingertip spread (default {SPREAD_THRESHOLD})")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        started = time.perf_counter()
+        codes, records = classify_recording(path, pinch=args.pinch, straight=args.straight, spread=args.spread)
+        elapsed = time.perf_counter() - started
+        print(f"{path}: {len(codes)} frames classified in {elapsed:.3f}s")
+        counts = np.bincount(codes, minlength=len(GESTURE_NAMES))
+        print("Gestures: " + (", ".join(f"{GESTURE_NAMES[c]}: {int(counts[c])}" for c in range(1, len(GESTURE_NAMES)) if counts[c]) or "none"))
+        labels = np.asarray(records["label"])
+        labelled = labels != 0
+        if labelled.any():
+            print(f"Agrees with labels on {np.count_nonzero(codes[labelled] == labels[labelled])}/{np.count_nonzero(labelled)} labelled frames")
+
+
+if __name__ == "__main__":
+    main()
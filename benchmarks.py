@@ -0,0 +1,249 @@
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from synthetic_hands import hand
+
+DEFAULT_BASELINE = os.path.join("profiles", "benchmark_baseline.json")
+
+
+def build_cases():
+    """[(name, callable)] of every benchmarked per-frame helper"""
+    from hand_detection import HandDetector
+    from mouse_controller import MouseController, NullMouse
+    from overlay_renderer import Overlay, OverlayRenderer
+    from screenshot_trigger import ScreenshotTrigger
+
+    detector = HandDetector()
+    pointing = hand("point").landmark
+    thumbs_up = hand("thumbs_up").landmark
+    open_hand = hand("open").landmark
+    pinch_all = hand("pinch_all").landmark
+    index_tip, index_pip, index_mcp = pointing[8], pointing[6], pointing[5]
+
+    mouse = NullMouse()
+    controller = MouseController(hand_detector=detector, mouse=mouse, screen_size=(1920, 1080))
+    trigger = ScreenshotTrigger(detector, send_hotkey=False)
+
+    # A typical feedback frame: the hand, a gesture label and the fingertip marker
+    renderer = OverlayRenderer()
+    preview = np.zeros((480, 640, 3), dtype=np.uint8)
+    overlay = Overlay()
+    overlay.hand(hand("point"))
+    overlay.label("Left Click Detected", (50, 100), (0, 255, 0))
+    overlay.marker(0.5, 0.4, 15, (0, 255, 0))
+
+    # The fingertip sweeps back and forth so every call moves the pointer
+    path = [(0.3 + 0.4 * abs((i % 200) / 100.0 - 1.0), 0.5) for i in range(200)]
+    step = [0]
+
+    def move_relative():
+        x, y = path[step[0] % 200]
+        step[0] += 1
+        mouse.position = (960, 540)  # Stay away from the edges
+        controller.move_mouse_relative(x, y)
+
+    def detect(hand):
+        # Repeated calls hold the gesture, as on consecutive frames (cooldowns apply)
+        def run():
+            mouse.events.clear()
+            controller.detect_gestures(None, hand)
+        return run
+
+    return [
+        ("HandDetector.is_thumbs_up[pointing]", lambda: detector.is_thumbs_up(pointing)),
+        ("HandDetector.is_thumbs_up[thumbs up]", lambda: detector.is_thumbs_up(thumbs_up)),
+        ("HandDetector.is_finger_folded[index]", lambda: detector.is_finger_folded(pointing, 8, 6, 5)),
+        ("HandDetector.is_index_finger_straight", lambda: detector.is_index_finger_straight(pointing)),
+        ("HandDetector.get_angle", lambda: detector.get_angle(index_tip, index_pip, index_mcp)),
+        ("MouseController.move_mouse_relative", move_relative),
+        ("MouseController.detect_gestures[pointing]", detect(hand("point"))),
+        ("MouseController.detect_gestures[thumbs up]", detect(hand("thumbs_up"))),
+        ("MouseController.detect_gestures[left pinch]", detect(hand("pinch_left"))),
+        ("ScreenshotTrigger.is_all_fingers_pinch[open]", lambda: trigger.is_all_fingers_pinch(open_hand)),
+        ("ScreenshotTrigger.is_all_fingers_pinch[pinch]", lambda: trigger.is_all_fingers_pinch(pinch_all)),
+        ("OverlayRenderer.draw[640x480]", lambda: renderer.draw(preview, overlay)),
+    ]
+
+
+NOISE_SIGMAS = 4.0  # A change is a regression once it exceeds this many standard deviations of the timing noise
+
+
+def reference_workload(values=tuple(i * 0.01 for i in range(64))):
+    """Fixed pure-Python work, timed alongside every case to factor out machine speed changes"""
+    total = 0.0
+    for v in values:
+        total += math.hypot(v, 1.0 - v)
+    return total
+
+
+def measure(func, repeat=9, min_time=0.02):
+    """
+    Time ``func`` against the reference workload. Each of ``repeat`` runs
+    times a loop of ``func`` (sized to ``min_time``) between two loops of the
+    reference, so load that hits the machine during a run slows both.
+    Returns (ns per call, ratio to the reference, noise): medians over the
+    runs, and the robust relative standard deviation of the ratio across them.
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()  # As timeit does: collections would land in random runs
+    try:
+        number = _loop_count(func, min_time)
+        reference_number = _loop_count(reference_workload, min_time / 2)
+        times, ratios = [], []
+        for _ in range(repeat):
+            before = _time(reference_workload, reference_number)
+            elapsed = _time(func, number)
+            after = _time(reference_workload, reference_number)
+            times.append(elapsed)
+            ratios.append(elapsed / min(before, after))
+    finally:
+        if gc_enabled:
+            gc.enable()
+    ratio = float(np.median(ratios))
+    noise = 1.4826 * float(np.median(np.abs(np.array(ratios) - ratio))) / ratio
+    return float(np.median(times)), ratio, noise
+
+
+def combine(passes):
+    """
+    Merge full passes over the cases ([{name: (ns, ratio, noise)}]): median
+    time and ratio, and as noise the relative spread of the ratio from pass
+    to pass, or within a pass when that is larger. Run-to-run drift is what a
+    later comparison has to tolerate.
+    """
+    results = {}
+    for name in passes[0]:
+        times, ratios, noises = (np.array(values) for values in zip(*(p[name] for p in passes)))
+        ratio = float(np.median(ratios))
+        between = float(np.std(ratios, ddof=1)) / ratio if len(passes) > 1 else 0.0
+        results[name] = (float(np.median(times)), ratio, max(between, float(np.median(noises))))
+    return results
+
+
+def _loop_count(func, min_time):
+    """Calls per timed loop, timeit-style: enough for the loop to take ``min_time``"""
+    number = 1
+    while True:
+        started = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter_ns() - started
+        if elapsed >= min_time * 1e9:
+            return number
+        number *= 10 if elapsed < min_time * 1e8 else 2
+
+
+def _time(func, number):
+    """ns per call over one loop of ``number`` calls"""
+    started = time.perf_counter_ns()
+    for _ in range(number):
+        func()
+    return (time.perf_counter_ns() - started) / number
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(path, results, previous=None):
+    """Store ``results`` ({name: (ns, ratio, noise)}) on top of the ``previous`` baseline's cases"""
+    stored = {key: dict((previous or {}).get(key, {})) for key in ("results", "ratios", "noise")}
+    for name, (ns, ratio, noise) in results.items():
+        stored["results"][name] = ns
+        stored["ratios"][name] = ratio
+        stored["noise"][name] = noise
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                   "created": time.strftime("%Y-%m-%d %H:%M:%S"), **stored}, f, indent=2)
+
+
+def compare(results, baseline, tolerance, normalize=True):
+    """
+    [(name, ns, baseline ns or None, change or None, allowed change, regressed)]
+    for ``results`` ({name: (ns, ratio, noise)}) against a stored baseline.
+    With ``normalize`` the change is that of the ratio to the reference
+    workload, so a machine that is slower today (throttling, a busy host)
+    does not show up as a regression. A case regresses when it is slower by
+    more than NOISE_SIGMAS times the timing noise of both runs, and by at
+    least ``tolerance``.
+    """
+    baseline = baseline or {}
+    rows = []
+    for name, (ns, ratio, noise) in results.items():
+        base_ns = baseline.get("results", {}).get(name)
+        base = baseline.get("ratios", {}).get(name) if normalize else base_ns
+        change = (ratio if normalize else ns) / base if base else None
+        allowed = max(tolerance, NOISE_SIGMAS * math.hypot(noise, baseline.get("noise", {}).get(name, 0.0)))
+        rows.append((name, ns, base_ns, change, allowed, change is not None and change > 1.0 + allowed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the per-frame gesture and pointer helpers")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help=f"baseline file to compare with (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="smallest slowdown over the baseline reported as a regression; noisier cases "
+                             "need more (default: 0.1 = 10%%)")
+    parser.add_argument("--check", action="store_true",
+                        help="exit with status 1 when a benchmark regressed (a report only otherwise)")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--absolute", action="store_true",
+                        help="compare raw times instead of scaling by the reference workload")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="passes over all benchmarks when saving a baseline; their spread sets how much "
+                             "slower a later run may be (default: 5)")
+    parser.add_argument("--repeat", type=int, default=9,
+                        help="timing runs per benchmark, the median is kept (default: 9)")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    if baseline and "ratios" not in baseline:
+        print(f"Note: {args.baseline} has no reference ratios (older format); run with --save-baseline", file=sys.stderr)
+        baseline = None
+    if baseline and baseline.get("python") != platform.python_version():
+        print(f"Note: baseline was recorded with Python {baseline.get('python')}", file=sys.stderr)
+
+    cases = [(name, func) for name, func in build_cases() if args.filter is None or args.filter in name]
+    passes = [{name: measure(func, repeat=args.repeat) for name, func in cases}
+              for _ in range(max(1, args.runs) if args.save_baseline else 1)]
+    results = combine(passes)
+
+    regressions = 0
+    width = max(map(len, results), default=0)
+    for name, ns, base, change, allowed, regressed in compare(results, baseline, args.tolerance, not args.absolute):
+        line = f"{name:<{width}}  {ns / 1000:9.3f} us"
+        if change is not None:
+            line += f"  baseline {base / 1000:9.3f} us  x{change:.2f} (allowed x{1 + allowed:.2f})"
+            if regressed:
+                line += "  REGRESSION"
+                regressions += 1
+        print(line)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, baseline)
+        print(f"Baseline written to {args.baseline}")
+    elif baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+    if regressions:
+        print(f"{regressions} benchmark(s) slower than the baseline by more than their timing noise allows")
+        if args.check:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
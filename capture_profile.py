@@ -0,0 +1,180 @@
+import json
+import os
+import sys
+
+import cv2
+
+from event_log import event_log
+
+PROFILE_STORE = os.path.join(os.path.expanduser("~"), ".config", "airflick", "capture_profiles.json")
+
+# Modes worth trying, roughly in order of preference. Anything much wider than
+# the 640 px used for inference only costs USB bandwidth, decode time and a resize.
+CANDIDATE_SIZES = ((640, 480), (640, 360), (848, 480), (800, 600), (960, 540), (1280, 720), (320, 240))
+CANDIDATE_FOURCCS = ("MJPG", "YUYV")
+TARGET_FPS = 30
+
+
+def fourcc_to_str(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+
+class CaptureProfile:
+    """A capture mode: pixel format, resolution and frame rate"""
+    def __init__(self, fourcc, width, height, fps):
+        self.fourcc = fourcc
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = float(fps)
+
+    @classmethod
+    def read_from(cls, cap):
+        """The mode the driver actually settled on"""
+        return cls(fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)), cap.get(cv2.CAP_PROP_FRAME_WIDTH),
+                   cap.get(cv2.CAP_PROP_FRAME_HEIGHT), cap.get(cv2.CAP_PROP_FPS))
+
+    def apply(self, cap):
+        """Request this mode; returns the mode the driver actually accepted"""
+        if self.fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            cap.set(cv2.CAP_PROP_FPS, self.fps)
+        return CaptureProfile.read_from(cap)
+
+    def score(self, target_width=640):
+        """Lower is better: at least the inference width, as close to it as possible, MJPEG, >= 30 fps"""
+        return (self.width < target_width, abs(self.width - target_width),
+                self.fourcc != "MJPG", self.fps < TARGET_FPS - 1, -self.fps)
+
+    def to_dict(self):
+        return {"fourcc": self.fourcc, "width": self.width, "height": self.height, "fps": self.fps}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["fourcc"], data["width"], data["height"], data["fps"])
+
+    def __eq__(self, other):
+        return isinstance(other, CaptureProfile) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash(tuple(self.to_dict().values()))
+
+    def __str__(self):
+        return f"{self.fourcc or '?'} {self.width}x{self.height}@{self.fps:g}"
+
+
+def device_key(index):
+    """Stable name for a camera so profiles survive re-plugging into another index"""
+    if sys.platform.startswith("linux"):
+        base = f"/sys/class/video4linux/video{index}"
+        try:
+            with open(os.path.join(base, "name")) as f:
+                name = f.read().strip()
+            ids = []
+            for attr in ("idVendor", "idProduct"):
+                path = os.path.join(base, "device", "..", attr)
+                if os.path.exists(path):
+                    with open(path) as f:
+                        ids.append(f.read().strip())
+            return ":".join([name] + ids)
+        except OSError:
+            pass
+    return f"camera-{index}"
+
+
+def load_profiles(path=PROFILE_STORE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_profile(key, profile, path=PROFILE_STORE):
+    profiles = load_profiles(path)
+    profiles[key] = profile.to_dict()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(profiles, f, indent=2)
+    except OSError as e:
+        event_log.warning("camera", "Could not save capture profile: %s", e)
+
+
+def probe_modes(cap):
+    """Try every candidate mode and return the distinct modes the driver accepted"""
+    accepted = []
+    for fourcc in CANDIDATE_FOURCCS:
+        for width, height in CANDIDATE_SIZES:
+            actual = CaptureProfile(fourcc, width, height, TARGET_FPS).apply(cap)
+            if actual.width and actual not in accepted:
+                accepted.append(actual)
+    return accepted
+
+
+def negotiate(cap, target_width=640):
+    """Pick the best accepted mode that actually delivers frames"""
+    for profile in sorted(probe_modes(cap), key=lambda p: p.score(target_width)):
+        if profile.apply(cap) == profile and cap.read()[0]:
+            return profile
+    return None
+
+
+def configure_capture(cap, index=0, target_width=640, reprobe=False, store=PROFILE_STORE):
+    """
+    Apply the saved profile for this device (probing and saving one first if
+    needed) and shrink the driver queue so every read returns the newest frame.
+    Returns the active CaptureProfile.
+    """
+    key = device_key(index)
+    saved = None if reprobe else load_profiles(store).get(key)
+    profile = None
+    if saved:
+        wanted = CaptureProfile.from_dict(saved)
+        if wanted.apply(cap) == wanted:
+            profile = wanted
+        else:
+            event_log.info("camera", "Saved profile %s no longer accepted by %s, probing", wanted, key)
+    if profile is None:
+        profile = negotiate(cap, target_width)
+        if profile is not None:
+            save_profile(key, profile, store)
+    # Fewer queued buffers means less latency between the hand moving and us seeing it
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    active = CaptureProfile.read_from(cap)
+    event_log.info("camera", "%s: capturing %s", key, active)
+    return active
+
+
+def open_capture(index=0, target_width=640, reprobe=False):
+    """cv2.VideoCapture for a camera index with a negotiated capture profile"""
+    cap = cv2.VideoCapture(index)
+    if cap.isOpened():
+        configure_capture(cap, index, target_width, reprobe)
+    return cap
+
+
+class DuplicateFrameFilter:
+    """
+    Skips frames the driver has already delivered. Uses the buffer timestamp
+    (CAP_PROP_POS_MSEC); backends that don't report one are never filtered.
+    """
+    def __init__(self):
+        self.last_timestamp = None
+        self.duplicates = 0
+
+    def is_new(self, cap):
+        timestamp = cap.get(cv2.CAP_PROP_POS_MSEC)
+        if timestamp <= 0:
+            return True
+        if timestamp == self.last_timestamp:
+            self.duplicates += 1
+            return False
+        self.last_timestamp = timestamp
+        return True
+
+    def reset(self):
+        self.last_timestamp = None
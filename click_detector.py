@@ -0,0 +1,181 @@
+import math
+
+from gesture_features import THUMB_TIP, INDEX_TIP, MIDDLE_TIP
+
+PRESS_DISTANCE = 0.04    # Same contact threshold as MouseController.is_left_click
+RELEASE_DISTANCE = 0.06  # Hysteresis: the pinch must open this far to release
+
+
+class ClickLatencyStats:
+    """How far ahead of contact the predictions came, and how many were wrong"""
+    def __init__(self):
+        self.presses = 0
+        self.predicted = 0     # Pinches predicted to reach PRESS_DISTANCE before they did
+        self.confirmed = 0     # Predictions that did reach contact
+        self.mispredicted = 0  # Predictions that opened again without contact (no mouse event was sent)
+        self.total_gain = 0.0
+        self.max_gain = 0.0
+
+    def record_gain(self, gain):
+        self.confirmed += 1
+        self.total_gain += gain
+        self.max_gain = max(self.max_gain, gain)
+
+    @property
+    def mean_gain(self):
+        return self.total_gain / self.confirmed if self.confirmed else 0.0
+
+    def __str__(self):
+        return (f"{self.presses} presses, {self.predicted} predicted "
+                f"({self.confirmed} confirmed, {self.mispredicted} mispredicted), "
+                f"prediction lead mean {self.mean_gain * 1000:.1f}ms max {self.max_gain * 1000:.1f}ms")
+
+
+class PinchTracker:
+    """
+    Press/release state of one thumb-to-finger pinch. Tracks the distance and
+    its closing velocity over time. When the distance is predicted to reach
+    contact by the next frame, and the closing motion is steady and fast
+    enough (``confidence``, 0..1), the pinch is armed ("predict"): feedback
+    can show the click early, but nothing reaches the OS yet. The press
+    itself only goes out on contact, since a press taken back later would
+    still complete a click; a prediction that opens again is dropped
+    ("cancel"). Releases only once the pinch opens past ``release_distance``.
+    """
+    def __init__(self, button, tip, confidence=0.6, press_distance=PRESS_DISTANCE,
+                 release_distance=RELEASE_DISTANCE, stats=None):
+        self.button = button
+        self.tip = tip
+        self.confidence = confidence
+        self.press_distance = press_distance
+        self.release_distance = release_distance
+        self.stats = stats if stats is not None else ClickLatencyStats()
+
+        self.reference_speed = 0.5  # Closing speed (units/s) that counts as fully confident
+        self.steady_frames = 3      # Consecutive closing frames that count as fully confident
+        self.smoothing = 0.5        # EMA weight of the newest velocity sample
+
+        self.pressed = False
+        self.reset()
+
+    def reset(self):
+        """Forget the motion history (the hand was lost)"""
+        self.distance = None
+        self.velocity = 0.0
+        self.frame_interval = None
+        self.closing_frames = 0
+        self.last_time = None
+        self.predicted_at = None  # Time of a prediction still waiting for contact
+
+    def prediction_confidence(self):
+        """0..1: how steady and fast the pinch is closing"""
+        if self.velocity >= 0:
+            return 0.0
+        steadiness = min(1.0, self.closing_frames / self.steady_frames)
+        speed = min(1.0, -self.velocity / self.reference_speed)
+        return steadiness * speed
+
+    @property
+    def armed(self):
+        return self.predicted_at is not None
+
+    def update(self, distance, timestamp, can_press=True):
+        """Feed one frame; returns "predict", "cancel", "press", "release" or None"""
+        if self.last_time is not None and timestamp > self.last_time:
+            dt = timestamp - self.last_time
+            sample = (distance - self.distance) / dt
+            self.velocity += (sample - self.velocity) * self.smoothing
+            self.frame_interval = dt if self.frame_interval is None else self.frame_interval + (dt - self.frame_interval) * 0.1
+            self.closing_frames = self.closing_frames + 1 if sample < 0 else 0
+        self.distance = distance
+        self.last_time = timestamp
+
+        if self.pressed:
+            if distance > self.release_distance:
+                return self._release()
+            return None
+        if not can_press:
+            return self.cancel()
+        if distance < self.press_distance:
+            if self.armed:
+                self.stats.record_gain(timestamp - self.predicted_at)
+                self.predicted_at = None
+            return self._press()
+        if self.armed:
+            # The pinch opened again before touching
+            return self.cancel() if self.velocity > 0 else None
+        if self.frame_interval is not None:
+            predicted = distance + self.velocity * self.frame_interval
+            if predicted < self.press_distance and self.prediction_confidence() >= self.confidence:
+                self.stats.predicted += 1
+                self.predicted_at = timestamp
+                return "predict"
+        return None
+
+    def cancel(self):
+        """Drop a prediction that did not reach contact; returns "cancel", or None when not armed"""
+        if not self.armed:
+            return None
+        self.stats.mispredicted += 1
+        self.predicted_at = None
+        return "cancel"
+
+    def _press(self):
+        self.pressed = True
+        self.stats.presses += 1
+        return "press"
+
+    def _release(self):
+        self.pressed = False
+        return "release"
+
+
+class ClickDetector:
+    """
+    Predictive left (thumb-index) and right (thumb-middle) click detection
+    with separate press and release events, so a held pinch drags.
+    Only one button is armed or held at a time; left wins when both pinches close.
+    """
+    def __init__(self, confidence=0.6, press_distance=PRESS_DISTANCE, release_distance=RELEASE_DISTANCE):
+        self.stats = ClickLatencyStats()
+        self.trackers = tuple(PinchTracker(button, tip, confidence, press_distance, release_distance, self.stats)
+                              for button, tip in (("left", INDEX_TIP), ("right", MIDDLE_TIP)))
+
+    @property
+    def confidence(self):
+        return self.trackers[0].confidence
+
+    @confidence.setter
+    def confidence(self, value):
+        for tracker in self.trackers:
+            tracker.confidence = value
+
+    def update(self, landmarks, timestamp, can_press=True):
+        """
+        Feed one frame of landmarks; returns a list of (action, button) with
+        actions from PinchTracker.update(). Only "press" and "release" are
+        meant for the OS. ``can_press`` False (a scroll gesture has precedence)
+        drops predictions and keeps new presses back; held buttons still release.
+        """
+        thumb = landmarks[THUMB_TIP]
+        held = next((t for t in self.trackers if t.pressed or t.armed), None)
+        events = []
+        for tracker in self.trackers:
+            tip = landmarks[tracker.tip]
+            distance = math.hypot(thumb.x - tip.x, thumb.y - tip.y)
+            # Keep every motion history current, but never arm or press a second button
+            action = tracker.update(distance, timestamp, can_press=can_press and held in (None, tracker))
+            if action:
+                events.append((action, tracker.button))
+                held = tracker if action in ("predict", "press") else None
+        return events
+
+    def release_all(self):
+        """Release whatever is held, drop predictions and forget the motion history (hand lost)"""
+        events = []
+        for tracker in self.trackers:
+            if tracker.pressed:
+                events.append((tracker._release(), tracker.button))
+            tracker.cancel()
+            tracker.reset()
+        return events
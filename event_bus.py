@@ -0,0 +1,280 @@
+import asyncio
+import inspect
+import json
+import threading
+import time
+from collections import Counter, deque, namedtuple
+
+from event_log import event_log
+
+# Typed events published by the frame loop. Timestamps are time.time(), like recordings.
+GestureEvent = namedtuple("GestureEvent", ("timestamp", "gesture"))   # A gesture was performed
+StatusEvent = namedtuple("StatusEvent", ("timestamp", "status"))      # The status line changed
+HandEvent = namedtuple("HandEvent", ("timestamp", "present", "x", "y"))  # Every frame: index fingertip, normalised
+
+DEFAULT_PORT = 50506  # serve(): JSON-lines event stream
+
+# What happens when a subscriber's queue is full
+DROP_OLDEST = "drop_oldest"  # Keep the most recent events (maxsize=1: latest only)
+DROP_NEWEST = "drop_newest"  # Keep the backlog, discard what arrives
+
+
+class Subscription:
+    """
+    One consumer of the bus with its own bounded queue. A slow subscriber only
+    drops its own events (per ``policy``); it never delays the publisher or
+    other subscribers. With a ``handler`` the bus calls it for every event:
+    coroutines are awaited, plain functions run on the bus thread, or in a
+    worker thread with ``in_thread`` when they may block. Without one, read
+    events with ``await subscription.get()`` on the bus loop.
+    """
+    def __init__(self, name, handler=None, types=None, maxsize=64, policy=DROP_OLDEST, in_thread=False):
+        if policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy {policy!r}")
+        self.name = name
+        self.handler = handler
+        self.types = tuple(types) if types else None
+        self.maxsize = maxsize
+        self.policy = policy
+        self.in_thread = in_thread
+        self.delivered = 0
+        self.dropped = 0
+        self.high_water = 0  # Deepest the queue got
+        self._queue = deque()
+        self._ready = None  # asyncio.Event, created on the bus loop
+        self._task = None
+
+    def wants(self, event):
+        return self.types is None or isinstance(event, self.types)
+
+    def _offer(self, event):
+        # Bus thread only
+        queue = self._queue
+        if len(queue) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == DROP_NEWEST:
+                return
+            queue.popleft()
+        queue.append(event)
+        self.high_water = max(self.high_water, len(queue))
+        self._ready.set()
+
+    async def get(self):
+        """Wait for the next event (bus loop only)"""
+        while not self._queue:
+            self._ready.clear()
+            await self._ready.wait()
+        self.delivered += 1
+        return self._queue.popleft()
+
+    async def _run(self):
+        handler = self.handler
+        is_coroutine = inspect.iscoroutinefunction(handler)
+        while True:
+            event = await self.get()
+            try:
+                if is_coroutine:
+                    await handler(event)
+                elif self.in_thread:
+                    await asyncio.to_thread(handler, event)
+                else:
+                    handler(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                event_log.warning("bus", "Subscriber %s failed on %s: %r", self.name, type(event).__name__, e)
+
+    def __str__(self):
+        return (f"{self.name}: {self.delivered} delivered, {self.dropped} dropped ({self.policy}), "
+                f"queue peak {self.high_water}/{self.maxsize}")
+
+
+class EventBus:
+    """
+    Fans events out from the frame loop to subscribers that run on an asyncio
+    loop in a thread of its own.
+
+    ``publish()`` is safe from any thread and never blocks: it appends to an
+    inbox and wakes the bus loop only when it is not already due to run.
+    Should the bus thread itself fall behind, the inbox keeps the newest
+    ``inbox_size`` events and counts the rest in ``inbox_dropped``.
+    """
+    def __init__(self, inbox_size=4096):
+        self.published = 0
+        self.inbox_dropped = 0
+        self.loop = None
+        self._thread = None
+        self._inbox = deque(maxlen=inbox_size)
+        self._wakeup_pending = False
+        self._subscriptions = []
+        self._servers = []
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(started,), name="EventBus", daemon=True)
+        self._thread.start()
+        started.wait()
+        for subscription in list(self._subscriptions):
+            self.loop.call_soon_threadsafe(self._attach, subscription)
+
+    def _run(self, started):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(started.set)
+        self.loop.run_forever()
+        for server in self._servers:
+            server.close()
+        self._servers.clear()
+        # Let cancelled subscriber tasks finish before the loop goes away
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.run_until_complete(self.loop.shutdown_default_executor())
+        self.loop.close()
+
+    def stop(self, timeout=1.0):
+        """Stop the bus thread; queued events that were not delivered are discarded"""
+        if self._thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+        # A wakeup scheduled but never run would keep a restarted bus from ever dispatching again
+        self._inbox.clear()
+        self._wakeup_pending = False
+
+    # ----- subscribers -----
+
+    def subscribe(self, name, handler=None, types=None, maxsize=64, policy=DROP_OLDEST, in_thread=False):
+        """Add a subscriber, see Subscription. Safe from any thread"""
+        subscription = Subscription(name, handler, types, maxsize, policy, in_thread)
+        self._subscriptions.append(subscription)
+        if self.running:
+            self.loop.call_soon_threadsafe(self._attach, subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+            if self.running and subscription._task is not None:
+                self.loop.call_soon_threadsafe(subscription._task.cancel)
+
+    def _attach(self, subscription):
+        subscription._ready = asyncio.Event()
+        if subscription._queue:
+            subscription._ready.set()
+        if subscription.handler is not None:
+            subscription._task = self.loop.create_task(subscription._run())
+
+    # ----- publishing -----
+
+    def publish(self, event):
+        """Queue ``event`` for every interested subscriber. Never blocks"""
+        if self._thread is None:
+            return
+        inbox = self._inbox
+        if len(inbox) == inbox.maxlen:
+            self.inbox_dropped += 1  # The append below pushes out the oldest event
+        inbox.append(event)
+        self.published += 1
+        # One wakeup covers everything published until the bus drains the inbox
+        if not self._wakeup_pending:
+            self._wakeup_pending = True
+            self.loop.call_soon_threadsafe(self._dispatch)
+
+    def _dispatch(self):
+        # Cleared before draining, so an event appended meanwhile either gets drained here or schedules a new wakeup
+        self._wakeup_pending = False
+        inbox = self._inbox
+        subscriptions = [s for s in self._subscriptions if s._ready is not None]
+        while inbox:
+            event = inbox.popleft()
+            for subscription in subscriptions:
+                if subscription.wants(event):
+                    subscription._offer(event)
+
+    # ----- external clients -----
+
+    def serve(self, host="127.0.0.1", port=DEFAULT_PORT, maxsize=256):
+        """
+        Stream events to TCP clients as JSON lines, e.g. ``nc localhost 50506``.
+        Every client gets its own subscription, so a stalled client only drops its own events.
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._serve(host, port, maxsize), self.loop).result()
+
+    async def _serve(self, host, port, maxsize):
+        async def client(reader, writer):
+            peer = writer.get_extra_info("peername")
+            # Already on the bus loop, so attach directly instead of through subscribe()
+            subscription = Subscription(f"client {peer[0]}:{peer[1]}", maxsize=maxsize)
+            self._subscriptions.append(subscription)
+            self._attach(subscription)
+            event_log.info("bus", "Event client connected from %s:%d", *peer[:2])
+            try:
+                while True:
+                    event = await subscription.get()
+                    writer.write(encode_event(event))
+                    await writer.drain()
+            except (ConnectionError, OSError):
+                pass
+            except asyncio.CancelledError:
+                pass  # Bus shutting down; finishing normally keeps asyncio's stream callback quiet
+            finally:
+                self.unsubscribe(subscription)
+                writer.close()
+                event_log.info("bus", "Event client %s:%d disconnected (%s)", peer[0], peer[1], subscription)
+
+        server = await asyncio.start_server(client, host, port)
+        self._servers.append(server)
+        event_log.info("bus", "Serving events on %s:%d", host, port)
+        return server
+
+    def summary(self):
+        return (f"{self.published} published, {self.inbox_dropped} dropped in the inbox; "
+                + "; ".join(str(s) for s in self._subscriptions))
+
+
+def encode_event(event):
+    """One JSON line: {"type": "GestureEvent", "timestamp": ..., ...}"""
+    return (json.dumps({"type": type(event).__name__, **event._asdict()}) + "\n").encode()
+
+
+def log_event(event):
+    """Log subscriber: gestures to the event log, status changes at debug level"""
+    if isinstance(event, GestureEvent):
+        event_log.info("gesture", "%s", event.gesture)
+    elif isinstance(event, StatusEvent):
+        event_log.debug("status", "%s", event.status)
+
+
+class EventMetrics:
+    """Metrics subscriber: counts gestures, status changes and hand frames"""
+    def __init__(self):
+        self.gestures = Counter()
+        self.status_changes = 0
+        self.frames = 0
+        self.hand_frames = 0
+        self.latency_max = 0.0  # Worst publish-to-delivery delay
+
+    def __call__(self, event):
+        self.latency_max = max(self.latency_max, time.time() - event.timestamp)
+        if isinstance(event, HandEvent):
+            self.frames += 1
+            self.hand_frames += event.present
+        elif isinstance(event, GestureEvent):
+            self.gestures[event.gesture] += 1
+        elif isinstance(event, StatusEvent):
+            self.status_changes += 1
+
+    def summary(self):
+        gestures = ", ".join(f"{name}: {count}" for name, count in self.gestures.most_common()) or "none"
+        return (f"{self.frames} frames ({self.hand_frames} with hand), {self.status_changes} status changes, "
+                f"gestures: {gestures}, max delivery delay {1000 * self.latency_max:.1f} ms")
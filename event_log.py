@@ -0,0 +1,173 @@
+import atexit
+import sys
+import threading
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+
+def parse_level(name):
+    """Turn 'debug'/'INFO'/'30' into a numeric level"""
+    if isinstance(name, int):
+        return name
+    name = str(name).strip().upper()
+    if name.isdigit():
+        return int(name)
+    for level, level_name in LEVEL_NAMES.items():
+        if level_name == name:
+            return level
+    raise ValueError(f"Unknown log level: {name}")
+
+
+class EventLog:
+    """
+    Structured event log that is safe to call from the frame loop.
+    ``log()`` only does a level check, a per-category rate-limit check and a
+    ``deque.append``; message formatting and all terminal/file I/O happen on a
+    background flusher thread. When the ring buffer is full the oldest pending
+    events are dropped instead of blocking the caller.
+    """
+    def __init__(self, capacity=2048, level=INFO, flush_interval=0.25, stream=None):
+        self.level = level
+        self.flush_interval = flush_interval
+        self.stream = stream if stream is not None else sys.stdout
+        self.file = None
+
+        self._pending = deque(maxlen=capacity)  # Records not yet written
+        self.history = deque(maxlen=capacity)   # Recently written records, for inspection
+
+        self._category_levels = {}
+        self._min_intervals = {}   # category -> seconds between accepted events
+        self._last_accepted = {}   # category -> monotonic time
+        self._suppressed = {}      # category -> events dropped by the rate limit
+
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()  # Serialises writers (flusher vs. explicit flush)
+
+    # ----- configuration -----
+
+    def set_level(self, level, category=None):
+        """Set the global level, or the level for a single category"""
+        level = parse_level(level)
+        if category is None:
+            self.level = level
+        else:
+            self._category_levels[category] = level
+
+    def set_rate_limit(self, category, per_second):
+        """Accept at most ``per_second`` events per second for ``category`` (None removes the limit)"""
+        if per_second:
+            self._min_intervals[category] = 1.0 / per_second
+        else:
+            self._min_intervals.pop(category, None)
+
+    def open_file(self, path):
+        """Also append every flushed event to ``path``"""
+        self.file = open(path, "a", buffering=1)
+
+    # ----- hot path -----
+
+    def log(self, level, category, message, *args, **fields):
+        """Queue an event. ``message`` is %-formatted with ``args`` on the flusher thread"""
+        if level < self._category_levels.get(category, self.level):
+            return
+        min_interval = self._min_intervals.get(category)
+        if min_interval is not None:
+            now = time.monotonic()
+            if now - self._last_accepted.get(category, -min_interval) < min_interval:
+                self._suppressed[category] = self._suppressed.get(category, 0) + 1
+                return
+            self._last_accepted[category] = now
+        suppressed = self._suppressed.pop(category, 0) if self._suppressed else 0
+        self._pending.append((time.time(), level, category, message, args, fields, suppressed))
+        if self._thread is None:
+            self.start()
+
+    def debug(self, category, message, *args, **fields):
+        self.log(DEBUG, category, message, *args, **fields)
+
+    def info(self, category, message, *args, **fields):
+        self.log(INFO, category, message, *args, **fields)
+
+    def warning(self, category, message, *args, **fields):
+        self.log(WARNING, category, message, *args, **fields)
+
+    def error(self, category, message, *args, **fields):
+        self.log(ERROR, category, message, *args, **fields)
+
+    def is_enabled(self, level, category):
+        """Cheap guard for callers that need to compute expensive fields"""
+        return level >= self._category_levels.get(category, self.level)
+
+    # ----- flushing -----
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="EventLog", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the flusher thread and write out anything still pending"""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Format and write all pending events"""
+        with self._lock:
+            lines = []
+            while self._pending:
+                record = self._pending.popleft()
+                self.history.append(record)
+                lines.append(self.format(record))
+            if not lines:
+                return
+            text = "\n".join(lines) + "\n"
+            try:
+                self.stream.write(text)
+                self.stream.flush()
+                if self.file:
+                    self.file.write(text)
+            except (OSError, ValueError):
+                pass  # Closed terminal / file: never let logging take the app down
+
+    def format(self, record):
+        timestamp, level, category, message, args, fields, suppressed = record
+        if args:
+            try:
+                message = message % args
+            except (TypeError, ValueError):
+                message = f"{message} {args!r}"
+        line = (f"{time.strftime('%H:%M:%S', time.localtime(timestamp))}.{int(timestamp % 1 * 1000):03d} "
+                f"{LEVEL_NAMES.get(level, level)} {category}: {message}")
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if suppressed:
+            line += f" ({suppressed} similar suppressed)"
+        return line
+
+    def recent(self, count=50):
+        """Return the last ``count`` written events as formatted lines"""
+        return [self.format(record) for record in list(self.history)[-count:]]
+
+
+# Shared application-wide log
+event_log = EventLog()
+event_log.set_rate_limit("gesture.screenshot", 2)
+atexit.register(event_log.stop)
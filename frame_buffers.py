@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class FrameBufferPool:
+    """
+    Fixed-size pool of preallocated NumPy buffers, keyed by shape and dtype.
+    Each pipeline stage borrows a buffer and writes into it through OpenCV's
+    ``dst=`` arguments instead of allocating a new array every frame. At most
+    ``buffers_per_shape`` buffers exist per key; if a frame needs more, a plain
+    temporary array is handed out and counted in ``misses``.
+    """
+    def __init__(self, buffers_per_shape=6):
+        self.buffers_per_shape = buffers_per_shape
+        self.misses = 0
+        self._free = {}       # key -> buffers ready for reuse
+        self._allocated = {}  # key -> number of buffers owned by the pool
+        self._owned = set()   # ids of pool buffers, so strangers are never adopted
+
+    @staticmethod
+    def _key(shape, dtype):
+        return tuple(shape), np.dtype(dtype).str
+
+    def acquire(self, shape, dtype=np.uint8):
+        key = self._key(shape, dtype)
+        free = self._free.get(key)
+        if free:
+            return free.pop()
+        if self._allocated.get(key, 0) < self.buffers_per_shape:
+            self._allocated[key] = self._allocated.get(key, 0) + 1
+            buf = np.empty(shape, dtype=dtype)
+            self._owned.add(id(buf))
+            return buf
+        self.misses += 1
+        return np.empty(shape, dtype=dtype)
+
+    def release(self, buf):
+        if id(buf) in self._owned:
+            self._free.setdefault(self._key(buf.shape, buf.dtype), []).append(buf)
+
+    def frame(self):
+        """Lease for one frame; every buffer taken from it is returned when the frame retires"""
+        return FrameLease(self)
+
+    def clear(self):
+        """Drop all buffers, e.g. after the capture resolution changed"""
+        self._free.clear()
+        self._allocated.clear()
+        self._owned.clear()
+
+    def stats(self):
+        """Total pooled bytes and the number of overflow allocations"""
+        pooled = sum(np.prod(shape) * np.dtype(dtype).itemsize * count
+                     for (shape, dtype), count in self._allocated.items())
+        return {"buffers": sum(self._allocated.values()), "bytes": int(pooled), "misses": self.misses}
+
+
+class FrameLease:
+    """Buffers borrowed from a FrameBufferPool for the lifetime of one frame"""
+    __slots__ = ("pool", "buffers")
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.buffers = []
+
+    def get(self, shape, dtype=np.uint8):
+        buf = self.pool.acquire(shape, dtype)
+        self.buffers.append(buf)
+        return buf
+
+    def like(self, array):
+        """Buffer with the same shape and dtype as ``array``"""
+        return self.get(array.shape, array.dtype)
+
+    def release(self):
+        for buf in self.buffers:
+            self.pool.release(buf)
+        self.buffers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
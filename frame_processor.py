@@ -0,0 +1,341 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+from PyQt6.QtCore import QObject, QThread, QTimer, QMetaObject, Qt, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QImage
+
+from capture_profile import DuplicateFrameFilter
+from event_bus import GestureEvent, HandEvent, StatusEvent
+from event_log import event_log
+from frame_buffers import FrameBufferPool
+from frame_sources import create_frame_source
+from gesture_pipeline import GesturePipeline
+from overlay_renderer import Overlay, OverlayRenderer
+from pointer_calibration import save_calibration
+
+
+class FrameProcessor(QObject):
+    """
+    The per-frame engine shared by every front end: capture, lighting filters,
+    hand detection, gestures, landmark recording and the preview image.
+    Runs on its own QThread so detection and pointer injection never wait on
+    the GUI; results are delivered through Qt signals.
+
+    Settings (``is_tracking``, filter flags, ``screenshot_enabled``,
+    ``preview_size``, ``preview_visible``) are plain attributes that the GUI
+    thread may assign at any time.
+    """
+    frame_ready = pyqtSignal(QImage)
+    gesture_detected = pyqtSignal(str)
+    tracking_status_updated = pyqtSignal(str)
+    key_hovered = pyqtSignal(int)     # Hand typing: key under the fingertip (-1 for none)
+    key_typed = pyqtSignal(str)       # Hand typing: label of a key to type
+    calibration_finished = pyqtSignal(dict)  # Camera corners of a completed pointer calibration
+
+    _start_requested = pyqtSignal()
+    _stop_requested = pyqtSignal()
+
+    def __init__(self, hand_detector, mouse_controller, screenshot_trigger=None,
+                 source="0", realtime_source=True, reprobe_camera=False, interval_ms=30):
+        super().__init__()
+        self.hand_detector = hand_detector
+        self.mouse_controller = mouse_controller
+        self.pipeline = GesturePipeline(hand_detector, mouse_controller, screenshot_trigger)
+        self.pipeline.screenshot_enabled = False
+
+        self.source_spec = source
+        self.realtime_source = realtime_source
+        self.reprobe_camera = reprobe_camera
+        self.interval_ms = interval_ms
+        self.cap = None
+
+        self.is_tracking = False
+        self.low_light_filter_enabled = False
+        self.high_light_filter_enabled = False
+        self.recorder = None  # Optional LandmarkRecorder
+        self.stream_sender = None  # Optional LandmarkSender to a controller node
+        self.event_bus = None  # Optional EventBus: gesture, status and hand events for other consumers
+        self.report_idle_status = False  # Also report hand presence while not tracking
+        self.hand_typing = None  # HandTyping while typing on the keyboard; bypasses the pointer
+        self.calibration = None  # CornerCalibration in progress; bypasses the pointer
+        self.idle_monitor = None  # Optional IdleMonitor: low-power capture while nobody is there
+        self.preview_visible = True  # False: nothing is drawn and no preview image is sent
+        self.preview_size = None  # (width, height) the preview is shown at; None for the capture size
+        self._hovered_key = -1
+        self._reset_pending = False
+        self._last_status = None
+
+        # Lighting filter helpers are built once instead of on every frame
+        self.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        self.gamma_luts = {}
+
+        # Per-frame image buffers are borrowed from a fixed pool and written
+        # through OpenCV dst= arguments instead of being allocated every frame
+        self.frame_pool = FrameBufferPool()
+        self.capture_shape = None
+        self.duplicate_filter = DuplicateFrameFilter()
+
+        # Feedback is collected while processing and drawn once, at preview size.
+        # The preview has its own buffers: its size follows the window, and the
+        # pool would keep a set for every size passed through while resizing.
+        self.overlay = Overlay()
+        self.overlay_renderer = OverlayRenderer()
+        self._preview_buffers = None
+
+        # The timer is a child, so it moves to the worker thread with us
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_frame)
+        self.thread_ident = None  # Python thread id of the worker, for the profiler
+        self._thread = QThread()
+        self._thread.setObjectName("FrameProcessor")
+        self.moveToThread(self._thread)
+        self._thread.started.connect(self._thread_started)
+        self._start_requested.connect(self._start)
+        self._stop_requested.connect(self._stop)
+        self._thread.start()
+
+    # ----- control (called from the GUI thread) -----
+
+    @property
+    def screenshot_enabled(self):
+        return self.pipeline.screenshot_enabled
+
+    @screenshot_enabled.setter
+    def screenshot_enabled(self, enabled):
+        self.pipeline.screenshot_enabled = enabled
+
+    def set_tracking(self, tracking):
+        """Start/stop driving the pointer; tracking state is reset on the worker thread"""
+        self.is_tracking = tracking
+        self._reset_pending = True
+
+    def start(self):
+        """Open the frame source and start processing"""
+        self._start_requested.emit()
+
+    def stop(self):
+        """Stop processing and release the frame source"""
+        self._stop_requested.emit()
+
+    def shutdown(self):
+        """Stop synchronously and end the worker thread (call before exiting)"""
+        if self._thread.isRunning():
+            QMetaObject.invokeMethod(self, "_stop", Qt.ConnectionType.BlockingQueuedConnection)
+            self._thread.quit()
+            self._thread.wait()
+
+    def is_running(self):
+        return self.timer.isActive()
+
+    # ----- worker thread -----
+
+    @pyqtSlot()
+    def _thread_started(self):
+        self.thread_ident = threading.get_ident()
+
+    @pyqtSlot()
+    def _start(self):
+        if self.cap is None:
+            # Cameras get a negotiated low-latency capture mode (see capture_profile.py)
+            try:
+                self.cap = create_frame_source(self.source_spec, self.realtime_source, self.reprobe_camera)
+            except ValueError as e:
+                event_log.error("camera", "%s", e)
+                self._emit_status("Error: Camera not found")
+                return
+            self.reprobe_camera = False
+            self.duplicate_filter.reset()
+            if not self.cap.isOpened():
+                event_log.error("camera", "Could not open frame source %s", self.cap)
+                self.cap.release()
+                self.cap = None
+                self._emit_status("Error: Camera not found")
+                return
+            event_log.info("camera", "Frame source: %s", self.cap)
+        if not self.timer.isActive():
+            if self.idle_monitor is not None:
+                self.idle_monitor.start()
+            self.timer.start(self.interval_ms)
+
+    @pyqtSlot()
+    def _stop(self):
+        if self.timer.isActive() and self.idle_monitor is not None:
+            self.idle_monitor.stop()
+        self.timer.stop()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        self._last_status = None
+
+    def _emit_status(self, status):
+        # Only cross the thread boundary when the text actually changes
+        if status is not None and status != self._last_status:
+            self._last_status = status
+            self.tracking_status_updated.emit(status)
+            if self.event_bus is not None:
+                self.event_bus.publish(StatusEvent(time.time(), status))
+
+    def _hover_key(self, index):
+        if index != self._hovered_key:
+            self._hovered_key = index
+            self.key_hovered.emit(index)
+
+    def _type_with_hand(self, hand_typing, hand_landmark, overlay):
+        # The fingertip selects keys directly; no cursor movement or clicks
+        hover, typed = hand_typing.update(hand_landmark.landmark, time.monotonic())
+        self._hover_key(hover)
+        if typed:
+            self.key_typed.emit(typed)
+            self._emit_status(f"Typed: {typed}")
+        else:
+            self._emit_status("Typing: Point at a key")
+        if overlay is not None:
+            overlay.rect(*hand_typing.region, (248, 189, 56))
+
+    def _calibrate(self, calibration, hand_landmark, overlay):
+        tip = hand_landmark.landmark[self.pipeline.index_tip_idx]
+        now = time.monotonic()
+        if calibration.update(tip.x, tip.y, now) and calibration.done:
+            self.calibration = None
+            save_calibration(calibration.corners)
+            if self.mouse_controller.absolute_pointer is not None:
+                self.mouse_controller.absolute_pointer.set_corners(calibration.corners)
+            event_log.info("pointer", "Pointer calibrated: %s", calibration.corners)
+            self.calibration_finished.emit(calibration.corners)
+        self._emit_status(calibration.prompt())
+        # Hold progress as an arc around the fingertip
+        if overlay is not None:
+            overlay.marker(tip.x, tip.y, 18, (255, 255, 255), 2)
+            overlay.arc(tip.x, tip.y, 18, calibration.progress(now), (0, 200, 0))
+
+    def preprocess_for_hand_detection(self, frame, buffers):
+        # CLAHE on the L channel, equalised in place instead of split/merge
+        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB, dst=buffers.like(frame))
+        l = cv2.extractChannel(lab, 0, dst=buffers.get(frame.shape[:2]))
+        cl = self.clahe.apply(l, dst=buffers.get(frame.shape[:2]))
+        cv2.insertChannel(cl, lab, 0)
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=buffers.like(frame))
+
+    def preprocess_for_high_light(self, frame, buffers, gamma=0.75):
+        table = self.gamma_luts.get(gamma)
+        if table is None:
+            invGamma = 1.0 / gamma
+            table = np.array([((i / 255.0) ** invGamma) * 255
+                for i in np.arange(0, 256)]).astype("uint8")
+            self.gamma_luts[gamma] = table
+        return cv2.LUT(frame, table, dst=buffers.like(frame))
+
+    @pyqtSlot()
+    def update_frame(self):
+        if self.cap is None:
+            return
+        # All buffers borrowed while processing go back to the pool when the frame retires
+        with self.frame_pool.frame() as buffers:
+            self.process_frame(buffers)
+
+    def process_frame(self, buffers):
+        # Before anything can return early (idle gate, duplicate frames), so a reset never waits for the hand
+        if self._reset_pending:
+            self._reset_pending = False
+            self.mouse_controller.reset_tracking()
+            # A gesture held before the toggle must not fire the moment tracking resumes
+            self.mouse_controller.gesture_timer.reset()
+
+        capture = buffers.get(self.capture_shape) if self.capture_shape else None
+        ret, frame = self.cap.read(capture)
+        if not ret or not self.duplicate_filter.is_new(self.cap):
+            return
+        frame_time = time.monotonic()  # Gesture timing runs on capture time, not processing time
+        if frame is not capture:
+            # First frame or the camera changed resolution: size the pool from it
+            if self.capture_shape is not None:
+                self.frame_pool.clear()
+            self.capture_shape = frame.shape
+
+        idle_monitor = self.idle_monitor
+        if idle_monitor is not None and idle_monitor.idle:
+            # Only a thumbnail difference runs until something moves
+            if not idle_monitor.check_motion(frame):
+                return
+            self.timer.setInterval(self.interval_ms)
+
+        # Mirror into a pooled buffer for natural interaction
+        frame = cv2.flip(frame, 1, dst=buffers.like(frame))
+
+        if self.low_light_filter_enabled:
+            processed_frame = self.preprocess_for_hand_detection(frame, buffers)
+        elif self.high_light_filter_enabled:
+            processed_frame = self.preprocess_for_high_light(frame, buffers)
+        else:
+            processed_frame = frame
+
+        processed_frame, hand_landmarks = self.hand_detector.find_hands(processed_frame, draw=False, buffers=buffers)
+        gesture = None
+
+        overlay = None
+        if self.preview_visible:
+            overlay = self.overlay
+            overlay.clear()
+            for hand in hand_landmarks or ():
+                overlay.hand(hand)
+
+        hand_typing = self.hand_typing
+        calibration = self.calibration
+        if calibration is not None:
+            if hand_landmarks:
+                self._calibrate(calibration, hand_landmarks[0], overlay)
+            else:
+                calibration.lost_hand()
+                self._emit_status(calibration.prompt())
+        elif self.is_tracking and hand_landmarks and hand_typing is not None:
+            self._type_with_hand(hand_typing, hand_landmarks[0], overlay)
+        elif self.is_tracking and hand_landmarks:
+            gesture, status = self.pipeline.process(hand_landmarks[0], overlay, frame_time)
+            self._emit_status(status)
+            if gesture:
+                self.gesture_detected.emit(gesture)
+                if self.event_bus is not None:
+                    self.event_bus.publish(GestureEvent(time.time(), gesture))
+        elif self.is_tracking:
+            self._emit_status(self.pipeline.no_hand())
+            if hand_typing is not None:
+                hand_typing.reset()
+                self._hover_key(-1)
+        elif self.report_idle_status:
+            self._emit_status("Status: Hand Detected (Tracking Off)" if hand_landmarks
+                              else "Status: No Hand Detected (Tracking Off)")
+
+        if idle_monitor is not None and idle_monitor.update(bool(hand_landmarks) or calibration is not None):
+            self.timer.setInterval(idle_monitor.idle_interval_ms)
+            self._emit_status("Status: Idle (move to wake)")
+
+        if self.event_bus is not None:
+            if hand_landmarks:
+                tip = hand_landmarks[0].landmark[self.pipeline.index_tip_idx]
+                self.event_bus.publish(HandEvent(time.time(), True, tip.x, tip.y))
+            else:
+                self.event_bus.publish(HandEvent(time.time(), False, None, None))
+
+        # Recording and streaming take the same per-frame record
+        for sink in (self.recorder, self.stream_sender):
+            if sink is not None:
+                handedness = self.hand_detector.last_handedness
+                sink.record(hand_landmarks[0] if hand_landmarks else None,
+                            handedness=handedness[0] if handedness else None,
+                            gesture=gesture)
+
+        if overlay is None:
+            return  # Preview hidden: skip drawing, scaling and the colour conversion
+
+        renderer = self.overlay_renderer
+        shape = renderer.preview_shape(processed_frame.shape, self.preview_size) + (3,)
+        if self._preview_buffers is None or self._preview_buffers[0].shape != shape:
+            self._preview_buffers = (np.empty(shape, dtype=np.uint8), np.empty(shape, dtype=np.uint8))
+        scaled, rgb_image = self._preview_buffers
+        preview = renderer.render(processed_frame, overlay, self.preview_size, dst=scaled)
+        cv2.cvtColor(preview, cv2.COLOR_BGR2RGB, dst=rgb_image)
+        h, w, ch = rgb_image.shape
+        # Detach from the reused preview buffer: the GUI thread converts it later
+        self.frame_ready.emit(QImage(rgb_image.data, w, h, w * ch, QImage.Format.Format_RGB888).copy())
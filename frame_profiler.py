@@ -0,0 +1,113 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class FrameProfiler:
+    """
+    Statistical sampling profiler for the frame loop.
+    A background thread snapshots the Python stack of the thread running the
+    frame loop every ``interval`` seconds for a fixed duration. Nothing is hooked
+    into the loop itself, so when no session is running the cost is zero.
+
+    Each session writes two files into ``output_dir``:
+    - ``<name>.folded``: collapsed stacks, one ``frame;frame;frame count`` line
+      per unique stack (flamegraph.pl, speedscope and inferno all read this).
+    - ``<name>.txt``: per-function self/cumulative time table.
+    """
+    def __init__(self, output_dir="profiles", interval=0.005):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.last_output = None  # (folded_path, table_path) of the last session
+        self._thread = None
+        self._stop_event = threading.Event()
+        self.on_finished = None  # Optional callback(folded_path, table_path)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration=10.0, thread_id=None):
+        """Start a sampling session; returns False if one is already running"""
+        if self.is_running():
+            return False
+        if thread_id is None:
+            thread_id = threading.main_thread().ident
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(thread_id, duration), name="FrameProfiler", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """End the current session early; results are still written"""
+        self._stop_event.set()
+
+    def toggle(self, duration=10.0, thread_id=None):
+        """Start a session, or stop the running one. Returns True if started"""
+        if self.is_running():
+            self.stop()
+            return False
+        return self.start(duration, thread_id)
+
+    def _run(self, thread_id, duration):
+        stacks = Counter()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + duration
+        own_frame = sys._getframe()
+
+        while not self._stop_event.is_set() and time.perf_counter() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                break  # Target thread is gone
+            stack = []
+            while frame is not None and frame is not own_frame:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.reverse()
+            stacks[tuple(stack)] += 1
+            samples += 1
+            self._stop_event.wait(self.interval)
+
+        elapsed = time.perf_counter() - started
+        if samples:
+            self.last_output = self._write_results(stacks, samples, elapsed)
+            if self.on_finished:
+                self.on_finished(*self.last_output)
+
+    def _write_results(self, stacks, samples, elapsed):
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = time.strftime("profile-%Y%m%d-%H%M%S")
+        folded_path = os.path.join(self.output_dir, name + ".folded")
+        table_path = os.path.join(self.output_dir, name + ".txt")
+
+        with open(folded_path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(";".join(stack) + f" {count}\n")
+
+        # Wall time represented by one sample (accounts for scheduling jitter)
+        sample_time = elapsed / samples
+        self_counts = Counter()
+        cumulative_counts = Counter()
+        for stack, count in stacks.items():
+            if not stack:
+                continue
+            self_counts[stack[-1]] += count
+            # Recursive functions are only counted once per sample
+            for func in set(stack):
+                cumulative_counts[func] += count
+
+        with open(table_path, "w") as f:
+            f.write(f"Samples: {samples}  Duration: {elapsed:.2f}s  "
+                    f"Interval: {sample_time * 1000:.2f}ms\n\n")
+            f.write(f"{'cumulative':>12} {'cum%':>6} {'self':>10} {'self%':>6}  function\n")
+            for func, count in cumulative_counts.most_common():
+                self_count = self_counts.get(func, 0)
+                f.write(f"{count * sample_time:11.3f}s {100.0 * count / samples:5.1f}% "
+                        f"{self_count * sample_time:9.3f}s {100.0 * self_count / samples:5.1f}%  {func}\n")
+
+        return folded_path, table_path
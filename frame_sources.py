@@ -0,0 +1,220 @@
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+from capture_profile import open_capture
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+
+class FrameSource:
+    """
+    Where frames come from. Implements the part of cv2.VideoCapture the frame
+    loop uses (read/isOpened/release/get), so a source can be used anywhere a
+    capture object was used before.
+    """
+    name = "source"
+
+    def read(self, image=None):
+        """Return (ok, frame); writes into ``image`` when its shape matches"""
+        raise NotImplementedError
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+    def get(self, prop):
+        return 0.0
+
+    def __str__(self):
+        return self.name
+
+
+class _Pacer:
+    """Maps wall-clock time to a frame index for real-time playback"""
+    def __init__(self, fps, realtime):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.realtime = realtime
+        self.started = None
+
+    def due_index(self, next_index):
+        """Index of the frame that should be shown now (``next_index`` when not pacing)"""
+        if not self.realtime:
+            return next_index
+        now = time.monotonic()
+        if self.started is None:
+            self.started = now - next_index / self.fps
+        return int((now - self.started) * self.fps)
+
+
+def _into(image, frame):
+    """Copy ``frame`` into the caller's buffer when possible"""
+    if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+        np.copyto(image, frame)
+        return image
+    return frame
+
+
+class DeviceSource(FrameSource):
+    """A camera by index (V4L2 on Linux) with a negotiated capture profile"""
+    def __init__(self, index=0, reprobe=False):
+        self.name = f"device:{index}"
+        self.cap = open_capture(index, reprobe=reprobe)
+
+    def read(self, image=None):
+        return self.cap.read(image)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+
+class VideoFileSource(FrameSource):
+    """
+    A video file. With real-time pacing frames are skipped or withheld to follow
+    the file's frame rate; otherwise every read returns the next frame.
+    """
+    def __init__(self, path, realtime=True, loop=True):
+        self.name = f"file:{path}"
+        self.cap = cv2.VideoCapture(path)
+        self.loop = loop
+        self.pacer = _Pacer(self.cap.get(cv2.CAP_PROP_FPS), realtime)
+        self.next_index = 0
+
+    def read(self, image=None):
+        due = self.pacer.due_index(self.next_index)
+        if due < self.next_index:
+            return False, None  # Called early, the next frame isn't due yet
+        while self.next_index < due:
+            if not self.cap.grab():
+                break
+            self.next_index += 1
+        ok, frame = self.cap.read(image)
+        if not ok and self.loop and self.next_index > 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self.next_index = 0
+            self.pacer.started = None
+            ok, frame = self.cap.read(image)
+        if ok:
+            self.next_index += 1
+        return ok, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+
+class ImageDirectorySource(FrameSource):
+    """Images in a directory, in file name order, played back as a video"""
+    def __init__(self, path, fps=30.0, realtime=True, loop=True):
+        self.name = f"dir:{path}"
+        self.paths = sorted(p for p in glob.glob(os.path.join(path, "*"))
+                            if p.lower().endswith(IMAGE_EXTENSIONS))
+        self.loop = loop
+        self.pacer = _Pacer(fps, realtime)
+        self.next_index = 0
+        self.position_ms = 0.0
+
+    def read(self, image=None):
+        if not self.paths:
+            return False, None
+        due = self.pacer.due_index(self.next_index)
+        if due < self.next_index:
+            return False, None
+        if due >= len(self.paths):
+            if not self.loop:
+                return False, None
+            due %= len(self.paths)
+            self.pacer.started = None
+        frame = cv2.imread(self.paths[due])
+        if frame is None:
+            return False, None
+        self.next_index = due + 1
+        self.position_ms = due * 1000.0 / self.pacer.fps
+        return True, _into(image, frame)
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.position_ms
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.paths))
+        return 0.0
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generated frames (a moving skin-toned blob on a dark background) for load
+    tests on machines without a camera. Frames are drawn straight into the
+    caller's buffer, so the source itself costs almost nothing per frame.
+    """
+    def __init__(self, width=640, height=480, fps=30.0, realtime=True):
+        self.name = f"synthetic:{width}x{height}"
+        self.width = width
+        self.height = height
+        self.pacer = _Pacer(fps, realtime)
+        self.next_index = 0
+
+    def read(self, image=None):
+        due = self.pacer.due_index(self.next_index)
+        if due < self.next_index:
+            return False, None
+        shape = (self.height, self.width, 3)
+        if image is None or image.shape != shape or image.dtype != np.uint8:
+            image = np.empty(shape, dtype=np.uint8)
+        image[:] = (42, 23, 15)
+        t = due / self.pacer.fps
+        center = (int(self.width * (0.5 + 0.3 * np.cos(t * 1.3))), int(self.height * (0.5 + 0.3 * np.sin(t * 2.1))))
+        cv2.circle(image, center, min(self.width, self.height) // 8, (140, 170, 225), -1)
+        self.next_index = due + 1
+        return True, image
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.next_index * 1000.0 / self.pacer.fps
+        if prop == cv2.CAP_PROP_FPS:
+            return self.pacer.fps
+        return 0.0
+
+
+def create_frame_source(spec="0", realtime=True, reprobe=False):
+    """
+    Build a source from a spec string:
+    ``0`` / ``device:0`` camera index, ``file:clip.mp4`` or a video path,
+    ``dir:frames/`` or a directory path, ``synthetic`` / ``synthetic:1280x720``.
+    """
+    spec = str(spec)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, realtime=realtime)
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, realtime=realtime)
+    kind, _, target = spec.partition(":")
+    if kind.isdigit() and not target:
+        return DeviceSource(int(kind), reprobe)
+    if kind == "device":
+        return DeviceSource(int(target or 0), reprobe)
+    if kind == "synthetic":
+        width, height = (int(v) for v in target.split("x")) if target else (640, 480)
+        return SyntheticSource(width, height, realtime=realtime)
+    if kind == "dir":
+        return ImageDirectorySource(target, realtime=realtime)
+    if kind == "file":
+        return VideoFileSource(target, realtime=realtime)
+    raise ValueError(f"Unknown frame source: {spec}")
@@ -0,0 +1,67 @@
+import numpy as np
+
+# Landmark indices (same numbering as mp.solutions.hands.HandLandmark)
+WRIST = 0
+THUMB_MCP, THUMB_IP, THUMB_TIP = 2, 3, 4
+INDEX_MCP, INDEX_PIP, INDEX_DIP, INDEX_TIP = 5, 6, 7, 8
+MIDDLE_MCP, MIDDLE_TIP = 9, 12
+RING_MCP, RING_TIP = 13, 16
+PINKY_MCP, PINKY_TIP = 17, 20
+
+FINGERTIPS = (THUMB_TIP, INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP)
+FINGER_TIPS_AND_MCPS = ((INDEX_TIP, INDEX_MCP), (MIDDLE_TIP, MIDDLE_MCP), (RING_TIP, RING_MCP), (PINKY_TIP, PINKY_MCP))
+
+# Vectorised equivalents of the per-landmark predicates in HandDetector,
+# MouseController and ScreenshotTrigger. Every function takes a (..., 21, 3)
+# array and returns one value per hand, using the same x/y-only geometry as
+# the originals so thresholds carry over unchanged.
+
+
+def pinch_distance(points, tip):
+    """Thumb tip to ``tip`` distance (MouseController.is_left_click/is_right_click use < 0.04)"""
+    delta = points[..., THUMB_TIP, :2] - points[..., tip, :2]
+    return np.sqrt(np.einsum("...i,...i->...", delta, delta))
+
+
+def joint_angle(points, a, b, c):
+    """Angle at ``b`` in degrees (HandDetector.calculate_angle_between_points)"""
+    v1 = points[..., a, :2] - points[..., b, :2]
+    v2 = points[..., c, :2] - points[..., b, :2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cosine = np.einsum("...i,...i->...", v1, v2) / (np.linalg.norm(v1, axis=-1) * np.linalg.norm(v2, axis=-1))
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+def index_straightness(points):
+    """Smaller of the two index finger joint angles (is_index_finger_straight uses > 175)"""
+    return np.minimum(joint_angle(points, INDEX_TIP, INDEX_DIP, INDEX_PIP),
+                      joint_angle(points, INDEX_DIP, INDEX_PIP, INDEX_MCP))
+
+
+def fingertip_spread(points):
+    """Largest pairwise fingertip distance (ScreenshotTrigger.is_all_fingers_pinch uses < 0.1)"""
+    tips = points[..., FINGERTIPS, :2]
+    delta = tips[..., :, None, :] - tips[..., None, :, :]
+    return np.sqrt(np.einsum("...ijk,...ijk->...ij", delta, delta)).max(axis=(-2, -1))
+
+
+def fingers_folded(points):
+    """Index..pinky tips below their MCP joints (shared part of is_thumbs_up/is_thumbs_down)"""
+    folded = np.ones(points.shape[:-2], dtype=bool)
+    for tip, mcp in FINGER_TIPS_AND_MCPS:
+        folded &= points[..., tip, 1] > points[..., mcp, 1]
+    return folded
+
+
+def thumbs_up(points, folded=None):
+    """HandDetector.is_thumbs_up (``folded``: a precomputed fingers_folded())"""
+    y = points[..., 1]
+    folded = fingers_folded(points) if folded is None else folded
+    return (y[..., THUMB_TIP] < y[..., THUMB_IP]) & (y[..., THUMB_IP] < y[..., THUMB_MCP]) & folded
+
+
+def thumbs_down(points, folded=None):
+    """HandDetector.is_thumbs_down (``folded``: a precomputed fingers_folded())"""
+    y = points[..., 1]
+    folded = fingers_folded(points) if folded is None else folded
+    return (y[..., THUMB_TIP] > y[..., THUMB_IP]) & (y[..., THUMB_IP] > y[..., THUMB_MCP]) & folded
@@ -0,0 +1,54 @@
+class GesturePipeline:
+    """
+    Turns one detected hand into pointer movement, clicks, scrolls and the
+    screenshot gesture. This is the only place the gating between gestures
+    lives: the live FrameProcessor and the landmark replayer both call it.
+    """
+    def __init__(self, hand_detector, mouse_controller, screenshot_trigger=None):
+        self.hand_detector = hand_detector
+        self.mouse_controller = mouse_controller
+        self.screenshot_trigger = screenshot_trigger
+        self.screenshot_enabled = screenshot_trigger is not None
+        self.index_tip_idx = hand_detector.mp_hands.HandLandmark.INDEX_FINGER_TIP
+
+    def process(self, hand_landmark, overlay=None, timestamp=None):
+        """
+        Handle a detected hand. Returns (gesture, status): the gesture performed
+        on this frame (or None) and a status line for the UI.
+        ``overlay`` collects visual feedback when given (see overlay_renderer);
+        ``timestamp`` is the frame's capture time in seconds and drives gesture timing.
+        """
+        detector = self.hand_detector
+        landmarks = hand_landmark.landmark
+        gesture = None
+        status = None
+
+        if not (detector.is_thumbs_up(landmarks) or detector.is_thumbs_down(landmarks)):
+            if (self.screenshot_enabled and self.screenshot_trigger is not None
+                    and self.screenshot_trigger.check_and_trigger(landmarks)):
+                gesture = "Screenshot"
+                if overlay is not None:
+                    overlay.label("SCREENSHOT", (20, 50), (255, 255, 255), 1.2, 3, background=(0, 200, 0))
+
+            if detector.is_index_finger_straight(landmarks):
+                index_tip = landmarks[self.index_tip_idx]
+                self.mouse_controller.move_pointer(index_tip.x, index_tip.y)
+                status = "Tracking: Index Finger"
+                if overlay is not None:
+                    overlay.marker(index_tip.x, index_tip.y, 15, (0, 255, 0))
+            else:
+                self.mouse_controller.reset_tracking()
+                status = "Gesture: Index Finger Folded"
+
+        _, detected = self.mouse_controller.detect_gestures(overlay, hand_landmark, timestamp)
+        if detected:
+            gesture = detected
+            status = f"Gesture: {detected}"
+        return gesture, status
+
+    def no_hand(self):
+        """Handle a frame without a hand; returns the status line"""
+        self.mouse_controller.reset_tracking()
+        self.mouse_controller.release_buttons()
+        self.mouse_controller.gesture_timer.reset()
+        return "Gesture: Hand not detected"
@@ -0,0 +1,104 @@
+from collections import namedtuple
+
+# Per-gesture timing in milliseconds:
+# hold_ms     - how long the gesture must be seen before it fires
+# repeat_ms   - interval of further firings while it is held (None: once per hold)
+# cooldown_ms - minimum time from one firing to the next new hold firing
+GestureTiming = namedtuple("GestureTiming", ("hold_ms", "repeat_ms", "cooldown_ms"))
+
+# A 30 ms hold is the one-frame confirmation the frame-counted version gave at
+# 30 fps; scrolling repeats at the ~33 ms cadence of one wheel step per frame.
+DEFAULT_TIMINGS = {
+    "Left Click": GestureTiming(hold_ms=30.0, repeat_ms=None, cooldown_ms=100.0),
+    "Right Click": GestureTiming(hold_ms=30.0, repeat_ms=None, cooldown_ms=100.0),
+    "Scroll Up": GestureTiming(hold_ms=30.0, repeat_ms=33.0, cooldown_ms=0.0),
+    "Scroll Down": GestureTiming(hold_ms=30.0, repeat_ms=33.0, cooldown_ms=0.0),
+}
+
+IDLE = "idle"
+HOLDING = "holding"
+ACTIVE = "active"
+
+
+class GestureState:
+    """
+    State machine of one gesture, driven by frame timestamps:
+    idle -> holding (seen, waiting ``hold_ms``) -> active (fired, repeating
+    every ``repeat_ms``) -> idle when the gesture is no longer seen.
+    Because only timestamp differences matter, latency and repeat rate are
+    the same at any frame rate; a slow frame catches up on missed repeats
+    (at most ``max_catch_up``) instead of stretching the interval.
+    """
+    def __init__(self, timing, max_catch_up=4):
+        self.timing = timing
+        self.max_catch_up = max_catch_up
+        self.state = IDLE
+        self.since = None            # Start of the current hold (ms)
+        self.next_repeat = None
+        self.cooldown_until = float("-inf")
+
+    def reset(self):
+        self.state = IDLE
+        self.since = None
+        self.next_repeat = None
+
+    def update(self, present, now_ms):
+        """Report whether the gesture is seen at ``now_ms``. Returns how many times it fires"""
+        if not present:
+            if self.state != IDLE:
+                self.reset()
+            return 0
+        timing = self.timing
+        if self.state == IDLE:
+            self.state = HOLDING
+            self.since = now_ms
+        if self.state == HOLDING:
+            if now_ms - self.since < timing.hold_ms or now_ms < self.cooldown_until:
+                return 0
+            self.state = ACTIVE
+            self.cooldown_until = now_ms + timing.cooldown_ms
+            if timing.repeat_ms:
+                self.next_repeat = now_ms + timing.repeat_ms
+            return 1
+        # Active: repeat on a fixed timestamp grid while held
+        if not timing.repeat_ms or now_ms < self.next_repeat:
+            return 0
+        due = int((now_ms - self.next_repeat) // timing.repeat_ms) + 1
+        self.next_repeat += due * timing.repeat_ms
+        return min(due, self.max_catch_up)
+
+    @property
+    def active(self):
+        return self.state == ACTIVE
+
+
+class GestureTimer:
+    """
+    Hold, repeat and cooldown for every timed gesture. ``update()`` takes the
+    gesture seen on a frame (or None) and its timestamp and returns how many
+    times that gesture fires on this frame.
+    """
+    def __init__(self, timings=None):
+        self.states = {name: GestureState(timing) for name, timing in (timings or DEFAULT_TIMINGS).items()}
+
+    def update(self, gesture, now_ms):
+        fired = 0
+        for name, state in self.states.items():
+            count = state.update(name == gesture, now_ms)
+            if name == gesture:
+                fired = count
+        return fired
+
+    def is_active(self, gesture):
+        state = self.states.get(gesture)
+        return state is not None and state.active
+
+    def set_timing(self, gesture, **changes):
+        """Change part of a gesture's timing, e.g. ``set_timing("Scroll Up", repeat_ms=50)``"""
+        state = self.states[gesture]
+        state.timing = state.timing._replace(**changes)
+
+    def reset(self):
+        """Forget held gestures (the hand was lost); cooldowns still apply"""
+        for state in self.states.values():
+            state.reset()
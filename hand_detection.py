@@ -1,14 +1,15 @@
+import math
 import cv2
 import mediapipe as mp
 import numpy as np
 
+from overlay_renderer import OverlayRenderer
+
 class HandDetector:
     def __init__(self, static_image_mode=False, max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.7):
         self.mp_hands = mp.solutions.hands
-        self.mp_draw = mp.solutions.drawing_utils
-        
-        # Reduce complexity of drawing to save memory
-        self.drawing_spec = self.mp_draw.DrawingSpec(thickness=1, circle_radius=1)
+        # Draws the landmarks for find_hands(draw=True) in two OpenCV calls instead of mp_drawing's Python loop
+        self.renderer = OverlayRenderer()
         
         # Configure hands - use static image mode for memory efficiency if not tracking motion
         self.hands = self.mp_hands.Hands(
@@ -20,8 +21,15 @@ class HandDetector:
             model_complexity=0
         )
 
-    def find_hands(self, frame, draw=True):
-        """Process frame and return hand landmarks if found"""
+        # "Left"/"Right" label of each hand found by the last find_hands call
+        self.last_handedness = None
+
+    def find_hands(self, frame, draw=True, buffers=None):
+        """
+        Process frame and return hand landmarks if found.
+        ``buffers`` is an optional FrameLease to take the resize/RGB buffers from.
+        The live loop passes ``draw=False`` and draws the landmarks on the preview instead.
+        """
         # Process the frame with lower resolution to save memory
         h, w = frame.shape[:2]
         # Only resize if the frame is large
@@ -29,27 +37,26 @@ class HandDetector:
             # Process a smaller image for detection (faster and less memory intensive)
             process_w = 640
             process_h = int(h * (process_w / w))
-            small_frame = cv2.resize(frame, (process_w, process_h))
-            frame_rgb = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
+            small_frame = cv2.resize(frame, (process_w, process_h),
+                                     dst=buffers.get((process_h, process_w, 3)) if buffers else None)
+            frame_rgb = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB, dst=buffers.like(small_frame) if buffers else None)
         else:
             # If already small, just convert color
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buffers.like(frame) if buffers else None)
         
         # Set image data to writeable to avoid copying memory
         frame_rgb.flags.writeable = False
         result = self.hands.process(frame_rgb)
         frame_rgb.flags.writeable = True
         
+        if result.multi_handedness:
+            self.last_handedness = [h.classification[0].label for h in result.multi_handedness]
+        else:
+            self.last_handedness = None
+
         if result.multi_hand_landmarks:
-            for hand_landmarks in result.multi_hand_landmarks:
-                if draw:
-                    self.mp_draw.draw_landmarks(
-                        frame,
-                        hand_landmarks,
-                        self.mp_hands.HAND_CONNECTIONS,
-                        self.drawing_spec,  # Use simplified drawing specs
-                        self.drawing_spec
-                    )
+            if draw:
+                self.renderer.draw_hands(frame, result.multi_hand_landmarks)
             return frame, result.multi_hand_landmarks
         return frame, None
     
@@ -142,29 +149,21 @@ class HandDetector:
         Calculate the angle in degrees between three points
         The angle is calculated at point2
         """
-        # Simpler calculation using only x, y coordinates to save processing power
-        p1 = np.array([point1.x, point1.y])
-        p2 = np.array([point2.x, point2.y])
-        p3 = np.array([point3.x, point3.y])
+        # Simpler calculation using only x, y coordinates to save processing power.
+        # Plain float math: this runs twice per frame and numpy temporaries
+        # cost more than the arithmetic itself.
+        v1x, v1y = point1.x - point2.x, point1.y - point2.y
+        v2x, v2y = point3.x - point2.x, point3.y - point2.y
         
-        # Calculate two vectors
-        v1 = p1 - p2
-        v2 = p3 - p2
+        norm = math.hypot(v1x, v1y) * math.hypot(v2x, v2y)
+        if norm == 0:
+            return float("nan")  # Degenerate joint, never counts as straight
         
-        # Normalize vectors
-        v1 = v1 / np.linalg.norm(v1)
-        v2 = v2 / np.linalg.norm(v2)
-        
-        # Calculate dot product
-        dot_product = np.dot(v1, v2)
-        
-        # Clamp to avoid numerical errors
-        dot_product = np.clip(dot_product, -1.0, 1.0)
+        # Calculate dot product of the normalized vectors, clamped to avoid numerical errors
+        dot_product = max(-1.0, min(1.0, (v1x * v2x + v1y * v2y) / norm))
         
         # Calculate angle in degrees
-        angle = np.arccos(dot_product) * 180.0 / np.pi
-        
-        return angle
+        return math.degrees(math.acos(dot_product))
         
     def is_index_finger_only(self, landmarks):
         """
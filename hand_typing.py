@@ -0,0 +1,94 @@
+import numpy as np
+
+from click_detector import PinchTracker
+from gesture_features import INDEX_TIP, THUMB_TIP
+from virtual_keyboard import KeyboardGeometry
+
+# Part of the (mirrored) camera frame that maps onto the keyboard, as
+# normalised (left, top, right, bottom)
+DEFAULT_REGION = (0.1, 0.3, 0.9, 0.8)
+
+
+def build_key_lookup(geometry, rows, cols):
+    """
+    (rows, cols) table of key indices covering the keyboard. Each cell takes
+    the key nearest to its centre, so the gaps between keys snap to a
+    neighbour instead of dropping the hover.
+    """
+    ys = (np.arange(rows) + 0.5) * geometry.height / rows
+    xs = (np.arange(cols) + 0.5) * geometry.width / cols
+    rects = np.array([(r.left(), r.top(), r.left() + r.width(), r.top() + r.height()) for r in geometry.rects], dtype=float)
+    # Distance from every cell centre to every key rectangle (0 inside it)
+    dx = np.maximum(np.maximum(rects[:, 0, None] - xs, xs - rects[:, 2, None]), 0)  # (keys, cols)
+    dy = np.maximum(np.maximum(rects[:, 1, None] - ys, ys - rects[:, 3, None]), 0)  # (keys, rows)
+    distance = dy[:, :, None] ** 2 + dx[:, None, :] ** 2                              # (keys, rows, cols)
+    return np.argmin(distance, axis=0).astype(np.int16)
+
+
+class HandTyping:
+    """
+    Types on the virtual keyboard straight from the index fingertip, without
+    moving the OS cursor. The fingertip's position in ``region`` of the frame
+    indexes a precomputed key table; a key is typed by pinching thumb and
+    index (``mode="pinch"``) or by resting on it for ``dwell_time`` seconds
+    (``mode="dwell"``).
+    """
+    def __init__(self, geometry=None, mode="pinch", region=DEFAULT_REGION, resolution=(64, 192),
+                 dwell_time=0.6, confidence=0.6):
+        self.geometry = geometry if geometry is not None else KeyboardGeometry()
+        self.mode = mode
+        self.region = region
+        self.dwell_time = dwell_time
+        self.closing_speed = 0.15  # Pinch closing faster than this (units/s) freezes the key choice
+        self.rows, self.cols = resolution
+        self.lookup = build_key_lookup(self.geometry, self.rows, self.cols)
+        # Pinch press/release with hysteresis and onset prediction, as for clicks
+        self.pinch = PinchTracker("type", INDEX_TIP, confidence=confidence)
+        self.reset()
+
+    def reset(self):
+        self.hover = -1
+        self.armed = -1          # Key selected before the pinch started closing
+        self.dwell_key = -1
+        self.dwell_since = None
+        self.pinch.pressed = False
+        self.pinch.reset()
+
+    def key_at(self, x, y):
+        """Key index under normalised frame position (x, y), -1 outside the region"""
+        left, top, right, bottom = self.region
+        u = (x - left) / (right - left)
+        v = (y - top) / (bottom - top)
+        if not (0.0 <= u < 1.0 and 0.0 <= v < 1.0):
+            return -1
+        return int(self.lookup[int(v * self.rows), int(u * self.cols)])
+
+    def update(self, landmarks, timestamp):
+        """
+        Feed one frame of landmarks. Returns (highlighted key index or -1,
+        label of the key typed on this frame or None).
+        """
+        tip = landmarks[INDEX_TIP]
+        self.hover = self.key_at(tip.x, tip.y)
+        if self.mode == "dwell":
+            return self.hover, self._dwell(timestamp)
+
+        thumb = landmarks[THUMB_TIP]
+        action = self.pinch.update(float(np.hypot(thumb.x - tip.x, thumb.y - tip.y)), timestamp)
+        closing = self.pinch.pressed or self.pinch.velocity < -self.closing_speed
+        if not closing:
+            # Pinching moves the fingertip, so the key is chosen before the pinch closes
+            self.armed = self.hover
+        if action == "press" and self.armed >= 0:
+            return self.armed, self.geometry.labels[self.armed]
+        return (self.armed if closing else self.hover), None
+
+    def _dwell(self, timestamp):
+        if self.hover != self.dwell_key:
+            self.dwell_key = self.hover
+            self.dwell_since = timestamp
+            return None
+        if self.hover >= 0 and timestamp - self.dwell_since >= self.dwell_time:
+            self.dwell_since = timestamp  # Keep resting to type the key again
+            return self.geometry.labels[self.hover]
+        return None
@@ -0,0 +1,120 @@
+import time
+
+import cv2
+import numpy as np
+
+from event_log import event_log
+
+ACTIVE = "active"
+IDLE = "idle"
+
+
+class IdleMonitor:
+    """
+    Decides when the frame loop can drop to a low-power idle state.
+
+    After ``idle_after`` seconds without a detected hand the loop goes idle:
+    frames are read only every ``idle_interval_ms`` and, instead of hand
+    detection, each one is shrunk to a small grayscale thumbnail and compared
+    with the previous one. When enough of the thumbnail changes, full-rate
+    processing resumes. Time spent in each state is accumulated for reporting.
+    """
+    def __init__(self, idle_after=10.0, idle_interval_ms=250, thumbnail_size=(32, 24),
+                 pixel_threshold=12, motion_fraction=0.02, clock=time.monotonic):
+        self.idle_after = idle_after
+        self.idle_interval_ms = idle_interval_ms
+        self.thumbnail_size = thumbnail_size  # (width, height)
+        self.pixel_threshold = pixel_threshold  # Grey-level change that counts a thumbnail pixel as changed
+        self.motion_fraction = motion_fraction  # Share of changed pixels that counts as motion
+        self.clock = clock
+
+        width, height = thumbnail_size
+        self._small = np.empty((height, width, 3), dtype=np.uint8)
+        self._thumbs = [np.empty((height, width), dtype=np.uint8) for _ in range(2)]
+        self._diff = np.empty((height, width), dtype=np.uint8)
+        self._have_thumb = False
+
+        self.state = ACTIVE
+        self.time_in = {ACTIVE: 0.0, IDLE: 0.0}
+        self.transitions = 0  # Times the loop went idle
+        self._since = None       # Start of the current state span (None while stopped)
+        self._last_hand = None
+
+    @property
+    def idle(self):
+        return self.state == IDLE
+
+    def start(self):
+        """The frame loop (re)started: begin in the active state"""
+        now = self.clock()
+        self.state = ACTIVE
+        self._since = now
+        self._last_hand = now
+        self._have_thumb = False
+
+    def stop(self):
+        """The frame loop stopped: close the current time span"""
+        if self._since is not None:
+            self.time_in[self.state] += self.clock() - self._since
+            self._since = None
+
+    def _enter(self, state, now):
+        if self._since is not None:
+            self.time_in[self.state] += now - self._since
+        self._since = now
+        self.state = state
+
+    def update(self, hand_present):
+        """
+        Report whether a hand was detected on an active frame. Returns True
+        when this frame sends the loop idle.
+        """
+        now = self.clock()
+        if hand_present or self._last_hand is None:
+            self._last_hand = now
+            return False
+        if self.state == ACTIVE and now - self._last_hand >= self.idle_after:
+            self._enter(IDLE, now)
+            self.transitions += 1
+            self._have_thumb = False
+            event_log.info("idle", "No hand for %gs, idling at %d ms per frame", self.idle_after, self.idle_interval_ms)
+            return True
+        return False
+
+    def check_motion(self, frame):
+        """
+        Compare an idle frame's thumbnail with the previous one. Returns True
+        (and switches back to active) when motion is seen.
+        """
+        cv2.resize(frame, self.thumbnail_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        current, previous = self._thumbs
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=current)
+        self._thumbs.reverse()
+        if not self._have_thumb:
+            self._have_thumb = True
+            return False
+        cv2.absdiff(current, previous, dst=self._diff)
+        changed = cv2.countNonZero(cv2.threshold(self._diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self._diff)[1])
+        if changed < self.motion_fraction * self._diff.size or self.state == ACTIVE:
+            return False
+        now = self.clock()
+        self._enter(ACTIVE, now)
+        self._last_hand = now  # Give the hand idle_after seconds to appear
+        event_log.info("idle", "Motion detected, resuming full-rate tracking")
+        return True
+
+    def totals(self):
+        """{state: seconds}, including the current span"""
+        totals = dict(self.time_in)
+        if self._since is not None:
+            totals[self.state] += self.clock() - self._since
+        return totals
+
+    def summary(self):
+        totals = self.totals()
+        overall = sum(totals.values())
+        if not overall:
+            return "not started"
+        return (f"active {totals[ACTIVE]:.0f}s ({100 * totals[ACTIVE] / overall:.0f}%), "
+                f"idle {totals[IDLE]:.0f}s ({100 * totals[IDLE] / overall:.0f}%), "
+                f"{self.transitions} idle periods")
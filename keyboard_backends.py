@@ -0,0 +1,264 @@
+import queue
+import threading
+
+from event_log import event_log
+
+try:
+    import evdev
+    from evdev import ecodes
+except ImportError:  # Linux-only, optional
+    evdev = None
+
+# Key names follow pyautogui ("backspace", "enter", "printscreen", "command", ...);
+# anything else of length one is typed as a character.
+KEY_ALIASES = {
+    "return": "enter",
+    "escape": "esc",
+    "prtsc": "printscreen",
+    "print_screen": "printscreen",
+    "cmd": "command",
+    "win": "command",
+    "control": "ctrl",
+}
+
+
+def normalize_key(key):
+    key = key.lower() if len(key) > 1 else key
+    return KEY_ALIASES.get(key, key)
+
+
+class KeyboardBackend:
+    """
+    Injects keystrokes without blocking the caller and without artificial
+    pauses. Calls are queued and a worker thread drains everything that has
+    piled up in one batch, so a burst of keys costs one wakeup instead of one
+    sleep per key (pyautogui sleeps ``PAUSE``, 0.1 s, after every call).
+
+    Subclasses implement ``_tap``, ``_type`` and ``_hotkey``.
+    """
+    name = "keyboard"
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        # Ops submitted but not sent yet; counted under the lock so flush() never sees a queued op as done
+        self._pending = 0
+        self._sent = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f"Keyboard-{self.name}", daemon=True)
+        self._thread.start()
+
+    def press(self, key):
+        """Tap one key (a character or a key name such as "backspace")"""
+        self._submit(("tap", normalize_key(key)))
+
+    def write(self, text):
+        """Type a string"""
+        if text:
+            self._submit(("type", text))
+
+    def hotkey(self, *keys):
+        """Press ``keys`` in order and release them in reverse"""
+        self._submit(("hotkey", tuple(normalize_key(k) for k in keys)))
+
+    def flush(self, timeout=1.0):
+        """Wait until everything queued so far has been sent"""
+        with self._sent:
+            return self._sent.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+
+    def _submit(self, op):
+        with self._sent:
+            self._pending += 1
+        self._queue.put(op)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            ops = []
+            for op in batch:
+                if op is None:
+                    continue
+                if op[0] == "type" and ops and ops[-1][0] == "type":
+                    # Consecutive characters go out as one string
+                    ops[-1] = ("type", ops[-1][1] + op[1])
+                else:
+                    ops.append(op)
+            if ops:
+                try:
+                    for kind, arg in ops:
+                        if kind == "tap":
+                            self._tap(arg)
+                        elif kind == "type":
+                            self._type(arg)
+                        else:
+                            self._hotkey(arg)
+                except Exception as e:
+                    event_log.error("keyboard", "%s backend failed: %r", self.name, e)
+            with self._sent:
+                self._pending -= len(batch) - batch.count(None)
+                if self._pending == 0:
+                    self._sent.notify_all()
+            if stop:
+                return
+
+    def _tap(self, key):
+        raise NotImplementedError
+
+    def _type(self, text):
+        raise NotImplementedError
+
+    def _hotkey(self, keys):
+        raise NotImplementedError
+
+    def __str__(self):
+        return self.name
+
+
+class NullKeyboardBackend(KeyboardBackend):
+    """Records events instead of sending them, synchronously (tests, replays, headless)"""
+    name = "null"
+
+    def __init__(self):
+        self.events = []
+
+    def _submit(self, op):
+        self.events.append(op)
+
+    def flush(self, timeout=1.0):
+        return True
+
+    def close(self):
+        pass
+
+
+class PynputKeyboardBackend(KeyboardBackend):
+    """pynput's keyboard Controller (XTest on X11, SendInput on Windows, Quartz on macOS)"""
+    name = "pynput"
+
+    def __init__(self):
+        from pynput.keyboard import Controller, Key
+        self.controller = Controller()
+        self.Key = Key
+        super().__init__()
+
+    def _resolve(self, key):
+        if key == "printscreen":
+            return self.Key.print_screen
+        if key == "command":
+            return self.Key.cmd
+        special = getattr(self.Key, key, None) if len(key) > 1 else None
+        return special if special is not None else key
+
+    def _tap(self, key):
+        key = self._resolve(key)
+        self.controller.press(key)
+        self.controller.release(key)
+
+    def _type(self, text):
+        self.controller.type(text)
+
+    def _hotkey(self, keys):
+        resolved = [self._resolve(k) for k in keys]
+        for key in resolved:
+            self.controller.press(key)
+        for key in reversed(resolved):
+            self.controller.release(key)
+
+
+# US layout: characters that need shift, and the unshifted key they live on
+SHIFTED = dict(zip('~!@#$%^&*()_+{}|:"<>?', "`1234567890-=[]\\;',./"))
+if evdev is not None:
+    UINPUT_KEYS = {
+        "backspace": ecodes.KEY_BACKSPACE, "enter": ecodes.KEY_ENTER, "tab": ecodes.KEY_TAB,
+        "space": ecodes.KEY_SPACE, " ": ecodes.KEY_SPACE, "\n": ecodes.KEY_ENTER, "\t": ecodes.KEY_TAB,
+        "esc": ecodes.KEY_ESC, "printscreen": ecodes.KEY_SYSRQ, "shift": ecodes.KEY_LEFTSHIFT,
+        "ctrl": ecodes.KEY_LEFTCTRL, "alt": ecodes.KEY_LEFTALT, "command": ecodes.KEY_LEFTMETA,
+        "delete": ecodes.KEY_DELETE, "left": ecodes.KEY_LEFT, "right": ecodes.KEY_RIGHT,
+        "up": ecodes.KEY_UP, "down": ecodes.KEY_DOWN, "home": ecodes.KEY_HOME, "end": ecodes.KEY_END,
+        "`": ecodes.KEY_GRAVE, "-": ecodes.KEY_MINUS, "=": ecodes.KEY_EQUAL, "[": ecodes.KEY_LEFTBRACE,
+        "]": ecodes.KEY_RIGHTBRACE, "\\": ecodes.KEY_BACKSLASH, ";": ecodes.KEY_SEMICOLON,
+        "'": ecodes.KEY_APOSTROPHE, ",": ecodes.KEY_COMMA, ".": ecodes.KEY_DOT, "/": ecodes.KEY_SLASH,
+    }
+    UINPUT_KEYS.update({c: ecodes.ecodes[f"KEY_{c.upper()}"] for c in "abcdefghijklmnopqrstuvwxyz0123456789"})
+
+
+class UInputKeyboardBackend(KeyboardBackend):
+    """
+    A virtual keyboard device through /dev/uinput (Linux, needs python-evdev).
+    Works under Wayland and X11 alike. Key codes assume a US layout.
+    """
+    name = "uinput"
+
+    def __init__(self):
+        self.device = evdev.UInput({ecodes.EV_KEY: sorted(set(UINPUT_KEYS.values()))}, name="airflick-keyboard")
+        super().__init__()
+
+    def _stroke(self, code, shift=False):
+        write = self.device.write
+        if shift:
+            write(ecodes.EV_KEY, ecodes.KEY_LEFTSHIFT, 1)
+        write(ecodes.EV_KEY, code, 1)
+        self.device.syn()
+        write(ecodes.EV_KEY, code, 0)
+        if shift:
+            write(ecodes.EV_KEY, ecodes.KEY_LEFTSHIFT, 0)
+        self.device.syn()
+
+    def _char(self, char):
+        shift = char.isupper() or char in SHIFTED
+        code = UINPUT_KEYS.get(SHIFTED.get(char, char.lower()))
+        if code is None:
+            event_log.debug("keyboard", "No uinput key for %r", char)
+            return
+        self._stroke(code, shift)
+
+    def _tap(self, key):
+        if len(key) == 1:
+            self._char(key)
+        elif key in UINPUT_KEYS:
+            self._stroke(UINPUT_KEYS[key])
+
+    def _type(self, text):
+        for char in text:
+            self._char(char)
+
+    def _hotkey(self, keys):
+        codes = [UINPUT_KEYS[k.lower()] for k in keys if k.lower() in UINPUT_KEYS]
+        for code in codes:
+            self.device.write(ecodes.EV_KEY, code, 1)
+        self.device.syn()
+        for code in reversed(codes):
+            self.device.write(ecodes.EV_KEY, code, 0)
+        self.device.syn()
+
+    def close(self):
+        super().close()
+        self.device.close()
+
+
+def create_keyboard_backend(name="auto"):
+    """
+    Build a backend by name: "pynput", "uinput", "null" or "auto"
+    (pynput, falling back to null when no display is available).
+    """
+    if name == "null":
+        return NullKeyboardBackend()
+    if name == "uinput":
+        if evdev is None:
+            raise RuntimeError("the uinput keyboard backend needs python-evdev")
+        return UInputKeyboardBackend()
+    try:
+        return PynputKeyboardBackend()
+    except Exception as e:  # pynput raises assorted errors without a display
+        if name == "pynput":
+            raise
+        event_log.warning("keyboard", "No keyboard backend available (%s), keystrokes are discarded", e)
+        return NullKeyboardBackend()
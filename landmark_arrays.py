@@ -0,0 +1,43 @@
+from collections import namedtuple
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+# Read-only equivalent of MediaPipe's NormalizedLandmark
+Landmark = namedtuple("Landmark", ("x", "y", "z"))
+
+# Gesture codes shared by recordings, labels and the network stream.
+# Names match what MouseController.detect_gestures returns; "Pointing" is only
+# used as a label for frames where the cursor should follow the index finger.
+GESTURE_NAMES = ("", "Left Click", "Right Click", "Scroll Up", "Scroll Down", "Screenshot", "Pointing")
+GESTURE_CODES = {name: code for code, name in enumerate(GESTURE_NAMES)}
+GESTURE_CODES[None] = 0
+
+# Handedness codes (MediaPipe reports "Left"/"Right")
+HANDEDNESS_NAMES = ("", "Left", "Right")
+HANDEDNESS_CODES = {name: code for code, name in enumerate(HANDEDNESS_NAMES)}
+HANDEDNESS_CODES[None] = 0
+
+
+def landmarks_to_array(landmarks, out=None):
+    """Copy 21 landmark objects (anything with .x/.y/.z) into a (21, 3) float32 array"""
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+    out[:] = [(lm.x, lm.y, lm.z) for lm in landmarks]
+    return out
+
+
+class HandLandmarks:
+    """
+    Minimal stand-in for MediaPipe's NormalizedLandmarkList backed by a (21, 3) array.
+    ``hand.landmark[i].x`` works the same way, so HandDetector, MouseController and
+    ScreenshotTrigger accept these objects unchanged.
+    """
+    __slots__ = ("landmark", "array")
+
+    def __init__(self, array):
+        self.array = array
+        # Plain tuples: building 21 of them is cheaper than a few attribute
+        # lookups on numpy scalars, and the predicates read each point many times
+        self.landmark = list(map(Landmark._make, array.tolist()))
@@ -0,0 +1,322 @@
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+from gesture_pipeline import GesturePipeline
+from landmark_arrays import (
+    NUM_LANDMARKS, GESTURE_CODES, GESTURE_NAMES, HANDEDNESS_CODES,
+    HandLandmarks, landmarks_to_array,
+)
+
+# File layout: a 16 byte header followed by fixed-size little-endian records, so a
+# recording can be np.memmap'ed and indexed directly without any parsing.
+MAGIC = b"AFLM"
+VERSION = 1
+HEADER = struct.Struct("<4sHHd")  # magic, version, record size, start time (epoch seconds)
+
+FLAG_HAND = 1  # A hand was detected in this frame
+
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),   # time.time() of the frame
+    ("frame", "<u4"),       # Frame counter since the recording started
+    ("flags", "u1"),
+    ("handedness", "u1"),   # HANDEDNESS_CODES
+    ("gesture", "u1"),      # GESTURE_CODES of what the app emitted on this frame
+    ("label", "u1"),        # GESTURE_CODES ground truth, 0 when unlabelled
+    ("landmarks", "<u2", (NUM_LANDMARKS, 3)),
+])
+
+# Landmarks are quantised to 16 bits over a range a bit wider than the frame
+# (x/y in [-0.5, 1.5], z in [-1, 1]), i.e. ~3e-5 resolution in normalised units.
+QUANT_LO = np.array([-0.5, -0.5, -1.0], dtype=np.float32)
+QUANT_SPAN = np.array([2.0, 2.0, 2.0], dtype=np.float32)
+
+
+def quantize_landmarks(array):
+    """(..., 21, 3) float landmarks -> uint16"""
+    q = (np.asarray(array, dtype=np.float32) - QUANT_LO) * (65535.0 / QUANT_SPAN)
+    np.clip(q, 0, 65535, out=q)
+    return np.rint(q, out=q).astype(np.uint16)
+
+
+def dequantize_landmarks(q):
+    """(..., 21, 3) uint16 -> float32 landmarks"""
+    return q.astype(np.float32) * (QUANT_SPAN / 65535.0) + QUANT_LO
+
+
+def open_recording(path, mode="r"):
+    """Return (start_time, records) where records is a memmap of RECORD_DTYPE"""
+    with open(path, "rb") as f:
+        magic, version, record_size, start_time = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an AirFlick landmark recording")
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Unsupported recording version {version} (record size {record_size})")
+    # Ignore a partially written last record (e.g. after a crash)
+    count = (os.path.getsize(path) - HEADER.size) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return start_time, np.zeros(0, dtype=RECORD_DTYPE)
+    return start_time, np.memmap(path, dtype=RECORD_DTYPE, mode=mode, offset=HEADER.size, shape=(count,))
+
+
+def fill_record(rec, points, frame, hand_landmarks, timestamp=None, handedness=None, gesture=None, label=None):
+    """Write one frame into ``rec`` (a RECORD_DTYPE element); ``points`` is a (21, 3) float32 scratch array"""
+    rec["timestamp"] = time.time() if timestamp is None else timestamp
+    rec["frame"] = frame
+    rec["handedness"] = HANDEDNESS_CODES.get(handedness, 0)
+    rec["gesture"] = GESTURE_CODES.get(gesture, 0)
+    rec["label"] = GESTURE_CODES.get(label, 0)
+    if hand_landmarks is not None:
+        rec["flags"] = FLAG_HAND
+        rec["landmarks"] = quantize_landmarks(landmarks_to_array(hand_landmarks.landmark, points))
+    else:
+        rec["flags"] = 0
+        rec["landmarks"] = 0
+
+
+class LandmarkRecorder:
+    """
+    Appends one fixed-size record per frame: timestamp, handedness, emitted
+    gesture and quantised landmarks (142 bytes per frame, ~17 MB per hour at 33 fps).
+    """
+    def __init__(self, path, buffer_size=1 << 20):
+        self.path = path
+        self.frame = 0
+        self._file = open(path, "wb", buffering=buffer_size)
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, time.time()))
+        # Reused for every frame so recording doesn't allocate per call
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self._points = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+
+    def record(self, hand_landmarks, timestamp=None, handedness=None, gesture=None, label=None):
+        """Append a frame; ``hand_landmarks`` is None when no hand was detected"""
+        fill_record(self._record[0], self._points, self.frame, hand_landmarks, timestamp, handedness, gesture, label)
+        self._file.write(self._record)
+        self.frame += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayStats:
+    """Summary of one replay run"""
+    def __init__(self):
+        self.frames = 0
+        self.hand_frames = 0
+        self.gestures = Counter()
+        self.matched = 0      # Frames where the replayed gesture equals the recorded one
+        self.mismatched = 0
+        self.session_time = 0.0
+        self.wall_time = 0.0
+
+    @property
+    def speedup(self):
+        return self.session_time / self.wall_time if self.wall_time > 0 else float("inf")
+
+    def __str__(self):
+        gestures = ", ".join(f"{name}: {count}" for name, count in self.gestures.most_common()) or "none"
+        return (f"{self.frames} frames ({self.hand_frames} with hand), "
+                f"{self.session_time:.1f}s session replayed in {self.wall_time:.3f}s ({self.speedup:.0f}x)\n"
+                f"Gestures: {gestures}\n"
+                f"Matches recorded gestures on {self.matched}/{self.matched + self.mismatched} frames")
+
+
+class LandmarkReplayer:
+    """
+    Drives MouseController and ScreenshotTrigger from a recording through the
+    same GesturePipeline as the live frame loop. Cooldowns run on the recorded timestamps, so
+    replaying faster than real time gives the same result as the live session.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.start_time, self.records = open_recording(path)
+        self._now = 0.0
+
+    def __len__(self):
+        return len(self.records)
+
+    def _clock(self):
+        return self._now
+
+    def frames(self, chunk_size=4096):
+        """Yield (record, HandLandmarks or None) for every frame"""
+        for start in range(0, len(self.records), chunk_size):
+            chunk = self.records[start:start + chunk_size]
+            points = dequantize_landmarks(chunk["landmarks"])
+            for i in range(len(chunk)):
+                rec = chunk[i]
+                yield rec, (HandLandmarks(points[i]) if rec["flags"] & FLAG_HAND else None)
+
+    def replay(self, mouse_controller, screenshot_trigger=None, speed=0.0):
+        """
+        Replay every frame. ``speed`` is a multiple of real time (0 = as fast as possible).
+        Give the controller a NullMouse unless the replay should move the real cursor.
+        """
+        stats = ReplayStats()
+        pipeline = GesturePipeline(mouse_controller.hand_detector, mouse_controller, screenshot_trigger)
+        saved_clocks = (mouse_controller.clock, getattr(screenshot_trigger, "clock", None))
+        mouse_controller.clock = self._clock
+        if screenshot_trigger is not None:
+            screenshot_trigger.clock = self._clock
+        mouse_controller.reset_tracking()
+
+        first_ts = None
+        wall_start = time.perf_counter()
+        try:
+            for rec, hand in self.frames():
+                ts = float(rec["timestamp"])
+                if first_ts is None:
+                    first_ts = ts
+                if speed > 0:
+                    delay = (ts - first_ts) / speed - (time.perf_counter() - wall_start)
+                    if delay > 0:
+                        time.sleep(delay)
+                self._now = ts
+
+                gesture = None
+                if hand is not None:
+                    stats.hand_frames += 1
+                    gesture, _ = pipeline.process(hand)
+                else:
+                    pipeline.no_hand()
+
+                if gesture:
+                    stats.gestures[gesture] += 1
+                if GESTURE_CODES.get(gesture, 0) == rec["gesture"]:
+                    stats.matched += 1
+                else:
+                    stats.mismatched += 1
+                stats.frames += 1
+        finally:
+            mouse_controller.clock = saved_clocks[0]
+            if screenshot_trigger is not None:
+                screenshot_trigger.clock = saved_clocks[1]
+
+        stats.wall_time = time.perf_counter() - wall_start
+        if len(self.records):
+            stats.session_time = float(self.records[-1]["timestamp"] - self.records[0]["timestamp"])
+        return stats
+
+
+def check_predictive_clicks(confidence=0.6, near_misses=20):
+    """
+    Replay ``near_misses`` pinches that close fast but stop just short of
+    contact, then one real pinch, with the predictive click detector on a
+    NullMouse. Every near miss must be predicted and dropped without a mouse
+    event, and the real pinch must press and release once.
+    Returns (ClickLatencyStats, list of problems).
+    """
+    from click_detector import ClickDetector
+    from hand_detection import HandDetector
+    from mouse_controller import MouseController, NullMouse
+    from synthetic_hands import SyntheticSession, place, pose
+
+    rest, pinch = pose("point"), pose("pinch_left")
+
+    def pinch_closure(peak, frames, hold):
+        ramp = np.linspace(0.0, peak, frames + 1)[1:]
+        return np.concatenate([np.zeros(10), ramp, np.full(hold, peak), ramp[::-1], np.zeros(10)])
+
+    # 0.76 of the way leaves the thumb ~0.046 from the index tip, just outside contact (0.04)
+    closure = np.concatenate([pinch_closure(0.76, 6, 0)] * near_misses + [pinch_closure(1.0, 8, 10)])
+    points = place(rest + closure[:, None, None].astype(np.float32) * (pinch - rest))
+    n = len(closure)
+    session = SyntheticSession(points, np.ones(n, dtype=bool), np.zeros(n, dtype=np.uint8), np.arange(n) / 30.0, "Right")
+
+    mouse = NullMouse()
+    controller = MouseController(hand_detector=HandDetector(), mouse=mouse, screen_size=(1920, 1080))
+    controller.click_detector = ClickDetector(confidence=confidence)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "pinches.aflm")
+        session.write_recording(path)
+        LandmarkReplayer(path).replay(controller)
+
+    stats = controller.click_detector.stats
+    problems = []
+    if stats.mispredicted != near_misses:
+        problems.append(f"{stats.mispredicted} of {near_misses} near misses were predicted and dropped")
+    buttons = Counter(event[0] for event in mouse.events if event[0] in ("press", "release", "click"))
+    if buttons != Counter(press=1, release=1):
+        problems.append(f"expected one press and one release for the real pinch, the mouse got {dict(buttons) or 'nothing'}")
+    return stats, problems
+
+
+def print_info(path):
+    start_time, records = open_recording(path)
+    hands = int(np.count_nonzero(records["flags"] & FLAG_HAND))
+    duration = float(records[-1]["timestamp"] - records[0]["timestamp"]) if len(records) else 0.0
+    print(f"{path}: {len(records)} frames, {hands} with hand, {duration:.1f}s, "
+          f"recorded {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time))}")
+    for name, field in (("Emitted", "gesture"), ("Labelled", "label")):
+        counts = np.bincount(records[field], minlength=len(GESTURE_NAMES))
+        summary = ", ".join(f"{GESTURE_NAMES[code]}: {int(counts[code])}"
+                            for code in range(1, len(GESTURE_NAMES)) if counts[code])
+        print(f"{name} gestures: {summary or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or replay AirFlick landmark recordings")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="print a summary of a recording")
+    info.add_argument("path")
+    replay = sub.add_parser("replay", help="replay a recording through the gesture logic")
+    replay.add_argument("path")
+    replay.add_argument("--speed", type=float, default=0.0,
+                        help="multiple of real time, 0 = as fast as possible (default)")
+    replay.add_argument("--live", action="store_true",
+                        help="inject real mouse events instead of recording them")
+    replay.add_argument("--predictive-clicks", type=float, metavar="CONFIDENCE", default=None,
+                        help="use the predictive click detector and report its prediction lead")
+    check = sub.add_parser("check-clicks", help="check that mispredicted pinches never reach the mouse")
+    check.add_argument("--confidence", type=float, default=0.6)
+    args = parser.parse_args()
+
+    if args.command == "info":
+        print_info(args.path)
+        return
+    if args.command == "check-clicks":
+        stats, problems = check_predictive_clicks(args.confidence)
+        print(f"Predictive clicks: {stats}")
+        for problem in problems:
+            print(problem)
+        if problems:
+            sys.exit(1)
+        print("Mispredicted pinches sent no mouse events")
+        return
+
+    from hand_detection import HandDetector
+    from mouse_controller import MouseController, NullMouse
+    from screenshot_trigger import ScreenshotTrigger
+
+    detector = HandDetector()
+    if args.live:
+        controller = MouseController(hand_detector=detector)
+    else:
+        controller = MouseController(hand_detector=detector, mouse=NullMouse(), screen_size=(1920, 1080))
+    if args.predictive_clicks is not None:
+        from click_detector import ClickDetector
+        controller.click_detector = ClickDetector(confidence=args.predictive_clicks)
+    trigger = ScreenshotTrigger(detector, send_hotkey=False)
+    print(LandmarkReplayer(args.path).replay(controller, trigger, speed=args.speed))
+    if controller.click_detector is not None:
+        print(f"Predictive clicks: {controller.click_detector.stats}")
+    if not args.live:
+        buttons = Counter(event[0] for event in controller.mouse.events)
+        print(f"Mouse events: {buttons['press']} presses, {buttons['release']} releases, {buttons['click']} clicks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+import argparse
+import errno
+import os
+import select
+import socket
+import struct
+import time
+from collections import Counter
+
+import numpy as np
+
+from event_log import event_log
+from gesture_pipeline import GesturePipeline
+from landmark_arrays import HANDEDNESS_NAMES, NUM_LANDMARKS, HandLandmarks
+from landmark_recorder import FLAG_HAND, RECORD_DTYPE, dequantize_landmarks, fill_record, open_recording
+
+# One packet per frame: a 16 byte header followed by the same fixed-size record
+# as landmark recordings (158 bytes in all). UDP sends one packet per datagram,
+# TCP sends them back to back. ``session`` is random per sender, so a restarted
+# sender is told apart from late packets of the old one.
+MAGIC = b"AFLS"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")  # magic, version, record size, session, sequence number
+PACKET_SIZE = HEADER.size + RECORD_DTYPE.itemsize
+DEFAULT_PORT = 50505
+
+_IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK))
+
+
+def parse_address(text, default_host="127.0.0.1", default_port=DEFAULT_PORT):
+    """"host:port", "host" or ":port" -> (host, port)"""
+    host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+    return host or default_host, int(port) if port else default_port
+
+
+class LandmarkSender:
+    """
+    Capture node side: streams each frame's quantised landmarks to a
+    LandmarkReceiver instead of video. ``record()`` has the same signature as
+    LandmarkRecorder.record, so the frame loop feeds both the same way.
+
+    Sending never blocks the frame loop. Frames that cannot go out right away
+    (no TCP connection yet, full socket buffer) are dropped and counted; a
+    lost TCP connection is retried every ``reconnect_interval`` seconds.
+    """
+    def __init__(self, address, protocol="udp", reconnect_interval=1.0):
+        if protocol not in ("udp", "tcp"):
+            raise ValueError(f"Unknown stream protocol {protocol!r}")
+        self.address = address
+        self.protocol = protocol
+        self.reconnect_interval = reconnect_interval
+        self.session = struct.unpack("<I", os.urandom(4))[0]
+        self.sequence = 0
+        self.sent = 0
+        self.dropped = 0
+
+        # The record is a view into the packet, so filling it builds the datagram in place
+        self._packet = bytearray(PACKET_SIZE)
+        self._record = np.frombuffer(self._packet, dtype=RECORD_DTYPE, count=1, offset=HEADER.size)
+        self._points = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+
+        self._sock = None
+        self._connected = False
+        self._pending = b""  # Unsent tail of a partially written TCP packet
+        self._last_attempt = -reconnect_interval
+        if protocol == "udp":
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+            self._sock.connect(address)
+            self._connected = True
+
+    def record(self, hand_landmarks, timestamp=None, handedness=None, gesture=None, label=None):
+        """Send a frame; ``hand_landmarks`` is None when no hand was detected"""
+        fill_record(self._record[0], self._points, self.sequence, hand_landmarks, timestamp, handedness, gesture, label)
+        HEADER.pack_into(self._packet, 0, MAGIC, VERSION, RECORD_DTYPE.itemsize, self.session, self.sequence)
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        if self._send():
+            self.sent += 1
+        else:
+            self.dropped += 1
+
+    def _send(self):
+        if self.protocol == "udp":
+            try:
+                self._sock.send(self._packet)
+                return True
+            except OSError:
+                # Full buffer, or nobody listening yet (ICMP port unreachable)
+                return False
+        if not self._tcp_ready():
+            return False
+        try:
+            if self._pending:
+                self._pending = self._pending[self._sock.send(self._pending):]
+                if self._pending:
+                    return False
+            sent = self._sock.send(self._packet)
+        except BlockingIOError:
+            return False
+        except OSError as e:
+            self._disconnect(e)
+            return False
+        if sent < PACKET_SIZE:
+            # Part of the packet is on the wire: the rest has to follow before anything else
+            self._pending = bytes(self._packet[sent:])
+        return True
+
+    def _tcp_ready(self):
+        if self._sock is None:
+            now = time.monotonic()
+            if now - self._last_attempt < self.reconnect_interval:
+                return False
+            self._last_attempt = now
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            result = sock.connect_ex(self.address)
+            if result not in (0,) + _IN_PROGRESS:
+                sock.close()
+                return False
+            self._sock, self._connected = sock, result == 0
+        if not self._connected:
+            # Non-blocking connect: done once the socket turns writable
+            _, writable, _ = select.select([], [self._sock], [], 0)
+            if not writable:
+                return False
+            error = self._sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if error:
+                self._disconnect(OSError(error, os.strerror(error)), quiet=True)
+                return False
+            self._connected = True
+            event_log.info("stream", "Connected to %s:%d", *self.address)
+        return True
+
+    def _disconnect(self, error, quiet=False):
+        if not quiet:
+            event_log.warning("stream", "Connection to %s:%d lost: %s", self.address[0], self.address[1], error)
+        self._sock.close()
+        self._sock, self._connected, self._pending = None, False, b""
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StreamStats:
+    """Counters of a receiving stream"""
+    def __init__(self):
+        self.packets = 0
+        self.lost = 0        # Sequence numbers that never arrived
+        self.stale = 0       # Late or duplicate packets, dropped
+        self.malformed = 0
+        self.senders = 0     # Sender sessions seen (restarts and reconnects)
+        self.age_total = 0.0  # Sum of (arrival - frame timestamp), needs synchronised clocks
+        self.age_max = 0.0
+
+    @property
+    def loss_rate(self):
+        expected = self.packets + self.lost
+        return self.lost / expected if expected else 0.0
+
+    def __str__(self):
+        age = f", age mean {1000 * self.age_total / self.packets:.1f} ms max {1000 * self.age_max:.1f} ms" if self.packets else ""
+        return (f"{self.packets} packets, {self.lost} lost ({100 * self.loss_rate:.1f}%), "
+                f"{self.stale} stale, {self.malformed} malformed, {self.senders} sender session(s){age}")
+
+
+class LandmarkReceiver:
+    """
+    Controller node side: receives LandmarkSender packets, drops late and
+    duplicate ones by sequence number and counts the gaps. TCP accepts one
+    sender at a time and waits for the next after a disconnect.
+    """
+    def __init__(self, address=("0.0.0.0", DEFAULT_PORT), protocol="udp", timeout=0.05):
+        if protocol not in ("udp", "tcp"):
+            raise ValueError(f"Unknown stream protocol {protocol!r}")
+        self.protocol = protocol
+        self.timeout = timeout
+        self.stats = StreamStats()
+        # One spare byte: a UDP datagram larger than a packet fills it instead of being cut to size unnoticed
+        self._buffer = bytearray(PACKET_SIZE + 1)
+        self._view = memoryview(self._buffer)[:PACKET_SIZE]
+        self._record = np.frombuffer(self._buffer, dtype=RECORD_DTYPE, count=1, offset=HEADER.size)
+        self._filled = 0
+        self._conn = None
+        self.session = None  # Session of the current sender
+        self._last_sequence = None
+
+        if protocol == "udp":
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        else:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(address)
+        if protocol == "tcp":
+            self._sock.listen(1)
+        self._sock.settimeout(timeout)
+        self.address = self._sock.getsockname()
+
+    def receive(self):
+        """
+        The next in-order frame record (RECORD_DTYPE), or None when nothing
+        arrived within ``timeout``. The record is only valid until the next call.
+        """
+        if not (self._receive_udp() if self.protocol == "udp" else self._receive_tcp()):
+            return None
+        magic, version, record_size, session, sequence = HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_DTYPE.itemsize:
+            self.stats.malformed += 1
+            return None
+        if not self._accept(session, sequence):
+            return None
+        rec = self._record[0]
+        age = time.time() - float(rec["timestamp"])
+        self.stats.packets += 1
+        self.stats.age_total += age
+        self.stats.age_max = max(self.stats.age_max, age)
+        return rec
+
+    def _accept(self, session, sequence):
+        if session != self.session:
+            if self.session is not None:
+                event_log.info("stream", "New sender session %08x", session)
+            self.session = session
+            self._last_sequence = sequence
+            self.stats.senders += 1
+            return True
+        # Wrap-around difference: small positive steps are new, everything else is old
+        step = (sequence - self._last_sequence) & 0xFFFFFFFF
+        if step == 0 or step >= 1 << 31:
+            self.stats.stale += 1
+            return False
+        self.stats.lost += step - 1
+        self._last_sequence = sequence
+        return True
+
+    def _receive_udp(self):
+        try:
+            size = self._sock.recv_into(self._buffer)  # Longer datagrams are truncated to the buffer
+        except socket.timeout:
+            return False
+        except OSError:
+            return False
+        if size != PACKET_SIZE:
+            self.stats.malformed += 1
+            return False
+        return True
+
+    def _receive_tcp(self):
+        if self._conn is None:
+            try:
+                self._conn, peer = self._sock.accept()
+            except socket.timeout:
+                return False
+            self._conn.settimeout(self.timeout)
+            self._filled = 0
+            event_log.info("stream", "Sender connected from %s:%d", *peer[:2])
+        try:
+            size = self._conn.recv_into(self._view[self._filled:])
+        except socket.timeout:
+            return False
+        except OSError as e:
+            size = 0
+            event_log.warning("stream", "Sender connection failed: %s", e)
+        if size == 0:
+            event_log.info("stream", "Sender disconnected")
+            self._conn.close()
+            self._conn = None
+            return False
+        self._filled += size
+        if self._filled < PACKET_SIZE:
+            return False
+        self._filled = 0
+        return True
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StreamController:
+    """
+    Drives MouseController (and optionally ScreenshotTrigger) from a
+    LandmarkReceiver through the same GesturePipeline as the live frame loop.
+    When no packet arrives for ``hand_timeout`` seconds, or the sender
+    restarts, the hand counts as lost: tracking resets and held buttons are
+    released, so a lost release packet cannot leave a button stuck down.
+    """
+    def __init__(self, receiver, mouse_controller, screenshot_trigger=None, hand_timeout=0.25):
+        self.receiver = receiver
+        self.mouse_controller = mouse_controller
+        self.pipeline = GesturePipeline(mouse_controller.hand_detector, mouse_controller, screenshot_trigger)
+        self.hand_timeout = hand_timeout
+        self.gestures = Counter()
+        self._last_packet = None
+        self._hand = False
+        self._session = None
+
+    def poll(self):
+        """Handle the next received frame, if any. Returns the gesture performed (or None)"""
+        rec = self.receiver.receive()
+        now = time.monotonic()
+        if rec is None:
+            if self._hand and now - self._last_packet > self.hand_timeout:
+                event_log.info("stream", "No frames for %.0f ms, releasing the hand", 1000 * self.hand_timeout)
+                self._lose_hand()
+            return None
+        self._last_packet = now
+
+        session = self.receiver.session
+        if session != self._session:
+            # A restarted sender: whatever the old one was holding is gone
+            if self._hand:
+                self._lose_hand()
+            self._session = session
+
+        if not rec["flags"] & FLAG_HAND:
+            if self._hand:
+                self._lose_hand()
+            return None
+        self._hand = True
+        # Gesture timing runs on the sender's capture times, so network jitter doesn't change it
+        gesture, _ = self.pipeline.process(HandLandmarks(dequantize_landmarks(rec["landmarks"])),
+                                           timestamp=float(rec["timestamp"]))
+        if gesture:
+            self.gestures[gesture] += 1
+        return gesture
+
+    def _lose_hand(self):
+        self._hand = False
+        self.pipeline.no_hand()
+
+    def run(self, stop_event=None):
+        """Poll until ``stop_event`` is set (forever when None)"""
+        try:
+            while stop_event is None or not stop_event.is_set():
+                self.poll()
+        finally:
+            if self._hand:
+                self._lose_hand()
+
+
+def send_recording(path, address, protocol="udp", speed=1.0, loop=False):
+    """Stream a landmark recording with its original timing, e.g. to test a controller node without a camera"""
+    _, records = open_recording(path)
+    if not len(records):
+        return None
+    sender = LandmarkSender(address, protocol)
+    points = dequantize_landmarks(records["landmarks"])
+    offsets = np.asarray(records["timestamp"]) - float(records[0]["timestamp"])
+    try:
+        while True:
+            started = time.perf_counter()
+            for i, rec in enumerate(records):
+                if speed > 0:
+                    delay = offsets[i] / speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                hand = HandLandmarks(points[i]) if rec["flags"] & FLAG_HAND else None
+                sender.record(hand, handedness=HANDEDNESS_NAMES[rec["handedness"]] or None)
+            if not loop:
+                break
+    finally:
+        sender.close()
+    return sender
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream hand landmarks between a capture node and a controller node")
+    sub = parser.add_subparsers(dest="command", required=True)
+    receive = sub.add_parser("receive", help="controller node: move the pointer from received landmarks")
+    receive.add_argument("--listen", default=f"0.0.0.0:{DEFAULT_PORT}",
+                         help=f"address to listen on (default: 0.0.0.0:{DEFAULT_PORT})")
+    receive.add_argument("--tcp", action="store_true", help="use TCP instead of UDP")
+    receive.add_argument("--dry-run", action="store_true", help="record mouse events instead of injecting them")
+    receive.add_argument("--screenshots", action="store_true", help="also act on the screenshot gesture")
+    receive.add_argument("--hand-timeout", type=float, default=0.25,
+                         help="seconds without packets before the hand counts as lost (default: 0.25)")
+    send = sub.add_parser("send", help="stream a landmark recording to a controller node")
+    send.add_argument("path")
+    send.add_argument("--to", default=f"127.0.0.1:{DEFAULT_PORT}",
+                      help=f"controller node address (default: 127.0.0.1:{DEFAULT_PORT})")
+    send.add_argument("--tcp", action="store_true", help="use TCP instead of UDP")
+    send.add_argument("--speed", type=float, default=1.0, help="multiple of real time, 0 = as fast as possible (default: 1)")
+    send.add_argument("--loop", action="store_true", help="repeat the recording until interrupted")
+    args = parser.parse_args()
+    protocol = "tcp" if args.tcp else "udp"
+
+    if args.command == "send":
+        try:
+            sender = send_recording(args.path, parse_address(args.to), protocol, args.speed, args.loop)
+        except KeyboardInterrupt:
+            return
+        if sender is not None:
+            print(f"{sender.sent} frames sent, {sender.dropped} dropped")
+        return
+
+    from hand_detection import HandDetector
+    from mouse_controller import MouseController, NullMouse
+    from screenshot_trigger import ScreenshotTrigger
+
+    detector = HandDetector()
+    if args.dry_run:
+        controller = MouseController(hand_detector=detector, mouse=NullMouse(), screen_size=(1920, 1080))
+    else:
+        controller = MouseController(hand_detector=detector)
+    trigger = ScreenshotTrigger(detector, send_hotkey=not args.dry_run) if args.screenshots else None
+    with LandmarkReceiver(parse_address(args.listen, "0.0.0.0"), protocol) as receiver:
+        print(f"Listening on {receiver.address[0]}:{receiver.address[1]} ({protocol.upper()}), Ctrl+C to stop")
+        stream = StreamController(receiver, controller, trigger, hand_timeout=args.hand_timeout)
+        try:
+            stream.run()
+        except KeyboardInterrupt:
+            pass
+        print(receiver.stats)
+        gestures = ", ".join(f"{name}: {count}" for name, count in stream.gestures.most_common()) or "none"
+        print(f"Gestures: {gestures}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,10 @@
 import sys
-import cv2
-import numpy as np
 import os
 import gc  # Import garbage collector
+import argparse
 from PyQt6.QtWidgets import QApplication, QWidget, QCheckBox
-from PyQt6.QtCore import QTimer, QObject, QEvent
-from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtCore import QTimer, QEvent
+from PyQt6.QtGui import QPixmap, QKeySequence, QShortcut
 from PyQt6 import uic
 
 # Import our custom modules
@@ -13,25 +12,99 @@ from hand_detection import HandDetector
 from mouse_controller import MouseController
 from welcome_screen import WelcomeScreen
 from screenshot_trigger import ScreenshotTrigger
+from screen_capture import DEFAULT_DIRECTORY as SCREENSHOT_DIRECTORY, ScreenCaptureError, ScreenshotWriter, create_screen_capture
 from virtual_keyboard import VirtualKeyboard
+from frame_profiler import FrameProfiler
+from event_log import event_log
+from landmark_recorder import LandmarkRecorder
+from landmark_stream import LandmarkSender, parse_address
+from memory_mode import GCPauseMonitor, enter_steady_state
+from frame_processor import FrameProcessor
+from scroll_engine import ScrollEngine, create_scroll_output
+from click_detector import ClickDetector
+from keyboard_backends import create_keyboard_backend
+from hand_typing import HandTyping
+from word_predictor import WordPredictor
+from idle_mode import IdleMonitor
+from event_bus import DEFAULT_PORT as EVENT_PORT, EventBus, EventMetrics, GestureEvent, StatusEvent, log_event
+from pointer_calibration import AbsolutePointer, CornerCalibration, DEFAULT_CORNERS, load_calibration
 
 class AirFlick(QWidget):
-    def __init__(self):
+    def __init__(self, profile_duration=10.0, profile_dir="profiles", record_path=None, gc_mode="steady",
+                 reprobe_camera=False, source="0", realtime_source=True, scroll_mode="hold",
+                 click_mode="predictive", click_confidence=0.6, keyboard_backend="auto",
+                 hand_typing="off", word_list=None, pointer_mode="relative", calibrate=False,
+                 idle_after=10.0, idle_fps=4.0, stream_to=None, stream_protocol="udp",
+                 event_server=None, screenshot_backend="auto", screenshot_dir=SCREENSHOT_DIRECTORY,
+                 screenshot_format="png"):
         super().__init__()
         
         uic.loadUi('air_flick.ui', self)
         
-        self.cap = None
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_frame)
-        
         self.hand_detector = HandDetector()
         self.mouse_controller = MouseController()
-        self.screenshot_trigger = ScreenshotTrigger(self.hand_detector)
-        self.virtual_keyboard = VirtualKeyboard()
+        # One keystroke injector shared by the on-screen keyboard and the screenshot hotkey
+        self.keyboard = create_keyboard_backend(keyboard_backend)
+        # Screenshots are grabbed in-process and saved off the frame loop (see
+        # screen_capture.py); "hotkey" keeps triggering the desktop's own tool
+        self.screenshot_writer = None
+        if screenshot_backend != "hotkey":
+            self.screenshot_writer = ScreenshotWriter(screenshot_dir, screenshot_format)
+        self.screenshot_trigger = ScreenshotTrigger(self.hand_detector, keyboard=self.keyboard,
+                                                    writer=self.screenshot_writer, capture_backend=screenshot_backend)
+        self.virtual_keyboard = VirtualKeyboard(keyboard=self.keyboard, predictor=WordPredictor(word_list))
         self.virtual_keyboard_enabled = False
         
         self.mouse_controller.hand_detector = self.hand_detector
+
+        # Kinetic scrolling from its own timer; "steps" keeps the per-frame wheel steps
+        self.scroll_engine = None
+        if scroll_mode != "steps":
+            self.scroll_engine = ScrollEngine(create_scroll_output(self.mouse_controller.mouse), mode=scroll_mode)
+            self.scroll_engine.start()
+            self.mouse_controller.scroll_engine = self.scroll_engine
+
+        # Predictive pinch clicks with separate press/release (drag and drop);
+        # "threshold" keeps the instantaneous distance check
+        self.click_detector = None
+        if click_mode == "predictive":
+            self.click_detector = ClickDetector(confidence=click_confidence)
+            self.mouse_controller.click_detector = self.click_detector
+
+        # Absolute pointing maps the fingertip through a calibrated homography
+        # (see pointer_calibration.py); F8 runs the corner calibration
+        if pointer_mode == "absolute":
+            corners = load_calibration()
+            if corners is None:
+                event_log.info("pointer", "No pointer calibration saved yet, using the default area (press F8 to calibrate)")
+                corners = DEFAULT_CORNERS
+            self.mouse_controller.absolute_pointer = AbsolutePointer(
+                corners, (self.mouse_controller.screen_width, self.mouse_controller.screen_height))
+
+        # Capture, detection and gestures run on the processor's own thread
+        # (see frame_processor.py); the window only shows what it emits.
+        # source: camera index, video file, image directory or synthetic
+        self.processor = FrameProcessor(self.hand_detector, self.mouse_controller, self.screenshot_trigger,
+                                        source=source, realtime_source=realtime_source,
+                                        reprobe_camera=reprobe_camera)
+        self.processor.frame_ready.connect(self.show_frame)
+        self.processor.tracking_status_updated.connect(self.gestureOutput.setText)
+        self.processor.gesture_detected.connect(self.show_gesture)
+        self.processor.calibration_finished.connect(self.on_calibration_finished)
+        # Low-power idle state while no hand is seen (see idle_mode.py); 0 disables
+        self.idle_monitor = None
+        if idle_after > 0:
+            self.idle_monitor = IdleMonitor(idle_after, idle_interval_ms=int(1000 / idle_fps))
+            self.processor.idle_monitor = self.idle_monitor
+
+        # Typing straight from the fingertip while the keyboard is shown (see hand_typing.py)
+        self.hand_typing = None
+        if hand_typing != "off":
+            self.hand_typing = HandTyping(self.virtual_keyboard.key_grid.geometry_map, mode=hand_typing)
+            self.processor.key_hovered.connect(self.virtual_keyboard.key_grid.set_highlight)
+            self.processor.key_typed.connect(self.virtual_keyboard.key_pressed)
+            self.virtual_keyboard.visibility_changed.connect(self.on_keyboard_visibility)
+        self.camera_running = False
         
         self.is_tracking = False
         
@@ -93,13 +166,76 @@ class AirFlick(QWidget):
             app = QApplication.instance()
             app.installEventFilter(self)
         
+        # Every GC pause is timed; in "legacy" mode a full collection also runs
+        # every 60 s, in "steady" mode startup objects are frozen instead
+        # (see memory_mode.py) and no periodic collection is forced.
+        self.gc_mode = gc_mode
+        self.gc_monitor = GCPauseMonitor()
+        self.gc_monitor.install()
         self.gc_timer = QTimer()
         self.gc_timer.timeout.connect(self.force_garbage_collection)
-        self.gc_timer.start(60000)
+        if gc_mode == "legacy":
+            self.gc_timer.start(60000)
+
+        # Sampling profiler for the frame loop (F9 starts/stops a session)
+        self.profiler = FrameProfiler(output_dir=profile_dir)
+        self.profiler.on_finished = self.on_profile_finished
+        self.profile_duration = profile_duration
+        self.profile_shortcut = QShortcut(QKeySequence("F9"), self)
+        self.profile_shortcut.activated.connect(self.toggle_profiler)
+        self.calibration_shortcut = QShortcut(QKeySequence("F8"), self)
+        self.calibration_shortcut.activated.connect(self.start_calibration)
+        if calibrate:
+            self.start_calibration()
+
+        # Optional landmark recording of every processed frame (see landmark_recorder.py)
+        self.recorder = LandmarkRecorder(record_path) if record_path else None
+        if self.recorder:
+            event_log.info("recorder", "Recording landmarks to %s", record_path)
+        self.processor.recorder = self.recorder
+
+        # Optional landmark stream to a controller node (see landmark_stream.py)
+        self.stream_sender = LandmarkSender(parse_address(stream_to), stream_protocol) if stream_to else None
+        if self.stream_sender:
+            event_log.info("stream", "Streaming landmarks to %s:%d over %s",
+                           *self.stream_sender.address, stream_protocol.upper())
+        self.processor.stream_sender = self.stream_sender
+
+        # Gesture, status and hand events for consumers that must not hold up the
+        # frame loop (see event_bus.py): metrics, the event log, and optionally TCP clients
+        self.event_bus = EventBus()
+        self.event_metrics = EventMetrics()
+        self.event_bus.subscribe("metrics", self.event_metrics, maxsize=256)
+        self.event_bus.subscribe("log", log_event, types=(GestureEvent, StatusEvent), maxsize=256)
+        self.event_bus.start()
+        if event_server:
+            self.event_bus.serve(*parse_address(event_server, default_port=EVENT_PORT))
+        self.processor.event_bus = self.event_bus
+
+    def toggle_profiler(self):
+        """Start or stop sampling the frame loop"""
+        if self.profiler.toggle(self.profile_duration, self.processor.thread_ident):
+            self.gestureOutput.setText(f"Profiling: ON ({self.profile_duration:.0f}s)")
+        else:
+            self.gestureOutput.setText("Profiling: stopping")
+
+    def on_profile_finished(self, folded_path, table_path):
+        # Called from the profiler thread, so don't touch widgets here
+        event_log.info("profiler", "Profile written: %s (flame graph), %s (table)", folded_path, table_path)
+
+    def start_calibration(self):
+        """Calibrate absolute pointing: hold the index finger on each screen corner in turn"""
+        self.start_camera()
+        self.processor.calibration = CornerCalibration()
+        self.gestureOutput.setText(self.processor.calibration.prompt())
+
+    def on_calibration_finished(self, corners):
+        self.gestureOutput.setText("Calibration: saved")
 
     def toggle_screenshot_detection(self, checked):
         """Enable/disable screenshot gesture detection."""
         self.screenshot_enabled = checked
+        self.processor.screenshot_enabled = checked
         status = "ON" if checked else "OFF"
         self.gestureOutput.setText(f"Screenshot Detection: {status}")
         
@@ -113,33 +249,69 @@ class AirFlick(QWidget):
             self.virtual_keyboard.hide()
             self.virtual_keyboard.active_input = None
 
+    def on_keyboard_visibility(self, visible):
+        self.processor.hand_typing = self.hand_typing if visible else None
+
     def start_camera(self):
-        if not self.cap:
-            self.cap = cv2.VideoCapture(0)
-        if not self.timer.isActive():
+        if not self.camera_running:
+            self.camera_running = True
             self.videoFeed.setStyleSheet("background-color: #0f172a;")
-            self.timer.start(30)
+            self.processor.start()
 
     def stop_camera(self):
-        if self.cap:
-            self.cap.release()
-            self.cap = None
-        self.timer.stop()
+        self.camera_running = False
+        self.processor.stop()
         self.videoFeed.clear()
         self.videoFeed.setStyleSheet("border: 2px solid #38bdf8; background-color: #0f172a;")
 
+    def show_frame(self, image):
+        # Frames already queued when the camera was stopped are dropped
+        if self.camera_running:
+            self.videoFeed.setPixmap(QPixmap.fromImage(image))
+
+    def update_preview(self):
+        """Have the frame loop draw at the size the preview is shown, and not at all while it can't be seen"""
+        size = self.videoFeed.contentsRect().size()
+        self.processor.preview_size = (max(1, size.width()), max(1, size.height()))
+        self.processor.preview_visible = self.videoFeed.isVisible() and not self.isMinimized()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_preview()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Sent just before the window is mapped; look again once it is
+        QTimer.singleShot(0, self.update_preview)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_preview()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.update_preview()
+
+    def show_gesture(self, gesture):
+        self.gestureOutput.setText(f"Gesture: {gesture}")
+
     def start_tracking(self):
         self.start_camera()
-        self.mouse_controller.reset_tracking()
         self.is_tracking = True
+        self.processor.set_tracking(True)
         self.gestureOutput.setText("Gesture: Tracking started")
 
     def stop_all(self):
         self.stop_camera()
-        self.mouse_controller.reset_tracking()
         self.is_tracking = False
+        self.processor.set_tracking(False)
+        if self.scroll_engine:
+            self.scroll_engine.stop_scrolling()
         self.gestureOutput.setText("Gesture: None")
-        self.force_garbage_collection()
+        if self.gc_mode == "legacy":
+            # Steady mode relies on the frozen heap and tuned thresholds: no full collection on the GUI thread
+            self.force_garbage_collection()
 
     def force_garbage_collection(self):
         gc.collect()
@@ -156,70 +328,6 @@ class AirFlick(QWidget):
                 self.virtual_keyboard.set_active_input(None)
         return super().eventFilter(obj, event)
 
-    def preprocess_for_hand_detection(self, frame):
-        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        cl = clahe.apply(l)
-        merged = cv2.merge([cl, a, b])
-        processed_frame = cv2.cvtColor(merged, cv2.COLOR_LAB2BGR)
-        return processed_frame
-
-    def preprocess_for_high_light(self, frame, gamma=0.75):
-        invGamma = 1.0 / gamma
-        table = np.array([((i / 255.0) ** invGamma) * 255
-            for i in np.arange(0, 256)]).astype("uint8")
-        return cv2.LUT(frame, table)
-
-    def update_frame(self):
-        if not self.cap:
-            return
-
-        ret, frame = self.cap.read()
-        if not ret:
-            return
-
-        frame = cv2.flip(frame.copy(), 1)
-        
-        if self.low_light_filter_enabled:
-            processed_frame = self.preprocess_for_hand_detection(frame)
-        elif self.high_light_filter_enabled:
-            processed_frame = self.preprocess_for_high_light(frame)
-        else:
-            processed_frame = frame
-        
-        processed_frame, hand_landmarks = self.hand_detector.find_hands(processed_frame)
-        
-        if self.is_tracking and hand_landmarks:
-            hand_landmark = hand_landmarks[0]
-            
-            if not (self.hand_detector.is_thumbs_up(hand_landmark.landmark) or self.hand_detector.is_thumbs_down(hand_landmark.landmark)):
-                if self.screenshot_enabled and self.screenshot_trigger.check_and_trigger(hand_landmark.landmark):
-                    cv2.rectangle(processed_frame, (10, 10), (180, 60), (0, 200, 0), -1)
-                    cv2.putText(processed_frame, 'SCREENSHOT', (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255,255,255), 3, cv2.LINE_AA)
-
-                if self.hand_detector.is_index_finger_straight(hand_landmark.landmark):
-                    index_tip = hand_landmark.landmark[self.hand_detector.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                    self.mouse_controller.move_mouse_relative(index_tip.x, index_tip.y)
-                    self.gestureOutput.setText("Tracking: Index Finger")
-                    index_pos = (int(index_tip.x * processed_frame.shape[1]), int(index_tip.y * processed_frame.shape[0]))
-                    cv2.circle(processed_frame, index_pos, 15, (0, 255, 0), -1)
-                else:
-                    self.mouse_controller.reset_tracking()
-                    self.gestureOutput.setText("Gesture: Index Finger Folded")
-            
-            processed_frame, gesture = self.mouse_controller.detect_gestures(processed_frame, hand_landmark)
-            if gesture:
-                self.gestureOutput.setText(f"Gesture: {gesture}")
-        elif self.is_tracking:
-            self.mouse_controller.reset_tracking()
-            self.gestureOutput.setText("Gesture: Hand not detected")
-        
-        rgb_image = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        qt_img = QImage(rgb_image.data, w, h, w * ch, QImage.Format.Format_RGB888)
-        self.videoFeed.setPixmap(QPixmap.fromImage(qt_img))
-
     def update_sensitivity(self, value):
         scaling_factor = float(value)
         self.mouse_controller.scaling_factor = scaling_factor
@@ -238,6 +346,7 @@ class AirFlick(QWidget):
 
     def toggle_low_light_filter(self, checked):
         self.low_light_filter_enabled = checked
+        self.processor.low_light_filter_enabled = checked
         if checked and self.high_light_filter_enabled:
             self.high_light_filter_enabled = False
             self.highLightToggle.setChecked(False)
@@ -246,6 +355,7 @@ class AirFlick(QWidget):
 
     def toggle_high_light_filter(self, checked):
         self.high_light_filter_enabled = checked
+        self.processor.high_light_filter_enabled = checked
         if checked and self.low_light_filter_enabled:
             self.low_light_filter_enabled = False
             self.lowLightToggle.setChecked(False)
@@ -254,6 +364,30 @@ class AirFlick(QWidget):
         
     def closeEvent(self, event):
         self.stop_camera()
+        # Wait for the worker so the recorder isn't closed under it
+        self.processor.shutdown()
+        if self.scroll_engine:
+            self.scroll_engine.stop()
+        self.screenshot_trigger.close()
+        if self.screenshot_writer:
+            event_log.info("screenshot", "Screenshots: %s", self.screenshot_writer.summary())
+        self.keyboard.close()
+        self.virtual_keyboard.predictor.save()
+        event_log.info("predict", "Virtual keyboard: %s", self.virtual_keyboard.predictor.stats)
+        if self.click_detector:
+            self.mouse_controller.release_buttons()
+            event_log.info("click", "Predictive clicks: %s", self.click_detector.stats)
+        if self.idle_monitor:
+            event_log.info("idle", "Time per state: %s", self.idle_monitor.summary())
+        if self.recorder:
+            self.recorder.close()
+        self.event_bus.stop()
+        event_log.info("bus", "Events: %s", self.event_metrics.summary())
+        event_log.debug("bus", "Subscribers: %s", self.event_bus.summary())
+        if self.stream_sender:
+            event_log.info("stream", "Frames streamed: %d sent, %d dropped", self.stream_sender.sent, self.stream_sender.dropped)
+            self.stream_sender.close()
+        event_log.info("gc", "GC pauses (%s mode): %s", self.gc_mode, self.gc_monitor.summary())
         self.force_garbage_collection()
         super().closeEvent(event)
 
@@ -262,9 +396,98 @@ class AppState:
         self.transition_complete = False
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="AirFlick gesture mouse control")
+    parser.add_argument("--profile", type=float, metavar="SECONDS", default=None,
+                        help="sample the frame loop for SECONDS once the main window is shown")
+    parser.add_argument("--profile-dir", default="profiles",
+                        help="directory for profiler output (default: profiles)")
+    parser.add_argument("--log-level", default="info",
+                        help="event log level: debug, info, warning or error (default: info)")
+    parser.add_argument("--log-file", default=None,
+                        help="also append event log output to this file")
+    parser.add_argument("--record", metavar="PATH", default=None,
+                        help="record landmarks and gestures of every frame to PATH")
+    parser.add_argument("--gc-mode", choices=("steady", "legacy"), default="steady",
+                        help="steady: freeze startup objects and tune GC thresholds (default); "
+                             "legacy: force a full collection every 60 s")
+    parser.add_argument("--reprobe-camera", action="store_true",
+                        help="probe the camera's capture modes again instead of using the saved profile")
+    parser.add_argument("--source", default="0",
+                        help="frame source: camera index, video file, image directory or 'synthetic[:WxH]' (default: 0)")
+    parser.add_argument("--fast-source", action="store_true",
+                        help="play files, image directories and synthetic frames as fast as possible")
+    parser.add_argument("--scroll-mode", choices=("hold", "velocity", "steps"), default="hold",
+                        help="hold: kinetic scrolling that speeds up while the thumb gesture is held (default); "
+                             "velocity: kinetic scrolling that follows vertical hand movement; "
+                             "steps: one wheel step per frame")
+    parser.add_argument("--click-mode", choices=("predictive", "threshold"), default="predictive",
+                        help="predictive: show the click as the pinch is about to close, press on contact without "
+                             "the one-frame hold, release when it opens (default); "
+                             "threshold: click once the pinch distance is below 0.04")
+    parser.add_argument("--click-confidence", type=float, default=0.6,
+                        help="how steady a closing pinch must be (0-1) before a press is predicted (default: 0.6)")
+    parser.add_argument("--keyboard-backend", choices=("auto", "pynput", "uinput", "null"), default="auto",
+                        help="how keystrokes are injected: pynput (XTest/SendInput), uinput (Linux, needs python-evdev) "
+                             "or null (discard); auto picks pynput when a display is available")
+    parser.add_argument("--hand-typing", choices=("off", "pinch", "dwell"), default="off",
+                        help="while the virtual keyboard is shown, point at keys with the index finger and "
+                             "type by pinching (pinch) or by resting on a key (dwell) instead of moving the cursor")
+    parser.add_argument("--word-list", metavar="PATH", default=None,
+                        help="word-frequency file for keyboard predictions, one 'word count' per line "
+                             "(default: ~/.config/airflick/words.txt, then /usr/share/dict/words)")
+    parser.add_argument("--pointer-mode", choices=("relative", "absolute"), default="relative",
+                        help="relative: move the cursor by fingertip deltas like a mouse (default); "
+                             "absolute: map the fingertip straight to the screen with the saved calibration")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="start the absolute pointer calibration (also F8): hold the index finger "
+                             "on each screen corner until it is captured")
+    parser.add_argument("--idle-after", type=float, metavar="SECONDS", default=10.0,
+                        help="go idle after this long without a hand: frames are only checked for motion "
+                             "at --idle-fps until something moves (default: 10, 0 disables)")
+    parser.add_argument("--idle-fps", type=float, default=4.0,
+                        help="frames per second read while idle (default: 4)")
+    parser.add_argument("--stream-to", metavar="HOST:PORT", default=None,
+                        help="stream the landmarks of every frame to a controller node running "
+                             "'landmark_stream.py receive' (port defaults to 50505)")
+    parser.add_argument("--stream-protocol", choices=("udp", "tcp"), default="udp",
+                        help="udp: drop late frames (default); tcp: ordered delivery, frames are dropped "
+                             "only while the connection is down or backed up")
+    parser.add_argument("--event-server", metavar="HOST:PORT", default=None,
+                        help="stream gesture, status and hand events to TCP clients as JSON lines "
+                             "(port defaults to 50506)")
+    parser.add_argument("--screenshot-backend", choices=("auto", "xshm", "hotkey"), default="auto",
+                        help="auto: grab the screen in-process through X11 shared memory when available, "
+                             "else send PrintScreen (default); xshm: always grab in-process; "
+                             "hotkey: only send PrintScreen to the desktop's screenshot tool")
+    parser.add_argument("--screenshot-dir", default=SCREENSHOT_DIRECTORY,
+                        help=f"where grabbed screenshots are saved (default: {SCREENSHOT_DIRECTORY})")
+    parser.add_argument("--screenshot-format", choices=("png", "webp"), default="png",
+                        help="image format of grabbed screenshots (default: png)")
+    args, qt_args = parser.parse_known_args()
+    if args.screenshot_backend == "xshm":
+        # Fail at startup rather than on the first screenshot gesture
+        try:
+            create_screen_capture("xshm").close()
+        except ScreenCaptureError as e:
+            parser.error(f"--screenshot-backend xshm: {e}")
+
+    event_log.set_level(args.log_level)
+    if args.log_file:
+        event_log.open_file(args.log_file)
+
+    app = QApplication(sys.argv[:1] + qt_args)
     
-    main_app = AirFlick()
+    main_app = AirFlick(profile_duration=args.profile or 10.0, profile_dir=args.profile_dir,
+                        record_path=args.record, gc_mode=args.gc_mode,
+                        reprobe_camera=args.reprobe_camera, source=args.source,
+                        realtime_source=not args.fast_source, scroll_mode=args.scroll_mode,
+                        click_mode=args.click_mode, click_confidence=args.click_confidence,
+                        keyboard_backend=args.keyboard_backend, hand_typing=args.hand_typing,
+                        word_list=args.word_list, pointer_mode=args.pointer_mode,
+                        calibrate=args.calibrate, idle_after=args.idle_after, idle_fps=args.idle_fps,
+                        stream_to=args.stream_to, stream_protocol=args.stream_protocol,
+                        event_server=args.event_server, screenshot_backend=args.screenshot_backend,
+                        screenshot_dir=args.screenshot_dir, screenshot_format=args.screenshot_format)
     main_app.setWindowTitle("AirFlick - Innovate the way you interact")
     
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -288,6 +511,12 @@ if __name__ == '__main__':
         main_app.activateWindow()
         
         app.processEvents()
+
+        if args.gc_mode == "steady":
+            enter_steady_state()
+
+        if args.profile:
+            main_app.profiler.start(args.profile, main_app.processor.thread_ident)
     
     welcome = WelcomeScreen(splash_image_path)
     welcome.animation_finished.connect(show_main_window)
@@ -0,0 +1,71 @@
+import gc
+import time
+from collections import deque
+
+from event_log import event_log
+
+# Generation thresholds for steady state. Young collections stay frequent (and
+# cheap); older generations are only scanned after many young collections, so
+# a full collection practically never lands in the middle of tracking.
+STEADY_THRESHOLDS = (5000, 50, 1000)
+
+
+class GCPauseMonitor:
+    """
+    Records the duration of every garbage collection through ``gc.callbacks``.
+    The callback itself only appends to a bounded deque, so it adds nothing
+    noticeable to the pause it measures.
+    """
+    def __init__(self, history=4096):
+        self.pauses = deque(maxlen=history)  # (wall time, generation, duration ms, collected)
+        self.counts = [0, 0, 0]
+        self.max_ms = [0.0, 0.0, 0.0]
+        self.total_ms = [0.0, 0.0, 0.0]
+        self._started = None
+        self._installed = False
+
+    def install(self):
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self):
+        if self._installed:
+            gc.callbacks.remove(self._callback)
+            self._installed = False
+
+    def _callback(self, phase, info):
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            duration_ms = (time.perf_counter() - self._started) * 1000.0
+            self._started = None
+            generation = info["generation"]
+            self.pauses.append((time.time(), generation, duration_ms, info["collected"]))
+            self.counts[generation] += 1
+            self.total_ms[generation] += duration_ms
+            if duration_ms > self.max_ms[generation]:
+                self.max_ms[generation] = duration_ms
+            if duration_ms >= 1.0:
+                event_log.debug("gc", "Gen %d collection paused %.2fms", generation, duration_ms)
+
+    def summary(self):
+        parts = []
+        for generation in range(3):
+            count = self.counts[generation]
+            if count:
+                parts.append(f"gen{generation}: {count} pauses, max {self.max_ms[generation]:.2f}ms, "
+                             f"mean {self.total_ms[generation] / count:.3f}ms")
+        return "; ".join(parts) or "no collections"
+
+
+def enter_steady_state(thresholds=STEADY_THRESHOLDS):
+    """
+    Collect once, then move every object that survived startup (Qt wrappers,
+    MediaPipe graph, imported modules) into the permanent generation so later
+    collections never traverse them again.
+    """
+    gc.collect()
+    gc.freeze()
+    gc.set_threshold(*thresholds)
+    event_log.info("gc", "Steady-state GC: %d objects frozen, thresholds %s", gc.get_freeze_count(), thresholds)
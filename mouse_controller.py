@@ -1,37 +1,63 @@
-import cv2
 from pynput.mouse import Button, Controller
 import pyautogui
 import numpy as np
+import math
 import time
 from hand_detection import HandDetector  # Import at the top level
+from gesture_timing import GestureTimer
+
+class NullMouse:
+    """
+    Drop-in replacement for pynput's mouse Controller that only records events.
+    Used when replaying recordings, benchmarking and testing without a display.
+    """
+    def __init__(self, position=(0, 0)):
+        self.position = position
+        self.events = []
+
+    def press(self, button):
+        self.events.append(("press", button))
+
+    def release(self, button):
+        self.events.append(("release", button))
+
+    def click(self, button, count=1):
+        self.events.append(("click", button, count))
+
+    def scroll(self, dx, dy):
+        self.events.append(("scroll", dx, dy))
+
 
 class MouseController:
-    def __init__(self):
-        self.mouse = Controller()
-        self.screen_width, self.screen_height = pyautogui.size()
+    def __init__(self, hand_detector=None, mouse=None, screen_size=None):
+        self.mouse = mouse if mouse is not None else Controller()
+        self.screen_width, self.screen_height = screen_size if screen_size else pyautogui.size()
+        # Time source for cooldowns; replays swap in the recorded timestamps
+        self.clock = time.time
         self.prev_x, self.prev_y = None, None  # Previous finger position
         self.smooth_factor = 0.2
         self.last_click_time = 0
         self.click_cooldown = 0.1  # Further reduced for maximum responsiveness
+        self.click_detector = None  # Optional predictive ClickDetector (press/release, drag)
+        self.absolute_pointer = None  # Optional AbsolutePointer: calibrated absolute mode
 
         # Add scaling factor to amplify hand movements
         self.scaling_factor = 4.0  # Default sensitivity increased from 2.0 to 4.0
 
-        # For gesture state tracking
+        # For gesture state tracking: hold, repeat and cooldown in milliseconds of
+        # frame time (see gesture_timing.py), so they don't change with the fps
         self.previous_gesture = None
-        self.gesture_hold_frames = 0
-        self.required_hold_frames = 0  # Removed hold time for instant gestures
+        self.gesture_timer = GestureTimer()
         
         # For scrolling
-        self.last_scroll_time = 0
-        self.scroll_cooldown = 0.03  # Faster scroll interval
-        self.scroll_amount = 1  # Base scroll amount
+        self.scroll_amount = 1  # Base scroll amount per repeat
         self.scroll_speed_factor = 1.0  # Default scroll speed factor
         self.scroll_accumulator = 0.0
         self.last_scroll_direction = None
+        self.scroll_engine = None  # Optional ScrollEngine for kinetic scrolling
         
         # Create a single instance of HandDetector to reuse
-        self.hand_detector = HandDetector()
+        self.hand_detector = hand_detector if hand_detector is not None else HandDetector()
 
     def is_index_finger_only(self, landmarks):
         """Check if only index finger is up and all others are down"""
@@ -83,7 +109,7 @@ class MouseController:
     
     def calculate_distance(self, point1, point2):
         """Calculate normalized distance between two landmarks"""
-        return np.sqrt((point1.x - point2.x)**2 + (point1.y - point2.y)**2)
+        return math.hypot(point1.x - point2.x, point1.y - point2.y)
     
     def is_finger_raised(self, landmarks, tip_idx, pip_idx):
         """Check if a finger is raised by comparing tip height with PIP joint"""
@@ -107,40 +133,69 @@ class MouseController:
         
     def perform_click(self, button_type="left"):
         """Perform a mouse click"""
-        current_time = time.time()
+        current_time = self.clock()
         if current_time - self.last_click_time > self.click_cooldown:
-            if button_type == "left":
-                self.mouse.press(Button.left)
-                self.mouse.release(Button.left)
-            elif button_type == "right":
-                self.mouse.press(Button.right)
-                self.mouse.release(Button.right)
-            self.last_click_time = current_time
+            self._click(button_type, current_time)
             return True
         return False
+
+    def _click(self, button_type, current_time):
+        if button_type == "left":
+            self.mouse.press(Button.left)
+            self.mouse.release(Button.left)
+        elif button_type == "right":
+            self.mouse.press(Button.right)
+            self.mouse.release(Button.right)
+        self.last_click_time = current_time
     
-    def perform_scroll(self, direction="up"):
-        """Perform a scroll action"""
-        current_time = time.time()
-        if current_time - self.last_scroll_time > self.scroll_cooldown:
-            if self.last_scroll_direction != direction:
-                self.scroll_accumulator = 0.0
-                self.last_scroll_direction = direction
-
-            self.scroll_accumulator += self.scroll_amount * self.scroll_speed_factor
-            scroll_steps = int(self.scroll_accumulator)
-
-            if scroll_steps > 0:
-                if direction == "up":
-                    self.mouse.scroll(0, scroll_steps)
-                elif direction == "down":
-                    self.mouse.scroll(0, -scroll_steps)
-                
-                self.scroll_accumulator -= scroll_steps
-            
-            self.last_scroll_time = current_time
+    def perform_click_events(self, events):
+        """
+        Apply ("press"|"release", button) events from the click detector;
+        predictions and their cancellations never reach the mouse.
+        Returns the gesture name of a press, None otherwise.
+        """
+        gesture = None
+        for action, button in events:
+            mouse_button = Button.left if button == "left" else Button.right
+            if action == "press":
+                self.mouse.press(mouse_button)
+                self.last_click_time = self.clock()
+                gesture = "Left Click" if button == "left" else "Right Click"
+            elif action == "release":
+                self.mouse.release(mouse_button)
+        return gesture
+
+    def release_buttons(self):
+        """Release any button held by a pinch (the hand was lost)"""
+        if self.click_detector is not None:
+            self.perform_click_events(self.click_detector.release_all())
+
+    def perform_scroll(self, direction="up", hand_y=None, repeats=1):
+        """
+        Perform a scroll action. With a scroll engine attached the gesture only
+        feeds its velocity (``hand_y`` is used in its velocity mode) and the
+        engine scrolls smoothly on its own timer. Otherwise ``repeats`` scroll
+        repeats (see gesture_timing.py) are turned into wheel steps.
+        """
+        if self.scroll_engine is not None:
+            self.scroll_engine.speed_factor = self.scroll_speed_factor
+            self.scroll_engine.hold(direction, hand_y)
             return True
-        return False
+        if self.last_scroll_direction != direction:
+            self.scroll_accumulator = 0.0
+            self.last_scroll_direction = direction
+
+        self.scroll_accumulator += self.scroll_amount * self.scroll_speed_factor * repeats
+        scroll_steps = int(self.scroll_accumulator)
+
+        if scroll_steps > 0:
+            if direction == "up":
+                self.mouse.scroll(0, scroll_steps)
+            elif direction == "down":
+                self.mouse.scroll(0, -scroll_steps)
+            
+            self.scroll_accumulator -= scroll_steps
+        return True
 
     def set_scroll_speed(self, speed_factor):
         """Set the scroll speed factor."""
@@ -161,7 +216,7 @@ class MouseController:
         delta_y = (y - self.prev_y)
         
         # Calculate movement speed (magnitude of the movement vector)
-        movement_speed = np.sqrt(delta_x**2 + delta_y**2)
+        movement_speed = math.hypot(delta_x, delta_y)
         
         # Apply pointer acceleration
         # Define thresholds for slow and fast movements
@@ -211,6 +266,26 @@ class MouseController:
         except:
             return None, None
     
+    def move_mouse_absolute(self, x, y):
+        """
+        Put the pointer where the calibrated homography maps the fingertip.
+        The position is written only, never read back from the display.
+        """
+        position = self.absolute_pointer.update(x, y)
+        if position is None:
+            return None, None
+        try:
+            self.mouse.position = position
+            return position
+        except:
+            return None, None
+
+    def move_pointer(self, x, y):
+        """Move for this frame's fingertip in the active pointer mode"""
+        if self.absolute_pointer is not None:
+            return self.move_mouse_absolute(x, y)
+        return self.move_mouse_relative(x, y)
+
     def move_mouse(self, x, y):
         """Legacy method for absolute positioning - kept for compatibility"""
         try:
@@ -219,78 +294,95 @@ class MouseController:
         except pyautogui.FailSafeException:
             return False
 
+    def _annotate(self, overlay, text, y, color):
+        """Queue gesture feedback text; skipped when there is no overlay (replay/headless/hidden preview)"""
+        if overlay is not None:
+            overlay.label(text, (50, y), color)
 
-
-    def detect_gestures(self, frame, hand_landmarks):
-        """Detect and perform mouse clicks based on hand gestures with improved stability"""
+    def detect_gestures(self, overlay, hand_landmarks, timestamp=None):
+        """
+        Detect and perform mouse clicks based on hand gestures with improved stability.
+        ``overlay`` (an overlay_renderer.Overlay) may be None to skip visual
+        feedback. ``timestamp`` is the frame's time in seconds (``self.clock()`` when None).
+        """
         current_gesture = None
+        if timestamp is None:
+            timestamp = self.clock()
         
         if hand_landmarks:
             # Use the single instance of HandDetector created in __init__
             # instead of creating a new one for every frame
-            
+
             # Check for thumbs up gesture (scroll up)
             if self.hand_detector.is_thumbs_up(hand_landmarks.landmark):
                 current_gesture = "Scroll Up"
-                cv2.putText(frame, "Scroll Up Detected", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                self._annotate(overlay, "Scroll Up Detected", 100, (0, 255, 0))
             
             # Check for thumbs down gesture (scroll down)
             elif self.hand_detector.is_thumbs_down(hand_landmarks.landmark):
                 current_gesture = "Scroll Down"
-                cv2.putText(frame, "Scroll Down Detected", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-            
-            # Check for left click gesture
-            elif self.is_left_click(hand_landmarks.landmark):
-                current_gesture = "Left Click"
-                cv2.putText(frame, "Left Click Detected", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            
-            # Check for right click gesture
-            elif self.is_right_click(hand_landmarks.landmark):
-                current_gesture = "Right Click"
-                cv2.putText(frame, "Right Click Detected", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                self._annotate(overlay, "Scroll Down Detected", 100, (0, 0, 255))
+
+            # The click detector sees every frame so its velocity estimate stays
+            # current, and its press/release events always reach the mouse.
+            # Scrolling takes precedence, as it does over threshold clicks.
+            clicked = predicted = None
+            if self.click_detector is not None:
+                events = self.click_detector.update(hand_landmarks.landmark, timestamp, can_press=current_gesture is None)
+                clicked = self.perform_click_events(events)
+                predicted = next((button for action, button in events if action == "predict"), None)
+
+            if current_gesture is None and self.click_detector is not None:
+                # Predictive pinch clicks (press and release are separate events, not timed)
+                if clicked:
+                    self._annotate(overlay, f"{clicked} Performed!", 140, (0, 255, 0) if clicked == "Left Click" else (0, 0, 255))
+                elif predicted:
+                    self._annotate(overlay, f"{predicted.capitalize()} Click Predicted", 100,
+                                   (0, 255, 0) if predicted == "left" else (0, 0, 255))
+
+            elif current_gesture is None:
+                # Check for left click gesture
+                if self.is_left_click(hand_landmarks.landmark):
+                    current_gesture = "Left Click"
+                    self._annotate(overlay, "Left Click Detected", 100, (0, 255, 0))
+
+                # Check for right click gesture
+                elif self.is_right_click(hand_landmarks.landmark):
+                    current_gesture = "Right Click"
+                    self._annotate(overlay, "Right Click Detected", 100, (0, 0, 255))
             
-            # Handle gesture state for stability
-            if current_gesture == self.previous_gesture and current_gesture is not None:
-                self.gesture_hold_frames += 1
-                if self.gesture_hold_frames >= self.required_hold_frames:
-                    # We've held the gesture long enough to trigger
-                    if current_gesture == "Left Click":
-                        if self.perform_click("left"):
-                            cv2.putText(frame, "Left Click Performed!", (50, 140), 
-                                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                            # Reset counter after click to avoid multiple clicks
-                            self.gesture_hold_frames = 0
-                            return frame, "Left Click"
-                    
-                    elif current_gesture == "Right Click":
-                        if self.perform_click("right"):
-                            cv2.putText(frame, "Right Click Performed!", (50, 140), 
-                                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-                            # Reset counter after click
-                            self.gesture_hold_frames = 0
-                            return frame, "Right Click"
-                    
-                    elif current_gesture == "Scroll Up":
-                        if self.perform_scroll("up"):
-                            cv2.putText(frame, "Scrolling Up!", (50, 140), 
-                                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                            # Don't reset the counter to allow continuous scrolling
-                            return frame, "Scroll Up"
-                    
-                    elif current_gesture == "Scroll Down":
-                        if self.perform_scroll("down"):
-                            cv2.putText(frame, "Scrolling Down!", (50, 140), 
-                                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-                            # Don't reset the counter to allow continuous scrolling
-                            return frame, "Scroll Down"
-            else:
-                # Reset counter if gesture changed
-                self.gesture_hold_frames = 0
-                
+            # Handle gesture state for stability: hold, repeat and cooldown
+            fired = self.gesture_timer.update(current_gesture, 1000.0 * timestamp)
+            if current_gesture != self.previous_gesture:
+                if self.scroll_engine is not None and self.previous_gesture in ("Scroll Up", "Scroll Down"):
+                    # Let the scroll coast from now rather than after the hold timeout
+                    self.scroll_engine.release()
             self.previous_gesture = current_gesture
+            if clicked:
+                return overlay, clicked
+
+            if fired and current_gesture == "Left Click":
+                self._click("left", self.clock())
+                self._annotate(overlay, "Left Click Performed!", 140, (0, 255, 0))
+                return overlay, "Left Click"
+
+            elif fired and current_gesture == "Right Click":
+                self._click("right", self.clock())
+                self._annotate(overlay, "Right Click Performed!", 140, (0, 0, 255))
+                return overlay, "Right Click"
+
+            # Once a scroll is active the engine is fed every frame; wheel steps follow the repeats
+            elif current_gesture in ("Scroll Up", "Scroll Down") and self.gesture_timer.is_active(current_gesture):
+                if fired or self.scroll_engine is not None:
+                    up = current_gesture == "Scroll Up"
+                    self.perform_scroll("up" if up else "down", hand_landmarks.landmark[0].y, fired)
+                    self._annotate(overlay, "Scrolling Up!" if up else "Scrolling Down!", 140, (0, 255, 0) if up else (0, 0, 255))
+                    return overlay, current_gesture
         
-        return frame, None
+        return overlay, None
         
     def reset_tracking(self):
         """Reset tracking state when finger tracking starts/stops"""
-        self.prev_x, self.prev_y = None, None
\ No newline at end of file
+        self.prev_x, self.prev_y = None, None
+        if self.absolute_pointer is not None:
+            self.absolute_pointer.reset()
\ No newline at end of file
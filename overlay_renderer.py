@@ -0,0 +1,165 @@
+import cv2
+import numpy as np
+
+from landmark_arrays import NUM_LANDMARKS, landmarks_to_array
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# MediaPipe's 21 hand connections as six open chains: thumb, four fingers, palm
+HAND_CHAINS = ((0, 1, 2, 3, 4), (5, 6, 7, 8), (9, 10, 11, 12), (13, 14, 15, 16), (17, 18, 19, 20),
+               (0, 5, 9, 13, 17, 0))
+_CHAIN_INDEX = np.concatenate(HAND_CHAINS)
+_CHAIN_SPLITS = np.cumsum([len(chain) for chain in HAND_CHAINS])[:-1]
+
+HAND_COLOR = (224, 224, 224)  # mp_drawing's default white
+
+
+class Overlay:
+    """
+    Draw commands collected while a frame is processed and drawn later, once,
+    on the preview image. Hand-relative positions (markers, rectangles, arcs)
+    are normalised like landmarks; label origins and all sizes are in capture
+    pixels, as ``cv2.putText`` took them before, and are scaled to the preview.
+    """
+    def __init__(self):
+        self.hands = []
+        self.labels = []
+        self.markers = []
+        self.rects = []
+        self.arcs = []
+
+    def clear(self):
+        for commands in (self.hands, self.labels, self.markers, self.rects, self.arcs):
+            commands.clear()
+
+    def hand(self, hand_landmarks):
+        self.hands.append(hand_landmarks)
+
+    def label(self, text, origin, color, scale=1.0, thickness=2, background=None):
+        """Text with its baseline at ``origin``; ``background`` fills a padded box behind it"""
+        self.labels.append((text, origin, color, scale, thickness, background))
+
+    def marker(self, x, y, radius, color, thickness=-1):
+        self.markers.append((x, y, radius, color, thickness))
+
+    def rect(self, left, top, right, bottom, color, thickness=2):
+        self.rects.append((left, top, right, bottom, color, thickness))
+
+    def arc(self, x, y, radius, fraction, color, thickness=4):
+        """Part of a circle, clockwise from 12 o'clock"""
+        self.arcs.append((x, y, radius, fraction, color, thickness))
+
+
+class OverlayRenderer:
+    """
+    Draws an Overlay onto a frame shrunk to the preview size, so the drawing
+    cost follows the preview rather than the capture resolution.
+
+    All hand connections are one ``cv2.polylines`` call and all joints another
+    (zero-length segments draw as dots), instead of mp_drawing's per-point
+    Python loop. Labels are rendered once per text/colour/scale into a sprite
+    and mask, and later frames only copy them in.
+    """
+    def __init__(self, hand_color=HAND_COLOR, line_thickness=1, joint_radius=2, max_sprites=128):
+        self.hand_color = hand_color
+        self.line_thickness = line_thickness
+        self.joint_radius = joint_radius
+        self.max_sprites = max_sprites
+        self._sprites = {}
+        self._points = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+        self.sprite_misses = 0
+
+    @staticmethod
+    def preview_shape(frame_shape, max_size):
+        """(height, width) of the frame fitted inside ``max_size`` (width, height), never enlarged"""
+        h, w = frame_shape[:2]
+        if max_size is None:
+            return h, w
+        scale = min(max_size[0] / w, max_size[1] / h, 1.0)
+        return max(1, round(h * scale)), max(1, round(w * scale))
+
+    def render(self, frame, overlay=None, max_size=None, dst=None):
+        """
+        The preview image: ``frame`` resized into ``dst`` (when smaller) with
+        ``overlay`` drawn on top. Without resizing, ``frame`` is drawn on in place.
+        """
+        h, w = self.preview_shape(frame.shape, max_size)
+        if (h, w) != frame.shape[:2]:
+            image = cv2.resize(frame, (w, h), dst=dst, interpolation=cv2.INTER_AREA)
+        else:
+            image = frame
+        if overlay is not None:
+            self.draw(image, overlay, w / frame.shape[1])
+        return image
+
+    def draw(self, image, overlay, scale=1.0):
+        """Draw ``overlay`` onto ``image``; ``scale`` converts capture pixels to image pixels"""
+        h, w = image.shape[:2]
+        if overlay.hands:
+            self.draw_hands(image, overlay.hands)
+        for left, top, right, bottom, color, thickness in overlay.rects:
+            cv2.rectangle(image, (int(left * w), int(top * h)), (int(right * w), int(bottom * h)), color,
+                          self._scaled(thickness, scale))
+        for x, y, radius, color, thickness in overlay.markers:
+            cv2.circle(image, (int(x * w), int(y * h)), max(1, round(radius * scale)), color,
+                       thickness if thickness < 0 else self._scaled(thickness, scale))
+        for x, y, radius, fraction, color, thickness in overlay.arcs:
+            r = max(1, round(radius * scale))
+            cv2.ellipse(image, (int(x * w), int(y * h)), (r, r), -90, 0, int(360 * fraction), color,
+                        self._scaled(thickness, scale))
+        for text, (x, y), color, text_scale, thickness, background in overlay.labels:
+            self._blit(image, text, round(x * scale), round(y * scale), color,
+                       round(text_scale * scale, 2), self._scaled(thickness, scale), background)
+
+    def draw_hands(self, image, hands):
+        """Connections and joints of every hand: two OpenCV calls in total"""
+        h, w = image.shape[:2]
+        points = np.empty((len(hands), NUM_LANDMARKS, 2), dtype=np.int32)
+        for i, hand in enumerate(hands):
+            array = getattr(hand, "array", None)
+            if array is None:
+                array = landmarks_to_array(hand.landmark, self._points)
+            points[i] = array[:, :2] * (w, h)
+        lines = [chain for hand in points for chain in np.split(hand[_CHAIN_INDEX], _CHAIN_SPLITS)]
+        cv2.polylines(image, lines, False, self.hand_color, self.line_thickness, cv2.LINE_AA)
+        joints = np.repeat(points.reshape(-1, 1, 2), 2, axis=1)
+        cv2.polylines(image, joints, False, self.hand_color, 2 * self.joint_radius)
+
+    @staticmethod
+    def _scaled(thickness, scale):
+        return max(1, round(thickness * scale))
+
+    def _sprite(self, text, color, scale, thickness, background):
+        key = (text, color, scale, thickness, background)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            return sprite
+        self.sprite_misses += 1
+        if len(self._sprites) >= self.max_sprites:
+            self._sprites.clear()
+        (tw, th), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+        pad = round(10 * scale) if background is not None else 0
+        origin = (pad + thickness // 2, pad + th + thickness // 2)
+        shape = (th + baseline + thickness + 2 * pad, tw + thickness + 2 * pad)
+        image = np.zeros(shape + (3,), dtype=np.uint8)
+        if background is not None:
+            image[:] = background
+            mask = np.full(shape, 255, dtype=np.uint8)
+        else:
+            mask = np.zeros(shape, dtype=np.uint8)
+            cv2.putText(mask, text, origin, FONT, scale, 255, thickness)
+        cv2.putText(image, text, origin, FONT, scale, color, thickness, cv2.LINE_AA if background else cv2.LINE_8)
+        sprite = self._sprites[key] = (image, mask, origin)
+        return sprite
+
+    def _blit(self, image, text, x, y, color, scale, thickness, background):
+        sprite, mask, (ox, oy) = self._sprite(text, color, scale, thickness, background)
+        # Clip the sprite to the image
+        top, left = y - oy, x - ox
+        y0, x0 = max(0, -top), max(0, -left)
+        y1 = min(sprite.shape[0], image.shape[0] - top)
+        x1 = min(sprite.shape[1], image.shape[1] - left)
+        if y1 <= y0 or x1 <= x0:
+            return
+        roi = image[top + y0:top + y1, left + x0:left + x1]
+        cv2.copyTo(sprite[y0:y1, x0:x1], mask[y0:y1, x0:x1], roi)
@@ -0,0 +1,198 @@
+import json
+import math
+import os
+
+import cv2
+import numpy as np
+
+from event_log import event_log
+
+CALIBRATION_STORE = os.path.join(os.path.expanduser("~"), ".config", "airflick", "pointer_calibration.json")
+
+CORNER_NAMES = ("top_left", "top_right", "bottom_right", "bottom_left")
+# Fingertip positions (normalised, mirrored frame) assumed before any calibration,
+# the same box as MouseController's old calibration_corners
+DEFAULT_CORNERS = {"top_left": (0.2, 0.2), "top_right": (0.8, 0.2),
+                   "bottom_right": (0.8, 0.8), "bottom_left": (0.2, 0.8)}
+# Smallest camera area (normalised) the four corners may span; below it the mapping is unusable
+MIN_CORNER_AREA = 0.01
+
+
+def screen_corners(screen_size):
+    width, height = screen_size
+    return {"top_left": (0, 0), "top_right": (width - 1, 0),
+            "bottom_right": (width - 1, height - 1), "bottom_left": (0, height - 1)}
+
+
+def check_corners(camera_corners, min_area=MIN_CORNER_AREA):
+    """
+    Raise ValueError unless the corners, in CORNER_NAMES order, form a convex
+    quadrilateral spanning at least ``min_area``. Anything else gives a
+    degenerate or folded homography.
+    """
+    points = [camera_corners[name] for name in CORNER_NAMES]
+    crosses = []
+    area = 0.0
+    for i, (x0, y0) in enumerate(points):
+        x1, y1 = points[(i + 1) % 4]
+        x2, y2 = points[(i + 2) % 4]
+        crosses.append((x1 - x0) * (y2 - y1) - (y1 - y0) * (x2 - x1))
+        area += x0 * y1 - x1 * y0
+    if not (all(c > 0 for c in crosses) or all(c < 0 for c in crosses)):
+        raise ValueError("corners do not form a convex quadrilateral")
+    area = abs(area) / 2
+    if area < min_area:
+        raise ValueError(f"corners span too small an area ({area:.4f} < {min_area})")
+
+
+def compute_homography(camera_corners, screen_size):
+    """3x3 camera-to-screen homography from the fingertip position at each screen corner"""
+    src = np.float32([camera_corners[name] for name in CORNER_NAMES])
+    dst = np.float32([screen_corners(screen_size)[name] for name in CORNER_NAMES])
+    return cv2.getPerspectiveTransform(src, dst)
+
+
+def load_calibration(path=CALIBRATION_STORE):
+    """Saved camera corners, or None (also for a degenerate saved set)"""
+    try:
+        with open(path) as f:
+            corners = json.load(f)
+        corners = {name: tuple(corners[name]) for name in CORNER_NAMES}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    try:
+        check_corners(corners)
+    except ValueError as e:
+        event_log.warning("pointer", "Ignoring saved pointer calibration: %s", e)
+        return None
+    return corners
+
+
+def save_calibration(corners, path=CALIBRATION_STORE):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({name: list(corners[name]) for name in CORNER_NAMES}, f, indent=2)
+    except OSError as e:
+        event_log.warning("pointer", "Could not save pointer calibration: %s", e)
+
+
+class AbsolutePointer:
+    """
+    Maps a fingertip position straight to a screen position with a
+    precomputed homography. The pointer position is kept here, so nothing
+    is read back from the display server and no error accumulates.
+    """
+    def __init__(self, camera_corners, screen_size, smooth_factor=0.5):
+        self.screen_width, self.screen_height = screen_size
+        self.smooth_factor = smooth_factor  # Weight of the newest position (1 = no smoothing)
+        self.set_corners(camera_corners)
+
+    def set_corners(self, camera_corners):
+        """Raises ValueError for corners that check_corners() rejects"""
+        check_corners(camera_corners)
+        self.corners = dict(camera_corners)
+        h = compute_homography(camera_corners, (self.screen_width, self.screen_height))
+        # Plain floats: nine multiplications are cheaper in Python than a NumPy call
+        self.h = tuple(float(v) for v in h.ravel())
+        self.reset()
+
+    def reset(self):
+        self.x = self.y = None
+
+    def map(self, x, y):
+        """Screen pixel for a normalised camera position"""
+        h0, h1, h2, h3, h4, h5, h6, h7, h8 = self.h
+        w = h6 * x + h7 * y + h8
+        if abs(w) < 1e-9:
+            return None
+        return (h0 * x + h1 * y + h2) / w, (h3 * x + h4 * y + h5) / w
+
+    def update(self, x, y):
+        """Smoothed, clamped integer screen position for this frame's fingertip"""
+        mapped = self.map(x, y)
+        if mapped is None:
+            return None
+        sx = min(max(mapped[0], 0.0), self.screen_width - 1.0)
+        sy = min(max(mapped[1], 0.0), self.screen_height - 1.0)
+        if self.x is None:
+            self.x, self.y = sx, sy
+        else:
+            self.x += (sx - self.x) * self.smooth_factor
+            self.y += (sy - self.y) * self.smooth_factor
+        return round(self.x), round(self.y)
+
+
+class CornerCalibration:
+    """
+    Guided calibration: for each screen corner in turn the user points the
+    index finger at it and holds still for ``hold_time`` seconds. The median
+    fingertip position of the hold becomes that corner's camera point.
+    A hold only starts ``min_separation`` away from the corners already
+    captured, and a finished set that check_corners() rejects starts over.
+    """
+    def __init__(self, hold_time=1.0, tolerance=0.015, min_separation=0.05):
+        self.hold_time = hold_time
+        self.tolerance = tolerance  # Max fingertip wander (normalised) that still counts as still
+        self.min_separation = min_separation
+        self.rejected = None  # Why the last complete set was thrown away
+        self.corners = {}
+        self.step = 0
+        self._samples = []
+        self._since = None
+
+    @property
+    def done(self):
+        return self.step >= len(CORNER_NAMES)
+
+    @property
+    def target(self):
+        return None if self.done else CORNER_NAMES[self.step]
+
+    def prompt(self):
+        if self.done:
+            return "Calibration: done"
+        prompt = f"point at the {self.target.replace('_', ' ')} screen corner and hold still"
+        if self.rejected:
+            return f"Calibration rejected ({self.rejected}), start again: {prompt}"
+        return f"Calibration: {prompt}"
+
+    def update(self, x, y, timestamp):
+        """Feed the fingertip position; returns True when a corner was captured"""
+        if self.done:
+            return False
+        if any(math.hypot(x - cx, y - cy) <= self.min_separation for cx, cy in self.corners.values()):
+            self._samples = []  # Still at a captured corner: wait for the finger to move on
+            return False
+        if self._samples:
+            cx, cy = self._samples[0]
+            if math.hypot(x - cx, y - cy) > self.tolerance:
+                self._samples = []  # Moved: start the hold again from here
+        if not self._samples:
+            self._since = timestamp
+        self._samples.append((x, y))
+        if timestamp - self._since < self.hold_time:
+            return False
+        xs, ys = zip(*self._samples)
+        self.corners[self.target] = (float(np.median(xs)), float(np.median(ys)))
+        self.step += 1
+        self._samples = []
+        self.rejected = None
+        if self.done:
+            try:
+                check_corners(self.corners)
+            except ValueError as e:
+                event_log.warning("pointer", "Pointer calibration rejected: %s", e)
+                self.rejected = str(e)
+                self.corners = {}
+                self.step = 0
+        return True
+
+    def lost_hand(self):
+        self._samples = []
+
+    def progress(self, timestamp):
+        """0..1 of the current hold"""
+        if not self._samples or self._since is None:
+            return 0.0
+        return min(1.0, (timestamp - self._since) / self.hold_time)
@@ -0,0 +1,399 @@
+import argparse
+import contextlib
+import ctypes
+import ctypes.util
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from event_log import event_log
+
+DEFAULT_DIRECTORY = os.path.join("~", "Pictures", "AirFlick")
+FORMATS = {
+    "png": (".png", [cv2.IMWRITE_PNG_COMPRESSION, 1]),  # Fast compression: encode time matters more than size
+    "webp": (".webp", [cv2.IMWRITE_WEBP_QUALITY, 90]),
+}
+
+
+class ScreenCaptureError(RuntimeError):
+    """The capture backend is unavailable or a grab failed"""
+
+
+# ----- X11 shared-memory capture (ctypes, no extra dependencies) -----
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [("shmseg", ctypes.c_ulong), ("shmid", ctypes.c_int),
+                ("shmaddr", ctypes.c_void_p), ("readOnly", ctypes.c_int)]
+
+
+class XImage(ctypes.Structure):
+    # Leading fields only; the struct is allocated and freed by Xlib
+    _fields_ = [("width", ctypes.c_int), ("height", ctypes.c_int), ("xoffset", ctypes.c_int),
+                ("format", ctypes.c_int), ("data", ctypes.c_void_p), ("byte_order", ctypes.c_int),
+                ("bitmap_unit", ctypes.c_int), ("bitmap_bit_order", ctypes.c_int), ("bitmap_pad", ctypes.c_int),
+                ("depth", ctypes.c_int), ("bytes_per_line", ctypes.c_int), ("bits_per_pixel", ctypes.c_int),
+                ("red_mask", ctypes.c_ulong), ("green_mask", ctypes.c_ulong), ("blue_mask", ctypes.c_ulong)]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_int), ("display", ctypes.c_void_p), ("resourceid", ctypes.c_ulong),
+                ("serial", ctypes.c_ulong), ("error_code", ctypes.c_ubyte), ("request_code", ctypes.c_ubyte),
+                ("minor_code", ctypes.c_ubyte)]
+
+
+XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent))
+
+ZPIXMAP = 2
+ALL_PLANES = 0xFFFFFFFF
+IPC_PRIVATE, IPC_CREAT, IPC_RMID = 0, 0o1000, 0
+
+_x11 = None
+_x_errors = []
+
+
+@XErrorHandler
+def _record_x_error(display, event):
+    # Xlib's default handler exits the process; note the error and let the caller raise
+    _x_errors.append((event.contents.error_code, event.contents.request_code))
+    return 0
+
+
+def _load_x11():
+    """(libX11, libXext, libc) with prototypes, loaded once"""
+    global _x11
+    if _x11 is not None:
+        return _x11
+    names = [ctypes.util.find_library(name) for name in ("X11", "Xext", "c")]
+    if not all(names):
+        raise ScreenCaptureError("libX11/libXext not found")
+    x11, xext, libc = (ctypes.CDLL(name) for name in names)
+    p, i, u, ul = ctypes.c_void_p, ctypes.c_int, ctypes.c_uint, ctypes.c_ulong
+    shm_info = ctypes.POINTER(XShmSegmentInfo)
+    for lib, name, restype, argtypes in (
+            (x11, "XOpenDisplay", p, [ctypes.c_char_p]),
+            (x11, "XCloseDisplay", i, [p]),
+            (x11, "XDefaultScreen", i, [p]),
+            (x11, "XRootWindow", ul, [p, i]),
+            (x11, "XDisplayWidth", i, [p, i]),
+            (x11, "XDisplayHeight", i, [p, i]),
+            (x11, "XDefaultVisual", p, [p, i]),
+            (x11, "XDefaultDepth", i, [p, i]),
+            (x11, "XSync", i, [p, i]),
+            (x11, "XFree", i, [p]),
+            (x11, "XSetErrorHandler", p, [XErrorHandler]),
+            (xext, "XShmQueryExtension", i, [p]),
+            (xext, "XShmCreateImage", ctypes.POINTER(XImage), [p, p, u, i, p, shm_info, u, u]),
+            (xext, "XShmAttach", i, [p, shm_info]),
+            (xext, "XShmDetach", i, [p, shm_info]),
+            (xext, "XShmGetImage", i, [p, ul, ctypes.POINTER(XImage), i, i, ul]),
+            (libc, "shmget", i, [i, ctypes.c_size_t, i]),
+            (libc, "shmat", p, [i, p, i]),
+            (libc, "shmdt", i, [p]),
+            (libc, "shmctl", i, [i, i, p])):
+        func = getattr(lib, name)
+        func.restype, func.argtypes = restype, argtypes
+    _x11 = (x11, xext, libc)
+    return _x11
+
+
+@contextlib.contextmanager
+def _x_error_trap(x11):
+    """Record X errors raised by the calls in the block instead of exiting; the previous handler is restored"""
+    del _x_errors[:]
+    previous = x11.XSetErrorHandler(_record_x_error)
+    try:
+        yield _x_errors
+    finally:
+        x11.XSetErrorHandler(ctypes.cast(previous, XErrorHandler) if previous else XErrorHandler())
+
+
+class XShmCapture:
+    """
+    Grabs the whole X11 root window through the MIT-SHM extension: the X
+    server copies the pixels straight into a shared memory segment that is
+    mapped once, so a grab is one round trip plus one memcpy.
+    Use it from one thread at a time; works under Xvfb.
+    """
+    name = "xshm"
+
+    def __init__(self, display=None):
+        x11, xext, libc = _load_x11()
+        self._x11, self._xext, self._libc = x11, xext, libc
+        self.display = x11.XOpenDisplay(display.encode() if display else None)
+        if not self.display:
+            raise ScreenCaptureError(f"cannot open X display {display or os.environ.get('DISPLAY', '')!r}")
+        self._shm = XShmSegmentInfo()
+        self._image = None
+        self._attached = False
+        try:
+            self._setup()
+        except Exception:
+            self.close()
+            raise
+
+    def _setup(self):
+        x11, xext, libc, display = self._x11, self._xext, self._libc, self.display
+        if not xext.XShmQueryExtension(display):
+            raise ScreenCaptureError("the X server has no MIT-SHM extension")
+        screen = x11.XDefaultScreen(display)
+        self.root = x11.XRootWindow(display, screen)
+        self.width, self.height = x11.XDisplayWidth(display, screen), x11.XDisplayHeight(display, screen)
+        image = xext.XShmCreateImage(display, x11.XDefaultVisual(display, screen), x11.XDefaultDepth(display, screen),
+                                     ZPIXMAP, None, ctypes.byref(self._shm), self.width, self.height)
+        if not image:
+            raise ScreenCaptureError("XShmCreateImage failed")
+        self._image = image
+        if image.contents.bits_per_pixel != 32:
+            raise ScreenCaptureError(f"unsupported pixel format ({image.contents.bits_per_pixel} bits per pixel)")
+
+        stride = image.contents.bytes_per_line
+        size = stride * self.height
+        self._shm.shmid = libc.shmget(IPC_PRIVATE, size, IPC_CREAT | 0o600)
+        if self._shm.shmid < 0:
+            raise ScreenCaptureError("shmget failed")
+        address = libc.shmat(self._shm.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            libc.shmctl(self._shm.shmid, IPC_RMID, None)
+            raise ScreenCaptureError("shmat failed")
+        self._shm.shmaddr = image.contents.data = address
+        self._shm.readOnly = 0
+
+        with _x_error_trap(x11) as errors:
+            xext.XShmAttach(display, ctypes.byref(self._shm))
+            x11.XSync(display, 0)
+        # Marked for removal now, freed by the kernel once both sides detach (even after a crash)
+        libc.shmctl(self._shm.shmid, IPC_RMID, None)
+        if errors:
+            raise ScreenCaptureError(f"XShmAttach failed (X error {errors[0][0]}), is the display remote?")
+        self._attached = True
+        # BGRX rows as laid out by the server, viewed without copying
+        buffer = (ctypes.c_ubyte * size).from_address(address)
+        self._pixels = np.ctypeslib.as_array(buffer).reshape(self.height, stride // 4, 4)[:, :self.width]
+
+    def grab(self):
+        """A copy of the screen as an (H, W, 4) BGRX array"""
+        with _x_error_trap(self._x11) as errors:
+            ok = self._xext.XShmGetImage(self.display, self.root, self._image, 0, 0, ALL_PLANES)
+        if not ok or errors:
+            raise ScreenCaptureError("XShmGetImage failed")
+        # Copied so the next grab can reuse the segment while this one is encoded
+        return self._pixels.copy()
+
+    def close(self):
+        if not self.display:
+            return
+        if self._attached:
+            self._xext.XShmDetach(self.display, ctypes.byref(self._shm))
+            self._attached = False
+        if self._shm.shmaddr:
+            self._libc.shmdt(self._shm.shmaddr)
+            self._shm.shmaddr = None
+        if self._image:
+            # The data belongs to the segment, so free only the struct (what XDestroyImage does for SHM images)
+            self._x11.XFree(self._image)
+            self._image = None
+        self._x11.XCloseDisplay(self.display)
+        self.display = None
+
+
+def create_screen_capture(name="auto"):
+    """
+    Build a capture backend by name: "xshm", "hotkey" (None: use the
+    desktop's screenshot tool) or "auto" (X11 shared memory when a display
+    is available, otherwise the hotkey).
+    """
+    if name == "hotkey":
+        return None
+    if name == "auto" and (not sys.platform.startswith("linux") or not os.environ.get("DISPLAY")):
+        return None
+    try:
+        return XShmCapture()
+    except ScreenCaptureError as e:
+        if name == "xshm":
+            raise
+        event_log.info("screenshot", "In-process capture unavailable (%s), using the screenshot hotkey", e)
+        return None
+
+
+def check_xshm(width=320, height=240, timeout=5.0):
+    """
+    Run XShmCapture against a private Xvfb server: the root window starts
+    black, a red rectangle is drawn on it, and both grabs are compared with
+    what was drawn. Returns a description of the result. Raises
+    ScreenCaptureError when the grab is wrong, and skips (returns None) when
+    Xvfb is not installed.
+    """
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return None
+    number = next(n for n in range(90, 200)
+                  if not os.path.exists(f"/tmp/.X11-unix/X{n}") and not os.path.exists(f"/tmp/.X{n}-lock"))
+    server = subprocess.Popen([xvfb, f":{number}", "-screen", "0", f"{width}x{height}x24", "-br", "-nolisten", "tcp"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    capture = None
+    try:
+        deadline = time.monotonic() + timeout
+        while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise ScreenCaptureError(f"Xvfb :{number} did not start")
+            time.sleep(0.05)
+        capture = XShmCapture(f":{number}")
+        image = capture.grab()
+        if image.shape != (height, width, 4) or image.dtype != np.uint8:
+            raise ScreenCaptureError(f"grab is {image.shape} {image.dtype}, expected ({height}, {width}, 4) uint8")
+        if image[..., :3].any():
+            raise ScreenCaptureError("the black (-br) root window did not grab as black")
+
+        x11, display = capture._x11, capture.display
+        p, i, u, ul = ctypes.c_void_p, ctypes.c_int, ctypes.c_uint, ctypes.c_ulong
+        x11.XDefaultGC.restype, x11.XDefaultGC.argtypes = p, [p, i]
+        x11.XSetForeground.argtypes = [p, p, ul]
+        x11.XFillRectangle.argtypes = [p, ul, p, i, i, u, u]
+        gc = x11.XDefaultGC(display, x11.XDefaultScreen(display))
+        x11.XSetForeground(display, gc, 0xFF0000)  # Red in the 24-bit TrueColor visual
+        x11.XFillRectangle(display, capture.root, gc, 10, 20, 30, 40)
+        x11.XSync(display, 0)
+        image = capture.grab()
+        expected = np.zeros((height, width, 3), dtype=np.uint8)
+        expected[20:60, 10:40] = (0, 0, 255)  # BGR
+        if not np.array_equal(image[..., :3], expected):
+            wrong = np.count_nonzero((image[..., :3] != expected).any(axis=2))
+            raise ScreenCaptureError(f"{wrong} pixels differ from the drawn rectangle")
+        return f"XShmCapture on Xvfb :{number} ({width}x{height}): shape and pixels match"
+    finally:
+        if capture is not None:
+            capture.close()
+        server.terminate()
+        server.wait()
+
+
+# ----- encoding and writing off the frame loop -----
+
+class ScreenshotWriter:
+    """
+    Encodes grabbed screens to PNG or WebP and writes them on ``workers``
+    background threads. At most ``max_pending`` grabs wait for a worker;
+    beyond that new ones are dropped, so a burst of screenshots can neither
+    stall the caller nor pile up full-screen buffers in memory. OpenCV
+    releases the GIL while encoding, so workers run in parallel.
+    """
+    def __init__(self, directory=DEFAULT_DIRECTORY, image_format="png", workers=2, max_pending=4):
+        if image_format not in FORMATS:
+            raise ValueError(f"Unknown screenshot format {image_format!r}")
+        self.directory = os.path.expanduser(directory)
+        self.extension, self.params = FORMATS[image_format]
+        self.saved = 0
+        self.dropped = 0
+        self.failed = 0
+        self.encode_time = 0.0
+        self.last_path = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, name=f"Screenshot-{i}", daemon=True) for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, image, timestamp=None):
+        """Queue an (H, W, 3|4) BGR(X) image; returns False when it was dropped"""
+        try:
+            self._queue.put_nowait((image, time.time() if timestamp is None else timestamp))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            event_log.warning("screenshot", "Encoder busy, screenshot dropped")
+            return False
+
+    def path_for(self, timestamp):
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(timestamp))
+        return os.path.join(self.directory, f"airflick-{stamp}-{int(timestamp % 1 * 1000):03d}{self.extension}")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            image, timestamp = item
+            path = self.path_for(timestamp)
+            started = time.perf_counter()
+            try:
+                if image.ndim == 3 and image.shape[2] == 4:
+                    image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)  # X leaves the fourth byte undefined
+                ok, encoded = cv2.imencode(self.extension, image, self.params)
+                if not ok:
+                    raise ScreenCaptureError(f"encoding {self.extension} failed")
+                os.makedirs(self.directory, exist_ok=True)
+                # Written under a temporary name so a half-written file is never visible
+                partial = path + ".part"
+                with open(partial, "wb") as f:
+                    f.write(encoded.data)
+                os.replace(partial, path)
+            except (OSError, cv2.error, ScreenCaptureError) as e:
+                with self._lock:
+                    self.failed += 1
+                event_log.error("screenshot", "Saving %s failed: %r", path, e)
+                continue
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.saved += 1
+                self.encode_time += elapsed
+                self.last_path = path
+            event_log.info("screenshot", "Saved %s (%.0f ms)", path, 1000 * elapsed)
+
+    def close(self, timeout=5.0):
+        """Finish queued screenshots and stop the workers"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def summary(self):
+        mean = 1000 * self.encode_time / self.saved if self.saved else 0.0
+        return f"{self.saved} saved (mean {mean:.0f} ms to encode and write), {self.dropped} dropped, {self.failed} failed"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grab the screen through X11 shared memory (works under Xvfb)")
+    parser.add_argument("--count", type=int, default=10, help="grabs to time (default: 10)")
+    parser.add_argument("--save", metavar="DIR", default=None, help="also encode and save the grabs to DIR")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="png")
+    parser.add_argument("--check", action="store_true",
+                        help="check grabs against a private Xvfb server (skipped when Xvfb is not installed)")
+    args = parser.parse_args()
+
+    if args.check:
+        try:
+            result = check_xshm()
+        except ScreenCaptureError as e:
+            sys.exit(f"FAILED: {e}")
+        print(result or "skipped: Xvfb is not installed")
+        return
+
+    capture = XShmCapture()
+    writer = ScreenshotWriter(args.save, args.format) if args.save else None
+    try:
+        times = []
+        for _ in range(args.count):
+            started = time.perf_counter()
+            image = capture.grab()
+            times.append(time.perf_counter() - started)
+            if writer is not None:
+                writer.submit(image)
+        print(f"{capture.width}x{capture.height}: grab median {1000 * sorted(times)[len(times) // 2]:.2f} ms, "
+              f"max {1000 * max(times):.2f} ms")
+    finally:
+        capture.close()
+        if writer is not None:
+            writer.close()
+            print(writer.summary())
+
+
+if __name__ == "__main__":
+    main()
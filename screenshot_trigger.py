@@ -1,23 +1,35 @@
 import platform
-import threading
 import time
 
-try:
-    import pyautogui  # Lightweight and cross-platform for keyboard events
-except ImportError:
-    pyautogui = None
+from event_log import event_log
+from keyboard_backends import create_keyboard_backend
+from screen_capture import ScreenCaptureError, create_screen_capture
+
+# Thumb, index, middle, ring, pinky tips and every pair of them
+FINGERTIP_IDS = (4, 8, 12, 16, 20)
+FINGERTIP_PAIRS = tuple((i, j) for i in range(5) for j in range(i + 1, 5))
+
 
 class ScreenshotTrigger:
     """
-    Triggers a screenshot (Ctrl+PrtSc) when all five fingers are detected as touching/close ("pinch all" gesture).
-    Works cross-platform (Windows, Linux). Does NOT save the image, just triggers the OS screenshot tool.
-    Lightweight and non-blocking (runs in a thread).
+    Triggers a screenshot when all five fingers are detected as touching/close ("pinch all" gesture).
+    With a ``writer`` (ScreenshotWriter) the screen is grabbed in-process
+    (see screen_capture.py) and encoded and saved on background threads;
+    otherwise, or when the grab fails, the OS screenshot tool is triggered with
+    the PrintScreen hotkey. Works cross-platform (Windows, Linux).
+    Lightweight and non-blocking (the keyboard backend sends from its own thread).
     """
-    def __init__(self, hand_detector):
+    def __init__(self, hand_detector, send_hotkey=True, keyboard=None, writer=None, capture_backend="auto"):
         self.hand_detector = hand_detector
         self.triggered = False
         self.last_trigger_time = 0
         self.cooldown = 2  # seconds between triggers to avoid spamming
+        self.send_hotkey = send_hotkey  # False when replaying recordings
+        self.keyboard = keyboard  # KeyboardBackend, created on first use when not given
+        self.writer = writer  # Optional ScreenshotWriter: capture in-process instead of the hotkey
+        self.capture_backend = capture_backend
+        self.capture = None  # Opened on first use, on the thread that takes screenshots
+        self.clock = time.time
 
     def check_and_trigger(self, landmarks):
         """Return True if a screenshot gesture was detected and the hotkey was dispatched.
@@ -30,12 +42,13 @@ class ScreenshotTrigger:
         """
         detected = False
         if self.is_all_fingers_pinch(landmarks):
-            now = time.time()
+            now = self.clock()
             if not self.triggered or (now - self.last_trigger_time > self.cooldown):
                 self.triggered = True
                 self.last_trigger_time = now
                 detected = True
-                threading.Thread(target=self.send_screenshot_hotkey, daemon=True).start()
+                if self.send_hotkey:
+                    self.take_screenshot()
         else:
             self.triggered = False
         return detected
@@ -47,32 +60,54 @@ class ScreenshotTrigger:
     def is_all_fingers_pinch(self, landmarks):
         """
         Returns True if all 5 fingertips are close together ("pinch all" gesture).
-        Uses pairwise Euclidean distance with a threshold of 0.1. Prints debug info.
+        Uses pairwise Euclidean distance with a threshold of 0.1.
+        Debug details go to the rate-limited event log, never straight to stdout.
         """
         if not landmarks or len(landmarks) < 21:
             return False
-        tips = [landmarks[i] for i in [4, 8, 12, 16, 20]]  # Thumb, index, middle, ring, pinky tips
-        distances = []
-        for i in range(len(tips)):
-            for j in range(i + 1, len(tips)):
-                d = self.calculate_distance(tips[i], tips[j])
-                distances.append(d)
-                if d >= 0.1:
-                    print(f"[DEBUG] Fingertip pair {i}-{j} dist: {d:.4f} (too large)")
-                    return False
-        print(f"[DEBUG] All fingertip distances: {[f'{d:.4f}' for d in distances]}")
-        print(f"[DEBUG] Min dist: {min(distances):.4f}, Max dist: {max(distances):.4f}")
-        print("[DEBUG] Screenshot gesture detected!")
+        max_dist = 0.0
+        for i, j in FINGERTIP_PAIRS:
+            d = self.calculate_distance(landmarks[FINGERTIP_IDS[i]], landmarks[FINGERTIP_IDS[j]])
+            if d >= 0.1:
+                event_log.debug("gesture.screenshot", "Fingertip pair %d-%d dist: %.4f (too large)", i, j, d)
+                return False
+            if d > max_dist:
+                max_dist = d
+        event_log.debug("gesture.screenshot", "Screenshot gesture detected (max dist %.4f)", max_dist)
         return True
 
+    def take_screenshot(self):
+        """Grab the screen in-process when possible, else fall back to the hotkey"""
+        if self.writer is not None and self.capture is None and self.capture_backend != "hotkey":
+            try:
+                self.capture = create_screen_capture(self.capture_backend)
+            except ScreenCaptureError as e:
+                # An explicitly requested backend that can't open; never let it escape into the frame loop
+                event_log.warning("screenshot", "Cannot open %s capture (%s), using the hotkey", self.capture_backend, e)
+            if self.capture is None:
+                self.capture_backend = "hotkey"  # Don't retry on every gesture
+        if self.capture is not None:
+            try:
+                self.writer.submit(self.capture.grab())
+                return
+            except ScreenCaptureError as e:
+                event_log.warning("screenshot", "Screen grab failed (%s), using the hotkey", e)
+        self.send_screenshot_hotkey()
+
+    def close(self):
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
+        if self.writer is not None:
+            self.writer.close()
+
     def send_screenshot_hotkey(self):
-        if pyautogui is None:
-            print("pyautogui not installed, cannot trigger screenshot hotkey.")
-            return
+        if self.keyboard is None:
+            self.keyboard = create_keyboard_backend()
         os_name = platform.system()
         # Use PrintScreen for screenshot on Windows/Linux
         if os_name in ("Windows", "Linux"):
-            print("[DEBUG] Sending hotkey: printscreen")
-            pyautogui.hotkey('printscreen')
+            event_log.debug("screenshot", "Sending hotkey: printscreen")
+            self.keyboard.hotkey('printscreen')
         else:
-            pyautogui.hotkey('command', 'shift', '4')  # Mac example
+            self.keyboard.hotkey('command', 'shift', '4')  # Mac example
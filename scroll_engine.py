@@ -0,0 +1,212 @@
+import math
+import sys
+import threading
+import time
+
+from event_log import event_log
+
+try:
+    import evdev
+    from evdev import ecodes
+except ImportError:  # Linux-only, optional
+    evdev = None
+
+# Scroll wheels report 120 units per notch when they support high resolution
+# (Windows WHEEL_DELTA, Linux REL_WHEEL_HI_RES)
+HIRES_UNITS_PER_NOTCH = 120
+
+
+class PynputScrollOutput:
+    """
+    Scrolls through a pynput mouse Controller. On Windows pynput multiplies the
+    amount by WHEEL_DELTA, so fractional notches go through as they are;
+    the X11 and macOS backends only take whole notches.
+    """
+    def __init__(self, mouse):
+        self.mouse = mouse
+        self.units_per_notch = HIRES_UNITS_PER_NOTCH if sys.platform == "win32" else 1
+
+    def scroll(self, units):
+        self.mouse.scroll(0, units / self.units_per_notch if self.units_per_notch > 1 else units)
+
+    def close(self):
+        pass
+
+
+class UInputScrollOutput:
+    """
+    High-resolution wheel events through a uinput device (Linux, needs
+    python-evdev and write access to /dev/uinput). Whole notches are sent as
+    REL_WHEEL alongside, for applications that ignore REL_WHEEL_HI_RES.
+    """
+    units_per_notch = HIRES_UNITS_PER_NOTCH
+
+    def __init__(self):
+        self.device = evdev.UInput({ecodes.EV_REL: [ecodes.REL_WHEEL, ecodes.REL_WHEEL_HI_RES]},
+                                   name="airflick-scroll")
+        self.notch_remainder = 0
+
+    def scroll(self, units):
+        self.device.write(ecodes.EV_REL, ecodes.REL_WHEEL_HI_RES, units)
+        self.notch_remainder += units
+        notches = int(self.notch_remainder / HIRES_UNITS_PER_NOTCH)
+        if notches:
+            self.device.write(ecodes.EV_REL, ecodes.REL_WHEEL, notches)
+            self.notch_remainder -= notches * HIRES_UNITS_PER_NOTCH
+        self.device.syn()
+
+    def close(self):
+        self.device.close()
+
+
+def create_scroll_output(mouse):
+    """uinput high-resolution scrolling when available, pynput otherwise"""
+    if evdev is not None:
+        try:
+            return UInputScrollOutput()
+        except (OSError, evdev.UInputError) as e:
+            event_log.debug("scroll", "uinput unavailable, using pynput: %s", e)
+    return PynputScrollOutput(mouse)
+
+
+class ScrollEngine:
+    """
+    Kinetic scrolling on its own thread. Gestures don't scroll directly: they
+    set a target velocity (notches per second) and the engine ticks at a steady
+    ``rate`` Hz, easing the actual velocity towards the target and emitting
+    whatever distance was covered since the last tick, in the finest units the
+    output supports. When the gesture ends the velocity decays with
+    ``friction`` instead of stopping dead.
+
+    Two input modes:
+    - ``"hold"``: velocity grows with how long the thumbs-up/down is held,
+      from ``base_speed`` to ``max_speed`` over ``ramp_time`` seconds.
+    - ``"velocity"``: velocity follows the hand's vertical speed while the
+      gesture is held (moving the hand up scrolls up).
+    """
+    def __init__(self, output, rate=120.0, mode="hold", clock=time.monotonic):
+        self.output = output
+        self.rate = rate
+        self.mode = mode
+        self.clock = clock
+        self.speed_factor = 1.0
+
+        self.base_speed = 4.0        # notches/s when a hold starts
+        self.max_speed = 30.0        # notches/s after ramp_time
+        self.ramp_time = 1.5
+        self.hand_gain = 60.0        # notches/s per (frame heights/s) of hand movement
+        self.acceleration = 0.08     # time constant towards the target velocity (s)
+        self.friction = 0.35         # time constant of the inertial decay (s)
+        self.hold_timeout = 0.15     # a hold ends when no update arrives for this long
+        self.stop_speed = 0.05       # below this the engine goes idle
+
+        self.velocity = 0.0
+        self.emitted_notches = 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._direction = 0
+        self._hold_started = None
+        self._last_hold = None
+        self._last_hand = None       # (y, timestamp) in velocity mode
+        self._hand_velocity = 0.0
+        self._remainder = 0.0        # distance not yet emitted, in output units
+
+    # ----- input (frame thread) -----
+
+    def hold(self, direction, hand_y=None):
+        """Called on every frame the scroll gesture is seen; direction is "up" or "down" """
+        sign = 1 if direction == "up" else -1
+        now = self.clock()
+        with self._lock:
+            if sign != self._direction or self._last_hold is None or now - self._last_hold > self.hold_timeout:
+                self._hold_started = now
+                self._last_hand = None
+                self._hand_velocity = 0.0
+            self._direction = sign
+            self._last_hold = now
+            if hand_y is not None:
+                if self._last_hand is not None and now > self._last_hand[1]:
+                    # Image y grows downwards, scrolling up is positive
+                    self._hand_velocity = (self._last_hand[0] - hand_y) / (now - self._last_hand[1])
+                self._last_hand = (hand_y, now)
+        self._wake.set()
+
+    def release(self):
+        """End the current hold now; the scroll coasts to a stop"""
+        with self._lock:
+            self._last_hold = None
+
+    def stop_scrolling(self):
+        """Stop immediately, without inertia"""
+        with self._lock:
+            self._last_hold = None
+            self.velocity = 0.0
+            self._remainder = 0.0
+
+    def target_velocity(self, now):
+        """Velocity (notches/s) the current hold asks for, 0 when not holding"""
+        if self._last_hold is None or now - self._last_hold > self.hold_timeout:
+            return 0.0
+        if self.mode == "velocity":
+            return self._hand_velocity * self.hand_gain * self.speed_factor
+        ramp = min(1.0, (now - self._hold_started) / self.ramp_time) if self.ramp_time > 0 else 1.0
+        speed = self.base_speed + (self.max_speed - self.base_speed) * ramp
+        return self._direction * speed * self.speed_factor
+
+    # ----- engine thread -----
+
+    def step(self, dt, now=None):
+        """Advance the simulation by ``dt`` seconds and emit the covered distance"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            target = self.target_velocity(now)
+            tau = self.acceleration if target else self.friction
+            self.velocity += (target - self.velocity) * (1.0 - math.exp(-dt / tau))
+            if not target and abs(self.velocity) < self.stop_speed:
+                self.velocity = 0.0
+                self._remainder = 0.0
+                return 0
+            units_per_notch = self.output.units_per_notch
+            self._remainder += self.velocity * dt * units_per_notch
+            units = int(self._remainder)  # Truncates towards zero, keeps the sign
+            self._remainder -= units
+        if units:
+            self.output.scroll(units)
+            self.emitted_notches += units / units_per_notch
+        return units
+
+    def _run(self):
+        period = 1.0 / self.rate
+        last = time.perf_counter()
+        next_tick = last + period
+        while not self._stop_event.is_set():
+            self._wake.clear()
+            if self.velocity == 0.0 and not self.target_velocity(self.clock()):
+                # Nothing to do: sleep until a gesture arrives
+                self._wake.wait(0.5)
+                last = time.perf_counter()
+                next_tick = last + period
+                continue
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            now = time.perf_counter()
+            self.step(now - last)
+            last = now
+            next_tick = max(next_tick + period, now)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="ScrollEngine", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.output.close()
@@ -0,0 +1,394 @@
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+from batch_classifier import classify
+from landmark_arrays import GESTURE_CODES, GESTURE_NAMES, HANDEDNESS_CODES, NUM_LANDMARKS, HandLandmarks
+from landmark_recorder import FLAG_HAND, HEADER, MAGIC, RECORD_DTYPE, VERSION, quantize_landmarks
+
+# Hand model in palm units (wrist to middle knuckle ~1), x to the right and y
+# up the image (negative), z towards the camera (negative), as MediaPipe
+# reports them for a right hand in the mirrored preview.
+FINGER_MCPS = ((-0.3, -0.93), (-0.06, -1.0), (0.16, -0.95), (0.35, -0.85))  # Index, middle, ring, pinky
+FINGER_SPLAY = (-8.0, 0.0, 7.0, 15.0)  # Degrees from straight up
+FINGER_LENGTHS = ((0.45, 0.27, 0.2), (0.5, 0.31, 0.22), (0.47, 0.29, 0.21), (0.36, 0.22, 0.19))
+THUMB_CMC = (-0.25, -0.18)
+THUMB_LENGTHS = (0.35, 0.3, 0.25)  # CMC-MCP, MCP-IP, IP-tip
+
+EXTENDED = (2.0, 2.0, 2.0)   # Flexion of each finger joint in degrees
+FOLDED = (85.0, 100.0, 50.0)  # Curled into a fist: the tip ends below the knuckle
+HALF_BENT = (35.0, 35.0, 15.0)
+# Sideways curl (degrees per joint) of a relaxed open hand, fingers leaning towards the middle one.
+# Flexion alone keeps a finger straight in the image, and the index would count as pointing.
+OPEN_CURL = (10.0, 0.0, -6.0, -10.0)
+# Relaxed thumb of the point and fist poses: out to the side, clear of the folded fingertips
+# (no click) and of the pinky (a fist is no five-finger pinch), tip dipping below its IP joint
+# (no thumbs up/down)
+RELAXED_THUMB = (-60.0, (0.0, 30.0, 75.0))
+# Five-finger pinch: fingertips on a ring around one point. The thumb sits 110 degrees from the
+# index and middle tips, so they stay further apart than a click pinch while every tip is within
+# the screenshot spread; both hold across the scale range sessions move through.
+PINCH_ALL_TARGET = (-0.05, -1.35, -0.35)
+PINCH_ALL_RADIUS = 0.28
+PINCH_ALL_ANGLES = (0.0, 110.0, 250.0, 180.0, 145.0)  # Thumb, index, middle, ring, pinky
+
+# Image scale of one palm unit and where the hand is, in normalised coordinates
+DEFAULT_SCALE = 0.13
+DEFAULT_CENTER = (0.5, 0.62)
+
+GESTURES = ("point", "pinch_left", "pinch_right", "thumbs_up", "thumbs_down", "pinch_all", "open", "fist")
+# Ground-truth label (GESTURE_NAMES) while a gesture is fully formed
+GESTURE_LABELS = {
+    "point": "Pointing", "pinch_left": "Left Click", "pinch_right": "Right Click",
+    "thumbs_up": "Scroll Up", "thumbs_down": "Scroll Down", "pinch_all": "Screenshot",
+    "open": None, "fist": None,
+}
+# Pinch-type gestures close from a resting pose and open again within a segment
+PINCH_FROM = {"pinch_left": "point", "pinch_right": "point", "pinch_all": "open"}
+FORMED = 0.99  # Closure from which a pinch is labelled; between rest and this, frames are unlabelled
+
+NOISE_POOL = 1 << 14  # Frames of pre-drawn landmark jitter
+
+
+def _finger(mcp, splay, lengths, flexion, curl=0.0):
+    """
+    Four joints of a finger. Flexion bends it towards the camera and then back
+    down the palm; ``curl`` turns it sideways by that many degrees at each joint.
+    """
+    points = [(mcp[0], mcp[1], 0.0)]
+    x, y, z = points[0]
+    bend = 0.0
+    for joint, (length, flex) in enumerate(zip(lengths, flexion)):
+        direction = math.radians(splay + joint * curl)
+        dx, dy = math.sin(direction), -math.cos(direction)
+        bend += math.radians(flex)
+        x += length * dx * math.cos(bend)
+        y += length * dy * math.cos(bend)
+        z -= length * math.sin(bend)
+        points.append((x, y, z))
+    return points
+
+
+def _reach(base, target, bulge):
+    """Joints from ``base`` to ``target``, bowed sideways by ``bulge`` (fingers meeting in a pinch)"""
+    base, target = np.asarray(base, dtype=float), np.asarray(target, dtype=float)
+    direction = target - base
+    side = np.array([-direction[1], direction[0], 0.0])
+    points = [base]
+    for t in (0.45, 0.75, 1.0):
+        points.append(base + direction * t + side * bulge * math.sin(math.pi * t) + (0, 0, -0.15 * math.sin(math.pi * t)))
+    return points
+
+
+def _thumb(direction_deg, flexion):
+    return _finger(THUMB_CMC, direction_deg, THUMB_LENGTHS, flexion)
+
+
+def pose(gesture, handedness="Right"):
+    """(21, 3) float32 landmarks of ``gesture`` in palm units, wrist at the origin"""
+    fingers = [FOLDED] * 4
+    thumb = None
+    if gesture in ("point", "pinch_left"):
+        fingers[0] = EXTENDED if gesture == "point" else HALF_BENT
+    elif gesture == "pinch_right":
+        fingers[:2] = [EXTENDED, HALF_BENT]
+    elif gesture in ("open", "pinch_all"):
+        fingers = [EXTENDED] * 4
+    curls = OPEN_CURL if gesture == "open" else (0.0,) * 4
+    chains = [_finger(mcp, splay, lengths, flexion, curl)
+              for mcp, splay, lengths, flexion, curl in zip(FINGER_MCPS, FINGER_SPLAY, FINGER_LENGTHS, fingers, curls)]
+
+    if gesture == "thumbs_up":
+        thumb = _thumb(0.0, (0.0, 5.0, 5.0))
+    elif gesture == "thumbs_down":
+        thumb = _thumb(180.0, (0.0, 5.0, 5.0))
+    elif gesture == "open":
+        thumb = _thumb(-50.0, (5.0, 5.0, 5.0))
+    elif gesture in ("pinch_left", "pinch_right"):
+        # The thumb tip meets the index (left) or middle (right) fingertip
+        tip = np.array(chains[0 if gesture == "pinch_left" else 1][-1]) + (0.02, 0.02, 0.0)
+        thumb = _reach((*THUMB_CMC, 0.0), tip, -0.12)
+    elif gesture == "pinch_all":
+        # Every fingertip closes on a small ring in front of the palm
+        target = np.array(PINCH_ALL_TARGET)
+        offsets = PINCH_ALL_RADIUS * np.array([(math.sin(math.radians(a)), math.cos(math.radians(a)), 0.0)
+                                               for a in PINCH_ALL_ANGLES])
+        thumb = _reach((*THUMB_CMC, 0.0), target + offsets[0], -0.1)
+        chains = [_reach((*mcp, 0.0), target + offset, 0.05) for mcp, offset in zip(FINGER_MCPS, offsets[1:])]
+    else:
+        thumb = _thumb(*RELAXED_THUMB)
+
+    points = np.array([(0.0, 0.0, 0.0)] + list(thumb) + [p for chain in chains for p in chain], dtype=np.float32)
+    if handedness == "Left":
+        points[:, 0] = -points[:, 0]
+    return points
+
+
+def place(points, center=DEFAULT_CENTER, scale=DEFAULT_SCALE, rotation=0.0):
+    """Palm-unit landmarks (..., 21, 3) to normalised image coordinates"""
+    c, s = math.cos(rotation), math.sin(rotation)
+    out = np.empty_like(points)
+    out[..., 0] = center[0] + scale * (c * points[..., 0] - s * points[..., 1])
+    out[..., 1] = center[1] + scale * (s * points[..., 0] + c * points[..., 1])
+    out[..., 2] = scale * points[..., 2]
+    return out
+
+
+def hand(gesture, handedness="Right", **placement):
+    """One HandLandmarks in image coordinates (the objects HandDetector.find_hands returns a list of)"""
+    return HandLandmarks(place(pose(gesture, handedness), **placement))
+
+
+def closure_profile(t):
+    """0..1 over a pinch segment (``t`` from 0 to 1): rest, close, hold, open again"""
+    up = np.clip((t - 0.3) / 0.15, 0.0, 1.0)
+    down = np.clip((0.9 - t) / 0.15, 0.0, 1.0)
+    c = np.minimum(up, down)
+    return c * c * (3.0 - 2.0 * c)  # Smoothstep
+
+
+class SyntheticSession:
+    """Generated landmark stream: arrays like a dequantised recording plus ground truth"""
+    def __init__(self, points, present, labels, timestamps, handedness):
+        self.points = points          # (N, 21, 3) float32, zeros where no hand
+        self.present = present        # (N,) bool
+        self.labels = labels          # (N,) GESTURE_CODES
+        self.timestamps = timestamps  # (N,) seconds
+        self.handedness = handedness
+
+    def __len__(self):
+        return len(self.points)
+
+    def hands(self):
+        """HandLandmarks (or None on dropouts) per frame"""
+        for points, present in zip(self.points, self.present.tolist()):
+            yield HandLandmarks(points) if present else None
+
+    def detections(self):
+        """Per frame, what HandDetector.find_hands returns as landmarks: [hand] or None"""
+        for hand_landmarks in self.hands():
+            yield [hand_landmarks] if hand_landmarks is not None else None
+
+    def write_recording(self, path, start_time=None):
+        """Save as a landmark recording (replay, threshold_sweep, ...) in one write"""
+        records = np.zeros(len(self), dtype=RECORD_DTYPE)
+        start_time = time.time() if start_time is None else start_time
+        records["timestamp"] = start_time + self.timestamps
+        records["frame"] = np.arange(len(self))
+        records["flags"] = np.where(self.present, FLAG_HAND, 0)
+        records["handedness"] = np.where(self.present, HANDEDNESS_CODES[self.handedness], 0)
+        records["label"] = self.labels
+        records["landmarks"] = quantize_landmarks(self.points)
+        records["landmarks"][~self.present] = 0
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, start_time))
+            records.tofile(f)
+
+
+class SyntheticHands:
+    """
+    Fast generator of hand landmark streams for load tests, without a camera
+    or MediaPipe. Each gesture is a fixed anatomical pose; a session strings
+    gestures together, moves the hand along a smooth random path (position,
+    size and roll), blends between poses, closes and opens the pinches, and
+    adds jitter and bursts of lost detections. Everything is computed on
+    whole arrays, several hundred thousand frames per second.
+
+    Jitter is mostly the whole hand shaking (``noise``), with a much smaller
+    independent part per landmark (``landmark_noise``): MediaPipe's landmarks
+    move together, and independent jitter of 0.002 alone would bend a
+    straight index finger past the 175 degree pointing test most of the time.
+    """
+    def __init__(self, seed=None, noise=0.002, landmark_noise=0.0002, dropout=0.0, dropout_burst=5.0, fps=30.0,
+                 handedness="Right", blend_frames=4):
+        self.rng = np.random.default_rng(seed)
+        self.noise = noise                  # Whole-hand jitter (standard deviation, normalised units)
+        self.landmark_noise = landmark_noise  # Independent jitter of each landmark on top of it
+        self.dropout = dropout              # Share of frames without a detected hand
+        self.dropout_burst = dropout_burst  # Mean length of a dropout in frames
+        self.fps = fps
+        self.handedness = handedness
+        self.blend_frames = blend_frames    # Frames to morph from one gesture to the next
+        self.poses = {name: pose(name, handedness) for name in GESTURES}
+        self._pose_table = np.stack([self.poses[name] for name in GESTURES])
+        self._rest_index = np.array([GESTURES.index(PINCH_FROM.get(name, name)) for name in GESTURES])
+        self._label_codes = np.array([GESTURE_CODES[GESTURE_LABELS[name]] for name in GESTURES], dtype=np.uint8)
+        self._noise = None
+
+    def _noise_pool(self):
+        if self._noise is None:
+            self._noise = self.noise * self.rng.standard_normal((NOISE_POOL, 1, 3), dtype=np.float32)
+            self._noise = self._noise + self.landmark_noise * self.rng.standard_normal((NOISE_POOL, NUM_LANDMARKS, 3),
+                                                                                        dtype=np.float32)
+        return self._noise
+
+    def _motion(self, n, amplitude):
+        """Smooth random (n,) paths: centre x/y, scale and roll"""
+        t = np.arange(n) / self.fps
+        rng = self.rng
+
+        def wave(mean, amp):
+            freq = rng.uniform(0.1, 0.5, 2)
+            phase = rng.uniform(0, 2 * math.pi, 2)
+            return mean + amp * (0.6 * np.sin(2 * math.pi * freq[0] * t + phase[0])
+                                 + 0.4 * np.sin(2 * math.pi * freq[1] * t + phase[1]))
+
+        return (wave(DEFAULT_CENTER[0], amplitude), wave(DEFAULT_CENTER[1], 0.6 * amplitude),
+                wave(DEFAULT_SCALE, 0.015), wave(0.0, 0.12))
+
+    def _dropouts(self, n):
+        """(n,) bool: True where the hand is detected"""
+        present = np.ones(n, dtype=bool)
+        if self.dropout <= 0:
+            return present
+        starts = np.flatnonzero(self.rng.random(n) < self.dropout / self.dropout_burst)
+        ends = np.minimum(starts + self.rng.geometric(1.0 / self.dropout_burst, len(starts)), n)
+        edges = np.zeros(n + 1, dtype=np.int32)
+        np.add.at(edges, starts, 1)
+        np.add.at(edges, ends, -1)
+        present[np.cumsum(edges[:-1]) > 0] = False
+        return present
+
+    def session(self, script, amplitude=0.12):
+        """
+        Build a session from ``script``: [(gesture, frames), ...] with gestures
+        from GESTURES. ``amplitude`` is how far the hand wanders (normalised).
+        """
+        for gesture, _ in script:
+            if gesture not in self.poses:
+                raise ValueError(f"Unknown gesture {gesture!r}, expected one of {', '.join(GESTURES)}")
+        segment_gesture = np.array([GESTURES.index(g) for g, _ in script], dtype=np.intp)
+        lengths = np.array([frames for _, frames in script], dtype=np.intp)
+        starts = np.cumsum(lengths) - lengths
+        n = int(lengths.sum())
+
+        # Per frame: gesture, resting pose it closes from, and position in its segment
+        gesture = np.repeat(segment_gesture, lengths)
+        rest = np.repeat(self._rest_index[segment_gesture], lengths)
+        position = np.arange(n) - np.repeat(starts, lengths)
+        length = np.repeat(lengths, lengths)
+        closure = np.where(gesture != rest, closure_profile((position + 0.5) / length), 1.0).astype(np.float32)
+
+        table = self._pose_table
+        local = table[rest]
+        local += closure[:, None, None] * (table[gesture] - local)
+        # A pinch is labelled once fully formed and its resting pose only before it starts closing;
+        # frames in between are unlabelled (the thumb crosses the click distance somewhere on the way)
+        labels = np.where(closure >= FORMED, self._label_codes[gesture], self._label_codes[rest]).astype(np.uint8)
+        labels[(closure > 0) & (closure < FORMED)] = 0
+
+        # Morph out of the previous segment's last pose; these frames are unlabelled
+        blend = (position < np.minimum(self.blend_frames, length)) & (np.arange(n) >= lengths[0])
+        if blend.any():
+            previous = local[np.repeat(starts - 1, lengths)[blend]]
+            w = ((position[blend] + 1) / (self.blend_frames + 1)).astype(np.float32)[:, None, None]
+            local[blend] = previous + w * (local[blend] - previous)
+            labels[blend] = 0
+
+        # Roll, scale and move the hand as one complex multiply-add per landmark
+        cx, cy, scale, roll = self._motion(n, amplitude)
+        points = np.empty_like(local)
+        xy = points[..., :2].view(np.complex64)[..., 0]
+        np.multiply(local[..., :2].view(np.complex64)[..., 0], (scale * np.exp(1j * roll)).astype(np.complex64)[:, None], out=xy)
+        xy += (cx + 1j * cy).astype(np.complex64)[:, None]
+        np.multiply(local[..., 2], scale.astype(np.float32)[:, None], out=points[..., 2])
+        if self.noise > 0 or self.landmark_noise > 0:
+            # Rows of a pre-drawn Gaussian pool: drawing fresh normals would cost more than everything else here
+            points += self._noise_pool()[self.rng.integers(0, NOISE_POOL, n)]
+
+        present = self._dropouts(n)
+        points[~present] = 0.0
+        labels[~present] = 0
+        return SyntheticSession(points, present, labels, np.arange(n) / self.fps, self.handedness)
+
+    def random_script(self, frames, mean_segment=45, gestures=GESTURES):
+        """Random gesture segments (30% pointing) adding up to ``frames``"""
+        weights = np.array([3.0 if g == "point" else 1.0 for g in gestures])
+        count = frames // max(mean_segment // 2, 1) + 1  # Enough segments even if all are short
+        lengths = self.rng.integers(mean_segment // 2, mean_segment * 3 // 2 + 1, count)
+        ends = np.minimum(np.cumsum(lengths), frames)
+        lengths = np.diff(ends, prepend=0)
+        chosen = self.rng.choice(len(gestures), size=count, p=weights / weights.sum())
+        return [(gestures[g], int(length)) for g, length in zip(chosen.tolist(), lengths.tolist()) if length > 0]
+
+    def random_session(self, frames, mean_segment=45, amplitude=0.12):
+        return self.session(self.random_script(frames, mean_segment), amplitude)
+
+
+def check_labels(frames=100000, seed=None, **options):
+    """
+    Where the ground truth disagrees with batch_classifier.classify, for both
+    hands: the noiseless poses, a session of each gesture and a random session
+    of ``frames``, generated with ``options`` (SyntheticHands arguments).
+    Returns a list of problems, empty when everything agrees.
+    """
+    problems = []
+    for handedness in ("Right", "Left"):
+        generator = SyntheticHands(seed=seed, handedness=handedness, **options)
+        expected = {name: GESTURE_CODES[GESTURE_LABELS[name]] for name in GESTURES}
+        for name in GESTURES:
+            code = int(classify(hand(name, handedness).array)[0])
+            if code != expected[name]:
+                problems.append(f"{handedness} {name}: pose classified as {GESTURE_NAMES[code] or 'nothing'}")
+        sessions = [(name, generator.session([(name, 3000)])) for name in GESTURES]
+        sessions.append(("random", generator.random_session(frames)))
+        for name, session in sessions:
+            codes, _ = classify(session.points, session.present)
+            # Unlabelled frames of an open hand or fist must not trigger anything either
+            checked = session.present if GESTURE_LABELS.get(name, "") is None else session.labels != 0
+            wrong = np.count_nonzero(codes[checked] != session.labels[checked])
+            if wrong:
+                problems.append(f"{handedness} {name} session: {wrong}/{np.count_nonzero(checked)} frames disagree")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic hand landmark streams")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("record", "write a random session as a landmark recording"),
+                            ("bench", "measure generation throughput"),
+                            ("check", "check that the labels agree with batch_classifier on both hands")):
+        cmd = sub.add_parser(name, help=help_text)
+        if name == "record":
+            cmd.add_argument("path")
+        cmd.add_argument("--frames", type=int, default=100000)
+        cmd.add_argument("--seed", type=int, default=None)
+        cmd.add_argument("--noise", type=float, default=0.002, help="whole-hand jitter (default: 0.002)")
+        cmd.add_argument("--landmark-noise", type=float, default=0.0002,
+                         help="independent jitter of each landmark (default: 0.0002)")
+        cmd.add_argument("--dropout", type=float, default=0.02, help="share of frames without a hand (default: 0.02)")
+        if name != "check":
+            cmd.add_argument("--handedness", choices=("Right", "Left"), default="Right")
+    args = parser.parse_args()
+
+    if args.command == "check":
+        problems = check_labels(args.frames, args.seed, noise=args.noise, landmark_noise=args.landmark_noise,
+                                dropout=args.dropout)
+        for problem in problems:
+            print(problem)
+        if problems:
+            sys.exit(1)
+        print("Labels agree with batch_classifier")
+        return
+
+    generator = SyntheticHands(seed=args.seed, noise=args.noise, landmark_noise=args.landmark_noise,
+                               dropout=args.dropout, handedness=args.handedness)
+    started = time.perf_counter()
+    session = generator.random_session(args.frames)
+    elapsed = time.perf_counter() - started
+    print(f"{len(session)} frames in {elapsed:.3f}s ({len(session) / elapsed:,.0f} frames/s as arrays)")
+    if args.command == "record":
+        session.write_recording(args.path)
+        print(f"Wrote {args.path}")
+        return
+    started = time.perf_counter()
+    count = sum(1 for _ in session.hands())
+    elapsed = time.perf_counter() - started
+    print(f"{count} HandLandmarks objects in {elapsed:.3f}s ({count / elapsed:,.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
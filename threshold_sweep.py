@@ -0,0 +1,239 @@
+import argparse
+import csv
+import sys
+import time
+
+import numpy as np
+
+import batch_classifier
+from landmark_arrays import GESTURE_CODES
+from landmark_recorder import FLAG_HAND, dequantize_landmarks, open_recording
+
+
+class Sessions:
+    """Per-frame gesture scores and labels from one or more recordings, as flat arrays"""
+    def __init__(self, scores, labels, timestamps, session_starts):
+        self.scores = scores                  # name -> (N,) float, see gated_scores()
+        self.labels = labels                  # (N,) gesture codes
+        self.timestamps = timestamps          # (N,) seconds
+        self.session_starts = session_starts  # Index of the first frame of every session
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def load_sessions(paths, chunk_size=1 << 18):
+    """
+    Load recordings straight from their memmaps. Landmarks are dequantised and
+    reduced to scores one chunk at a time, so memory stays at a few bytes per frame.
+    """
+    scores, labels, timestamps, starts = [], [], [], []
+    offset = 0
+    for path in paths:
+        _, records = open_recording(path)
+        starts.append(offset)
+        offset += len(records)
+        for begin in range(0, len(records), chunk_size):
+            chunk = records[begin:begin + chunk_size]
+            scores.append(gated_scores(dequantize_landmarks(chunk["landmarks"]),
+                                       (chunk["flags"] & FLAG_HAND) != 0))
+        labels.append(np.asarray(records["label"]))
+        timestamps.append(np.asarray(records["timestamp"]))
+    merged = {name: np.concatenate([chunk[name] for chunk in scores]) for name in scores[0]} if scores else {}
+    return Sessions(merged, np.concatenate(labels), np.concatenate(timestamps), np.array(starts, dtype=np.int64))
+
+
+def find_episodes(positive, session_starts):
+    """(starts, ends) of contiguous runs of ``positive`` that don't cross session boundaries"""
+    run_start = positive.copy()
+    run_start[1:] &= ~positive[:-1]
+    run_start[session_starts] = positive[session_starts]
+    run_end = positive.copy()
+    run_end[:-1] &= ~positive[1:]
+    last_frames = np.append(session_starts[1:] - 1, len(positive) - 1)
+    run_end[last_frames] = positive[last_frames]
+    return np.flatnonzero(run_start), np.flatnonzero(run_end) + 1
+
+
+def sweep(score, positive, thresholds, timestamps, episodes):
+    """
+    Evaluate "fires when score < threshold" for every threshold at once.
+    Frame-level precision/recall come from binary searches over the sorted
+    scores; trigger latency (labelled episode start -> first firing frame) comes
+    from a segmented running minimum, so the cost is O(N log N + T * E log N)
+    instead of O(T * N) Python-level work.
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    pos_sorted = np.sort(score[positive])
+    neg_sorted = np.sort(score[~positive])
+    tp = np.searchsorted(pos_sorted, thresholds, side="left")
+    fp = np.searchsorted(neg_sorted, thresholds, side="left")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), np.nan)
+        recall = tp / len(pos_sorted) if len(pos_sorted) else np.full(len(thresholds), np.nan)
+        f1 = 2 * precision * recall / (precision + recall)
+
+    starts, ends = episodes
+    latency_median = np.full(len(thresholds), np.nan)
+    latency_mean = np.full(len(thresholds), np.nan)
+    episode_recall = np.full(len(thresholds), np.nan)
+    if len(starts):
+        lengths = ends - starts
+        frame_idx = np.repeat(starts - np.cumsum(np.append(0, lengths[:-1])), lengths) + np.arange(lengths.sum())
+        seg_start = np.append(0, np.cumsum(lengths)[:-1])
+
+        # Shift each episode below all earlier ones so a single running minimum
+        # restarts at every episode boundary; the result is globally non-increasing.
+        # Non-finite (gated) scores become a cap above every threshold, so they never fire.
+        values = score[frame_idx].astype(np.float64)
+        finite = values[np.isfinite(values)]
+        cap = max(finite.max() if len(finite) else 0.0, thresholds.max()) + 1.0
+        floor = min(finite.min() if len(finite) else 0.0, thresholds.min())
+        np.minimum(np.nan_to_num(values, nan=cap, posinf=cap), cap, out=values)
+        span = cap - floor + 1.0
+        offsets = (len(starts) - 1 - np.arange(len(starts))) * span
+        running_min = np.minimum.accumulate(values + np.repeat(offsets, lengths))
+
+        # First position in each episode whose running minimum drops below the threshold
+        targets = thresholds[None, :] + offsets[:, None]
+        first = np.searchsorted(-running_min, -targets.ravel(), side="right").reshape(targets.shape)
+        fired = first < (seg_start + lengths)[:, None]
+        fire_frames = frame_idx[np.minimum(first, len(frame_idx) - 1)]
+        latency_ms = (timestamps[fire_frames] - timestamps[starts][:, None]) * 1000.0
+        latency_ms[~fired] = np.nan
+
+        episode_recall = fired.mean(axis=0)
+        with np.errstate(all="ignore"):
+            any_fired = fired.any(axis=0)
+            latency_median[any_fired] = np.nanmedian(latency_ms[:, any_fired], axis=0)
+            latency_mean[any_fired] = np.nanmean(latency_ms[:, any_fired], axis=0)
+
+    return {
+        "threshold": thresholds,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "episode_recall": episode_recall,
+        "latency_median_ms": latency_median,
+        "latency_mean_ms": latency_mean,
+        "episodes": np.full(len(thresholds), len(starts)),
+    }
+
+
+def gated_scores(points, hand):
+    """Gated per-frame scores of (N, 21, 3) landmarks, see batch_classifier.gated_scores()"""
+    return batch_classifier.gated_scores(batch_classifier.features(points), hand)
+
+
+def run_sweeps(sessions, pinch_grid, straight_grid, spread_grid):
+    """Yield (gesture, extra columns, result dict) for every evaluated grid slice"""
+    scores = sessions.scores
+    labels = sessions.labels
+    ts = sessions.timestamps
+
+    def target(name):
+        positive = labels == GESTURE_CODES[name]
+        return positive, find_episodes(positive, sessions.session_starts)
+
+    left_pos, left_eps = target("Left Click")
+    yield "Left Click", {}, sweep(scores["left"], left_pos, pinch_grid, ts, left_eps)
+
+    # Left click wins when both pinches are closed, so the right-click result
+    # depends on the left threshold too: evaluate the full 2D grid.
+    right_pos, right_eps = target("Right Click")
+    for left_threshold in pinch_grid:
+        right_score = np.where(scores["left"] < left_threshold, np.inf, scores["right"])
+        yield "Right Click", {"left_threshold": left_threshold}, sweep(right_score, right_pos, pinch_grid, ts, right_eps)
+
+    point_pos, point_eps = target("Pointing")
+    result = sweep(scores["straight"], point_pos, -np.asarray(straight_grid, dtype=np.float64), ts, point_eps)
+    result["threshold"] = -result["threshold"]
+    yield "Pointing", {}, result
+
+    shot_pos, shot_eps = target("Screenshot")
+    yield "Screenshot", {}, sweep(scores["spread"], shot_pos, spread_grid, ts, shot_eps)
+
+
+def parse_grid(spec):
+    """'start:stop:step' (inclusive) or a comma separated list"""
+    if ":" in spec:
+        start, stop, step = (float(v) for v in spec.split(":"))
+        return np.arange(start, stop + step / 2, step)
+    return np.array([float(v) for v in spec.split(",")])
+
+
+def label_recording(path, ranges_csv):
+    """Write ground-truth labels from a 'start_frame,end_frame,gesture' CSV into a recording"""
+    _, records = open_recording(path, mode="r+")
+    count = 0
+    with open(ranges_csv, newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith("#"):
+                continue
+            start, end, name = int(row[0]), int(row[1]), row[2].strip()
+            if name not in GESTURE_CODES:
+                raise ValueError(f"Unknown gesture '{name}' in {ranges_csv}")
+            records["label"][start:end + 1] = GESTURE_CODES[name]
+            count += end + 1 - start
+    records.flush()
+    print(f"Labelled {count} frames in {path}")
+
+
+COLUMNS = ("threshold", "precision", "recall", "f1", "episode_recall", "latency_median_ms", "latency_mean_ms", "episodes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep gesture thresholds over labelled landmark recordings")
+    sub = parser.add_subparsers(dest="command", required=True)
+    label = sub.add_parser("label", help="write ground-truth labels into a recording")
+    label.add_argument("path")
+    label.add_argument("ranges", help="CSV of start_frame,end_frame,gesture (inclusive)")
+    run = sub.add_parser("run", help="evaluate threshold grids")
+    run.add_argument("paths", nargs="+", help="labelled recordings")
+    run.add_argument("--pinch", default="0.02:0.08:0.005", help="click pinch distances (default 0.02:0.08:0.005)")
+    run.add_argument("--straight", default="160:179:1", help="index straightness angles (default 160:179:1)")
+    run.add_argument("--spread", default="0.05:0.2:0.01", help="screenshot fingertip spreads (default 0.05:0.2:0.01)")
+    run.add_argument("--csv", help="write every row to this CSV file")
+    run.add_argument("--all", action="store_true", help="print every row, not just the best F1 per gesture")
+    args = parser.parse_args()
+
+    if args.command == "label":
+        label_recording(args.path, args.ranges)
+        return
+
+    started = time.perf_counter()
+    sessions = load_sessions(args.paths)
+    loaded = time.perf_counter()
+    rows = []
+    for gesture, extra, result in run_sweeps(sessions, parse_grid(args.pinch),
+                                             parse_grid(args.straight), parse_grid(args.spread)):
+        for i in range(len(result["threshold"])):
+            row = {"gesture": gesture, **extra}
+            row.update({column: float(result[column][i]) for column in COLUMNS})
+            rows.append(row)
+    finished = time.perf_counter()
+
+    print(f"{len(sessions)} frames from {len(args.paths)} recording(s): "
+          f"loaded in {loaded - started:.2f}s, {len(rows)} settings evaluated in {finished - loaded:.2f}s")
+    print(f"{'gesture':<12} {'threshold':>10} {'left thr':>9} {'prec':>6} {'recall':>6} {'f1':>6} "
+          f"{'ep.rec':>6} {'lat.med':>8} {'lat.mean':>8}")
+    shown = rows if args.all else []
+    if not args.all:
+        for gesture in dict.fromkeys(row["gesture"] for row in rows):
+            candidates = [row for row in rows if row["gesture"] == gesture and not np.isnan(row["f1"])]
+            if candidates:
+                shown.append(max(candidates, key=lambda row: row["f1"]))
+    for row in shown:
+        left = f"{row['left_threshold']:9.3f}" if "left_threshold" in row else f"{'':9}"
+        print(f"{row['gesture']:<12} {row['threshold']:10.3f} {left} {row['precision']:6.3f} {row['recall']:6.3f} "
+              f"{row['f1']:6.3f} {row['episode_recall']:6.3f} {row['latency_median_ms']:7.1f}ms {row['latency_mean_ms']:7.1f}ms")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=("gesture", "left_threshold") + COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
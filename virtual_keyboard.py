@@ -1,22 +1,261 @@
-import sys
-import cv2
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel
-from PyQt6.QtCore import Qt, QSize, QPoint, QTimer
-from PyQt6.QtGui import QFont, QGuiApplication
-import pyautogui
-import time
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel
+from PyQt6.QtCore import Qt, QPoint, QRect, QRectF, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QGuiApplication, QPainter, QPen, QPixmap
+
+from keyboard_backends import create_keyboard_backend
+from word_predictor import WordPredictor
+
+# Keyboard rows
+KEY_ROWS = (
+    ("`", "1", "2", "3", "4", "5", "6", "7", "8", "9", "0", "-", "=", "Backspace"),
+    ("Tab", "q", "w", "e", "r", "t", "y", "u", "i", "o", "p", "[", "]", "\\"),
+    ("Caps", "a", "s", "d", "f", "g", "h", "j", "k", "l", ";", "'", "Enter"),
+    ("Shift", "z", "x", "c", "v", "b", "n", "m", ",", ".", "/", "Shift"),
+    ("Space",),
+)
+KEY_WIDTHS = {"Backspace": 80, "Enter": 80, "Shift": 80, "Space": 300, "Tab": 80, "Caps": 80}
+KEY_WIDTH = 50
+KEY_HEIGHT = 50
+KEY_SPACING = 5
+
+# Key styles: (background, text, border)
+KEY_STYLES = {
+    "normal": ("#334155", "#e2e8f0", "#475569"),
+    "active": ("#38bdf8", "#ffffff", "#475569"),   # Shift/Caps while engaged
+    "hover": ("#475569", "#ffffff", "#38bdf8"),
+    "pressed": ("#38bdf8", "#ffffff", "#38bdf8"),
+}
+
+
+class KeyboardGeometry:
+    """
+    Key rectangles in widget pixels plus a per-row lookup table mapping every
+    x pixel to a key index, so ``key_at`` is two divisions and a list index.
+    Rows are centred on the widest row.
+    """
+    def __init__(self, rows=KEY_ROWS):
+        self.labels = []
+        self.rects = []
+        row_widths = [sum(KEY_WIDTHS.get(k, KEY_WIDTH) for k in row) + KEY_SPACING * (len(row) - 1) for row in rows]
+        self.width = max(row_widths)
+        self.height = len(rows) * KEY_HEIGHT + (len(rows) - 1) * KEY_SPACING
+        self.row_lookup = []
+        for r, (row, row_width) in enumerate(zip(rows, row_widths)):
+            lookup = [-1] * self.width
+            x = (self.width - row_width) // 2
+            y = r * (KEY_HEIGHT + KEY_SPACING)
+            for key in row:
+                w = KEY_WIDTHS.get(key, KEY_WIDTH)
+                index = len(self.labels)
+                self.labels.append(key)
+                self.rects.append(QRect(x, y, w, KEY_HEIGHT))
+                lookup[x:x + w] = [index] * w
+                x += w + KEY_SPACING
+            self.row_lookup.append(lookup)
+
+    def key_at(self, x, y):
+        """Index of the key under widget pixel (x, y), or -1"""
+        x, y = int(x), int(y)
+        if x < 0 or y < 0 or x >= self.width:
+            return -1
+        row, offset = divmod(y, KEY_HEIGHT + KEY_SPACING)
+        if row >= len(self.row_lookup) or offset >= KEY_HEIGHT:
+            return -1
+        return self.row_lookup[row][x]
+
+
+class KeyGrid(QWidget):
+    """
+    All keys as one widget. Each modifier state is rendered once into a
+    pixmap of the whole keyboard; a paint is a single drawPixmap plus, at
+    most, one cached key pixmap for the hovered/pressed key.
+    """
+    key_clicked = pyqtSignal(str)
 
-class VirtualKeyboard(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.geometry_map = KeyboardGeometry()
+        self.setFixedSize(self.geometry_map.width, self.geometry_map.height)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.key_font = QFont()
+        self.key_font.setPixelSize(14)
+        self.state = (False, False, False)  # (upper case, shift engaged, caps engaged)
+        self.highlight = -1
+        self.highlight_style = "hover"
+        self.pressed_key = -1
+        self._state_pixmaps = {}
+        self._key_pixmaps = {}
+
+    # ----- state -----
+
+    def set_state(self, upper, shift, caps):
+        state = (upper, shift, caps)
+        if state != self.state:
+            self.state = state
+            self.update()
+
+    def set_highlight(self, index, style="hover"):
+        """Highlight one key (-1 for none); only that key's area is repainted"""
+        if index == self.highlight and style == self.highlight_style:
+            return
+        for old in (self.highlight, index):
+            if old >= 0:
+                self.update(self.geometry_map.rects[old])
+        self.highlight = index
+        self.highlight_style = style
+
+    def label(self, index):
+        key = self.geometry_map.labels[index]
+        if len(key) == 1 and key.isalpha():
+            return key.upper() if self.state[0] else key.lower()
+        return key
+
+    # ----- rendering -----
+
+    def _key_style(self, index, state):
+        key = self.geometry_map.labels[index]
+        if (key == "Shift" and state[1]) or (key == "Caps" and state[2]):
+            return "active"
+        return "normal"
+
+    def _paint_key(self, painter, rect, text, style):
+        background, foreground, border = KEY_STYLES[style]
+        painter.setPen(QPen(QColor(border), 1))
+        painter.setBrush(QColor(background))
+        painter.drawRoundedRect(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), 5, 5)
+        painter.setPen(QColor(foreground))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+
+    def _new_pixmap(self, width, height):
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(width * ratio), int(height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        return pixmap
+
+    def state_pixmap(self):
+        key = (self.state, self.devicePixelRatioF())
+        pixmap = self._state_pixmaps.get(key)
+        if pixmap is None:
+            pixmap = self._new_pixmap(self.width(), self.height())
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setFont(self.key_font)
+            for index, rect in enumerate(self.geometry_map.rects):
+                self._paint_key(painter, rect, self.label(index), self._key_style(index, self.state))
+            painter.end()
+            self._state_pixmaps[key] = pixmap
+        return pixmap
+
+    def key_pixmap(self, index, style):
+        key = (self.state, self.devicePixelRatioF(), index, style)
+        pixmap = self._key_pixmaps.get(key)
+        if pixmap is None:
+            rect = self.geometry_map.rects[index]
+            pixmap = self._new_pixmap(rect.width(), rect.height())
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setFont(self.key_font)
+            self._paint_key(painter, QRect(0, 0, rect.width(), rect.height()), self.label(index), style)
+            painter.end()
+            self._key_pixmaps[key] = pixmap
+        return pixmap
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.state_pixmap())
+        if self.pressed_key >= 0:
+            painter.drawPixmap(self.geometry_map.rects[self.pressed_key].topLeft(), self.key_pixmap(self.pressed_key, "pressed"))
+        elif self.highlight >= 0:
+            painter.drawPixmap(self.geometry_map.rects[self.highlight].topLeft(), self.key_pixmap(self.highlight, self.highlight_style))
+        painter.end()
+
+    # ----- mouse -----
+
+    def mousePressEvent(self, event):
+        index = self.geometry_map.key_at(event.position().x(), event.position().y())
+        if event.button() != Qt.MouseButton.LeftButton or index < 0:
+            event.ignore()  # Gaps between keys drag the keyboard
+            return
+        self.pressed_key = index
+        self.update(self.geometry_map.rects[index])
+        event.accept()
+
+    def mouseReleaseEvent(self, event):
+        index = self.pressed_key
+        if index < 0:
+            event.ignore()
+            return
+        self.pressed_key = -1
+        self.update(self.geometry_map.rects[index])
+        if self.geometry_map.key_at(event.position().x(), event.position().y()) == index:
+            self.key_clicked.emit(self.geometry_map.labels[index])
+        event.accept()
+
+
+class PredictionBar(QWidget):
+    """Word completions above the keys; clicking one emits ``word_selected``"""
+    word_selected = pyqtSignal(str)
+
+    def __init__(self, width, slots=3, parent=None):
+        super().__init__(parent)
+        self.setFixedSize(width, 40)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.slots = slots
+        self.words = []
+        self.key_font = QFont()
+        self.key_font.setPixelSize(15)
+
+    def set_words(self, words):
+        words = list(words[:self.slots])
+        if words != self.words:
+            self.words = words
+            self.update()
+
+    def slot_rect(self, i):
+        width = (self.width() - KEY_SPACING * (self.slots - 1)) // self.slots
+        return QRect(i * (width + KEY_SPACING), 0, width, self.height())
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setFont(self.key_font)
+        for i, word in enumerate(self.words):
+            rect = self.slot_rect(i)
+            painter.setPen(QPen(QColor("#38bdf8"), 1))
+            painter.setBrush(QColor("#0f172a"))
+            painter.drawRoundedRect(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), 5, 5)
+            painter.setPen(QColor("#e2e8f0"))
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, word)
+        painter.end()
+
+    def mouseReleaseEvent(self, event):
+        i = int(event.position().x()) // (self.slot_rect(0).width() + KEY_SPACING)
+        if event.button() == Qt.MouseButton.LeftButton and 0 <= i < len(self.words):
+            self.word_selected.emit(self.words[i])
+            event.accept()
+        else:
+            event.ignore()
+
+
+class VirtualKeyboard(QWidget):
+    visibility_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, keyboard=None, predictor=None):
+        super().__init__(parent)
+        # Keystrokes go through a queued backend, never pyautogui's per-call pause
+        self.keyboard = keyboard if keyboard is not None else create_keyboard_backend()
+        # Word completions; the word list is loaded the first time the keyboard is shown
+        self.predictor = predictor if predictor is not None else WordPredictor()
+        self.current_word = ""
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool | Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.WindowDoesNotAcceptFocus)
         self.setStyleSheet("background-color: #1e293b; border-radius: 10px; border: 1px solid #334155;")
-        self.init_ui()
         self.active_input = None
         self.shift_active = False
         self.caps_lock = False
         self.is_dragging = False
         self.drag_position = QPoint()
+        self.init_ui()
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -29,33 +268,19 @@ class VirtualKeyboard(QWidget):
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title)
 
-        # Keyboard rows
-        keys = [
-            ["`", "1", "2", "3", "4", "5", "6", "7", "8", "9", "0", "-", "=", "Backspace"],
-            ["Tab", "q", "w", "e", "r", "t", "y", "u", "i", "o", "p", "[", "]", "\\"],
-            ["Caps", "a", "s", "d", "f", "g", "h", "j", "k", "l", ";", "'", "Enter"],
-            ["Shift", "z", "x", "c", "v", "b", "n", "m", ",", ".", "/", "Shift"],
-            ["Space"]
-        ]
-
-        for row in keys:
-            row_layout = QHBoxLayout()
-            row_layout.setSpacing(5)
-            for key in row:
-                btn = QPushButton(key)
-                btn.setFixedSize(50, 50) if key not in ["Backspace", "Enter", "Shift", "Space", "Tab", "Caps"] else btn.setFixedSize(80, 50)
-                if key == "Space":
-                    btn.setFixedSize(300, 50)
-                btn.setStyleSheet("background-color: #334155; color: #e2e8f0; border-radius: 5px; border: 1px solid #475569; font-size: 14px;")
-                btn.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-                btn.clicked.connect(lambda checked, k=key: self.key_pressed(k))
-                row_layout.addWidget(btn)
-            layout.addLayout(row_layout)
+        # Keys are painted by a single widget (see KeyGrid)
+        self.key_grid = KeyGrid()
+        self.prediction_bar = PredictionBar(self.key_grid.width())
+        self.prediction_bar.word_selected.connect(self.accept_prediction)
+        layout.addWidget(self.prediction_bar, alignment=Qt.AlignmentFlag.AlignHCenter)
+        self.key_grid.key_clicked.connect(self.key_pressed)
+        layout.addWidget(self.key_grid, alignment=Qt.AlignmentFlag.AlignHCenter)
 
         # Close button
         close_btn = QPushButton("Close Keyboard")
         close_btn.setFixedHeight(40)
         close_btn.setStyleSheet("background-color: #f87171; color: #ffffff; border-radius: 5px; font-weight: bold;")
+        close_btn.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         close_btn.clicked.connect(self.hide)
         layout.addWidget(close_btn)
 
@@ -78,10 +303,13 @@ class VirtualKeyboard(QWidget):
             event.accept()
 
     def key_pressed(self, key):
+        self.predictor.stats.keystrokes += 1
         if key == "Backspace":
-            pyautogui.press('backspace')
+            self.keyboard.press('backspace')
+            self.current_word = self.current_word[:-1]
         elif key == "Enter":
-            pyautogui.press('enter')
+            self.keyboard.press('enter')
+            self.finish_word()
         elif key == "Shift":
             self.shift_active = not self.shift_active
             self.update_key_display()
@@ -89,9 +317,11 @@ class VirtualKeyboard(QWidget):
             self.caps_lock = not self.caps_lock
             self.update_key_display()
         elif key == "Tab":
-            pyautogui.press('tab')
+            self.keyboard.press('tab')
+            self.finish_word()
         elif key == "Space":
-            pyautogui.press('space')
+            self.keyboard.press('space')
+            self.finish_word()
         else:
             char = key
             if len(char) == 1:
@@ -102,21 +332,40 @@ class VirtualKeyboard(QWidget):
                 if self.shift_active:
                     self.shift_active = False
                     self.update_key_display()
-                pyautogui.write(char)
+                self.keyboard.write(char)
+                if char.isalpha() or (char == "'" and self.current_word):
+                    self.current_word += char
+                else:
+                    self.finish_word()
+        self.update_predictions()
 
         # Ensure focus remains on the input field if one was active, using a small delay
         if self.active_input:
             QTimer.singleShot(10, lambda: self.active_input.setFocus())
 
+    def finish_word(self):
+        if self.current_word:
+            self.predictor.learn(self.current_word)
+            self.predictor.stats.words += 1
+            self.current_word = ""
+
+    def accept_prediction(self, word):
+        """Type the rest of a predicted word and a space"""
+        self.keyboard.write(word[len(self.current_word):] + " ")
+        self.predictor.stats.keystrokes += 1
+        self.predictor.stats.completions += 1
+        self.current_word = word
+        self.finish_word()
+        self.update_predictions()
+        if self.active_input:
+            QTimer.singleShot(10, lambda: self.active_input.setFocus())
+
+    def update_predictions(self):
+        self.prediction_bar.set_words(self.predictor.complete(self.current_word))
+
     def update_key_display(self):
-        for btn in self.findChildren(QPushButton):
-            text = btn.text()
-            if len(text) == 1 and text.isalpha():
-                btn.setText(text.upper() if (self.shift_active or self.caps_lock) else text.lower())
-            elif text == "Shift":
-                btn.setStyleSheet("background-color: #38bdf8; color: #ffffff; border-radius: 5px; border: 1px solid #475569; font-size: 14px;" if self.shift_active else "background-color: #334155; color: #e2e8f0; border-radius: 5px; border: 1px solid #475569; font-size: 14px;")
-            elif text == "Caps":
-                btn.setStyleSheet("background-color: #38bdf8; color: #ffffff; border-radius: 5px; border: 1px solid #475569; font-size: 14px;" if self.caps_lock else "background-color: #334155; color: #e2e8f0; border-radius: 5px; border: 1px solid #475569; font-size: 14px;")
+        # Switches to another cached rendering; no widgets are restyled
+        self.key_grid.set_state(self.shift_active or self.caps_lock, self.shift_active, self.caps_lock)
 
     def set_active_input(self, input_widget):
         self.active_input = input_widget
@@ -136,6 +385,13 @@ class VirtualKeyboard(QWidget):
         self.move(x, y)
         self.raise_()
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.predictor.load_async()
+        self.visibility_changed.emit(True)
+
     def hideEvent(self, event):
         self.active_input = None
+        self.key_grid.set_highlight(-1)
         super().hideEvent(event)
+        self.visibility_changed.emit(False)
@@ -8,6 +8,8 @@ from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QSize, QR
 from PyQt6.QtGui import QPixmap, QMovie, QColor, QPainter, QPainterPath
 from PyQt6 import QtCore
 
+from event_log import event_log
+
 class LogoWidget(QLabel):
     """Custom label widget for logo with rounded corners"""
     def __init__(self, parent=None):
@@ -158,7 +160,7 @@ class WelcomeScreen(QWidget):
         self.logo_fade_in.finished.connect(self.show_title)
 
     def start_animations(self):
-        print("Starting welcome animations")
+        event_log.debug("ui.welcome", "Starting welcome animations")
         self.logo_fade_in.start()
 
     def show_title(self):
@@ -203,13 +205,13 @@ class WelcomeScreen(QWidget):
         
         # Schedule close after animation completes - increased to 2000ms (2 seconds) of visibility
         self.close_timer.start(2000)
-        print("Welcome animations running, scheduled transition in 2 seconds")
+        event_log.debug("ui.welcome", "Welcome animations running, scheduled transition in 2 seconds")
 
     def finish_animation(self):
         # Only emit the signal once
         if not self._transition_started:
             self._transition_started = True
-            print("Welcome screen animation completed, emitting finished signal")
+            event_log.debug("ui.welcome", "Welcome screen animation completed, emitting finished signal")
             
             # Cancel the safety timer if normal timer triggered this
             if self.safety_timer.isActive():
@@ -223,7 +225,7 @@ class WelcomeScreen(QWidget):
 
     def hide_welcome(self):
         """Properly hide the welcome screen to ensure main window appears"""
-        print("Hiding welcome screen")
+        event_log.debug("ui.welcome", "Hiding welcome screen")
         self.hide()
         # Force this window to close and be deleted
         self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose, True)
@@ -0,0 +1,303 @@
+import argparse
+import bisect
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from event_log import event_log
+
+CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".config", "airflick")
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "airflick")
+# Word lists tried in order: "word count" (or just "word") per line
+DEFAULT_WORD_FILES = (os.path.join(CONFIG_DIR, "words.txt"), "/usr/share/dict/words")
+LEARNED_WORDS = os.path.join(CONFIG_DIR, "learned_words.json")
+
+# Compiled index: header, then uint32 offsets[n + 1], uint32 counts[n],
+# int32 argmax sparse table[levels][n] and the concatenated UTF-8 words,
+# sorted. Everything is used straight from the memory map.
+MAGIC = b"AFWP"
+VERSION = 1
+HEADER = struct.Struct("<4sIIII")  # magic, version, word count, sparse table levels, blob size
+
+
+def read_word_file(path):
+    """{word: count} from a word-frequency file; words are lower-cased"""
+    counts = {}
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            parts = line.split()
+            if not parts:
+                continue
+            word = parts[0].lower()
+            if len(word) < 2 or not word.replace("'", "").isalpha():
+                continue
+            try:
+                count = int(parts[1]) if len(parts) > 1 else 1
+            except ValueError:
+                count = 1
+            counts[word] = counts.get(word, 0) + count
+    return counts
+
+
+def sparse_argmax_table(counts):
+    """table[j][i] = index of the largest count in counts[i:i + 2**j]"""
+    n = len(counts)
+    levels = max(1, n.bit_length())
+    table = np.zeros((levels, n), dtype=np.int32)
+    table[0] = np.arange(n, dtype=np.int32)
+    for j in range(1, levels):
+        half = 1 << (j - 1)
+        width = n - (1 << j) + 1
+        if width <= 0:
+            table = table[:j]
+            break
+        left = table[j - 1, :width]
+        right = table[j - 1, half:half + width]
+        table[j, :width] = np.where(counts[left] >= counts[right], left, right)
+    return table
+
+
+def build_index(counts, path):
+    """Write a compiled index for {word: count} to ``path``"""
+    items = sorted((word.encode("utf-8"), min(count, 0xFFFFFFFF)) for word, count in counts.items())
+    blob = b"".join(word for word, _ in items)
+    offsets = np.zeros(len(items) + 1, dtype=np.uint32)
+    np.cumsum([len(word) for word, _ in items], out=offsets[1:])
+    count_array = np.array([count for _, count in items], dtype=np.uint32)
+    table = sparse_argmax_table(count_array) if items else np.zeros((1, 0), dtype=np.int32)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(items), len(table), len(blob)))
+        f.write(offsets.tobytes())
+        f.write(count_array.tobytes())
+        f.write(table.tobytes())
+        f.write(blob)
+    os.replace(tmp, path)
+
+
+class WordIndex:
+    """
+    Read-only prefix index over a compiled word file. Words are sorted, so a
+    prefix is a contiguous range found by binary search; the top-k most
+    frequent words in the range come from the sparse table (O(1) range
+    maximum) and a small heap, without touching the rest of the range.
+    """
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, levels, blob_size = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a word index")
+        pos = HEADER.size
+        self.size = n
+        self.offsets = np.frombuffer(self._map, dtype=np.uint32, count=n + 1, offset=pos)
+        pos += 4 * (n + 1)
+        self.counts = np.frombuffer(self._map, dtype=np.uint32, count=n, offset=pos)
+        pos += 4 * n
+        self.table = np.frombuffer(self._map, dtype=np.int32, count=levels * n, offset=pos).reshape(levels, n)
+        self.blob_start = pos + 4 * levels * n
+        self.max_count = int(self.counts.max()) if n else 0
+        # Python ints are much faster than NumPy scalars in the search loops
+        self._offsets = self.offsets.tolist()
+        self._counts = self.counts.tolist()
+
+    def __len__(self):
+        return self.size
+
+    def word(self, i):
+        start = self.blob_start
+        return self._map[start + self._offsets[i]:start + self._offsets[i + 1]]
+
+    def _lower_bound(self, key):
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def prefix_range(self, prefix):
+        key = prefix.encode("utf-8")
+        return self._lower_bound(key), self._lower_bound(key + b"\xff")
+
+    def _argmax(self, lo, hi):
+        level = (hi - lo).bit_length() - 1
+        a = int(self.table[level, lo])
+        b = int(self.table[level, hi - (1 << level)])
+        return a if self._counts[a] >= self._counts[b] else b
+
+    def top(self, prefix, k=3):
+        """[(word, count)] of the k most frequent words starting with ``prefix``"""
+        lo, hi = self.prefix_range(prefix)
+        results = []
+        heap = []
+        if lo < hi:
+            best = self._argmax(lo, hi)
+            heap.append((-self._counts[best], best, lo, hi))
+        while heap and len(results) < k:
+            _, best, lo, hi = heapq.heappop(heap)
+            results.append((self.word(best).decode("utf-8"), self._counts[best]))
+            for a, b in ((lo, best), (best + 1, hi)):
+                if a < b:
+                    m = self._argmax(a, b)
+                    heapq.heappush(heap, (-self._counts[m], m, a, b))
+        return results
+
+    def count(self, word):
+        key = word.encode("utf-8")
+        i = self._lower_bound(key)
+        return self._counts[i] if i < self.size and self.word(i) == key else 0
+
+    def close(self):
+        self.offsets = self.counts = self.table = None
+        self._map.close()
+        self._file.close()
+
+
+def cached_index_path(word_file):
+    """Index location in the cache, keyed by the word file's path, size and mtime"""
+    stat = os.stat(word_file)
+    key = f"{os.path.abspath(word_file)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return os.path.join(CACHE_DIR, f"words-{hashlib.sha1(key.encode()).hexdigest()[:16]}.aflx")
+
+
+def open_word_index(word_file):
+    """Compile ``word_file`` once (cached) and memory-map the index"""
+    path = cached_index_path(word_file)
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        build_index(read_word_file(word_file), path)
+        event_log.info("predict", "Indexed %s in %.2fs", word_file, time.perf_counter() - started)
+    return WordIndex(path)
+
+
+class TypingStats:
+    """Keystrokes spent per completed word (lower is better)"""
+    def __init__(self):
+        self.keystrokes = 0
+        self.words = 0
+        self.completions = 0  # Words finished by picking a prediction
+
+    def __str__(self):
+        per_word = self.keystrokes / self.words if self.words else 0.0
+        return (f"{self.words} words, {self.keystrokes} keystrokes ({per_word:.2f} per word), "
+                f"{self.completions} completions accepted")
+
+
+class WordPredictor:
+    """
+    Top-k word completions from a memory-mapped word index plus the words the
+    user has typed. The index is opened lazily on a background thread; until
+    it is ready only learned words are suggested.
+    """
+    def __init__(self, word_file=None, learned_path=LEARNED_WORDS, k=3):
+        self.word_file = word_file
+        self.learned_path = learned_path
+        self.k = k
+        self.user_weight = 0.25
+        self.index = None
+        self.learned = {}  # word -> times typed
+        self._learned_words = []  # Keys of ``learned``, sorted for prefix ranges
+        self.stats = TypingStats()
+        self._loading = None
+        self._load_learned()
+
+    def _load_learned(self):
+        try:
+            with open(self.learned_path) as f:
+                self.learned = {str(w): int(c) for w, c in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            self.learned = {}
+        self._learned_words = sorted(self.learned)
+
+    def find_word_file(self):
+        candidates = (self.word_file,) if self.word_file else DEFAULT_WORD_FILES
+        return next((p for p in candidates if p and os.path.isfile(p)), None)
+
+    def load(self):
+        path = self.find_word_file()
+        if path is None:
+            event_log.info("predict", "No word list found, predicting learned words only")
+            return
+        try:
+            self.index = open_word_index(path)
+        except (OSError, ValueError) as e:
+            event_log.warning("predict", "Could not load word list %s: %s", path, e)
+
+    def load_async(self):
+        """Start opening the index in the background (once)"""
+        if self._loading is None:
+            self._loading = threading.Thread(target=self.load, name="WordPredictor", daemon=True)
+            self._loading.start()
+
+    def _score(self, base_count, uses):
+        base = math.log1p(base_count) / math.log1p(self.index.max_count) if self.index and self.index.max_count else 0.0
+        return base + self.user_weight * math.log1p(uses)
+
+    def complete(self, prefix, k=None):
+        """Up to k completions of ``prefix`` (lower case), best first"""
+        k = k or self.k
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+        index = self.index
+        candidates = {}
+        if index is not None:
+            # A few extra so learned words can re-rank the frequent ones
+            for word, count in index.top(prefix, k + 2):
+                candidates[word] = self._score(count, self.learned.get(word, 0))
+        # Learned words starting with the prefix, found by binary search like WordIndex.prefix_range
+        words = self._learned_words
+        lo = bisect.bisect_left(words, prefix)
+        hi = bisect.bisect_left(words, prefix + "\U0010ffff", lo)
+        for word in words[lo:hi]:
+            if word not in candidates:
+                candidates[word] = self._score(index.count(word) if index else 0, self.learned[word])
+        candidates.pop(prefix, None)  # Already typed in full
+        return sorted(candidates, key=candidates.get, reverse=True)[:k]
+
+    def learn(self, word):
+        """Count a word the user finished typing"""
+        word = word.lower()
+        if len(word) >= 2 and word.replace("'", "").isalpha():
+            if word not in self.learned:
+                bisect.insort(self._learned_words, word)
+            self.learned[word] = self.learned.get(word, 0) + 1
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.learned_path), exist_ok=True)
+            with open(self.learned_path, "w") as f:
+                json.dump(self.learned, f)
+        except OSError as e:
+            event_log.warning("predict", "Could not save learned words: %s", e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the virtual keyboard's word predictor")
+    parser.add_argument("prefixes", nargs="+")
+    parser.add_argument("--words", default=None, help="word-frequency file (default: %s)" % " or ".join(DEFAULT_WORD_FILES))
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    predictor = WordPredictor(args.words, k=args.k)
+    predictor.load()
+    for prefix in args.prefixes:
+        started = time.perf_counter()
+        words = predictor.complete(prefix)
+        print(f"{prefix}: {', '.join(words) or '-'} ({(time.perf_counter() - started) * 1e6:.0f} us)")
+
+
+if __name__ == "__main__":
+    main()